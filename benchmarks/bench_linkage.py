@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "bench_linkage.py"
+# Script aim: time the blocked fuzzy linkage in wells_linkage.py on Kansas
+#             all-wells-sized data (~470k wells) and check how many of the
+#             reformatted wells it finds compared to exact matching
+# Usage: python benchmarks/bench_linkage.py [--all-wells 470000] [--hauser 20000]
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from wells_linkage import link_records
+from wells_keys import hash_key
+from wells_states import plugged_linkage_rules, plugged_match_keys
+
+# Kansas all wells dataset, and Hauser Kansas wells (township in lat, section
+# in lon, range in spud_date) taken from it with formatting changes like
+# 'SMITH #1' vs 'Smith', '01' vs '1' and '12S' vs '12'
+def make_wells(n_all, n_hauser, seed=0):
+    rng = np.random.default_rng(seed)
+    leases = np.char.add(rng.choice(['SMITH', 'JONES', 'BROWN', 'MILLER', 'DAVIS', 'WILSON', 'TAYLOR'], n_all),
+                         np.char.add(' ', rng.integers(1, 500, n_all).astype(str)))
+    all_wells = pd.DataFrame({'LEASE': leases,
+                              'WELL': rng.integers(1, 40, n_all).astype(str),
+                              'TOWNSHIP': np.char.add(rng.integers(1, 35, n_all).astype(str), 'S'),
+                              'RANGE': rng.integers(1, 43, n_all).astype(str),
+                              'SECTION': rng.integers(1, 37, n_all).astype(str)})
+
+    pick = rng.choice(n_all, n_hauser, replace=False)
+    source = all_wells.iloc[pick].reset_index(drop=True)
+    style = rng.integers(0, 4, n_hauser)
+    well_name = np.select([style == 1, style == 2, style == 3],
+                          [pd.Series(source['LEASE']).str.title(), source['LEASE'] + ' UNIT',
+                           pd.Series(source['LEASE']).str.replace(' ', '-')],
+                          source['LEASE'])
+    operator = np.where(rng.random(n_hauser) < 0.3, '0' + source['WELL'], source['WELL'])
+    hauser = pd.DataFrame({'well_name': well_name,
+                           'operator': operator,
+                           'lat': source['TOWNSHIP'].str.rstrip('S'),
+                           'lon': source['SECTION'].astype(float),
+                           'spud_date': source['RANGE']})
+    return all_wells, hauser, pick
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--all-wells', type=int, default=470_000)
+    parser.add_argument('--hauser', type=int, default=20_000)
+    args = parser.parse_args()
+
+    all_wells, hauser, pick = make_wells(args.all_wells, args.hauser)
+    print(f'{len(all_wells):,} Kansas wells, {len(hauser):,} Hauser wells')
+
+    start = time.perf_counter()
+    links = link_records(hauser, all_wells, plugged_linkage_rules['Kansas'])
+    print(f'linkage: {time.perf_counter() - start:.2f}s')
+
+    # Exact keys, as used before the linkage (wells_keys.py)
+    rule = plugged_match_keys['Kansas']
+    exact = hash_key(hauser, rule['hauser'], tag='Kansas', normalize=rule['normalize']).isin(
+        hash_key(all_wells, rule['plugged'], tag='Kansas', normalize=rule['normalize']))
+    correct = (links['right'].to_numpy() == pick[links['left'].to_numpy()]).sum()
+    print(f'exact keys found {exact.sum():,} wells, linkage found {len(links):,} ({correct:,} correct)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "bench_matching.py"
+# Script aim: time the apply(tuple, axis=1).isin matching used for Aim 2 and
+#             hauser_status against the hashed keys in wells_keys.py, at full
+#             USGS scale (~120k USGS wells, ~150k Hauser wells)
+# Usage: python benchmarks/bench_matching.py [--usgs-rows 120000] [--hauser-rows 150000]
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from wells_keys import in_usgs
+
+# Old tuple matching, copied from Hauser_orphaned_wells.py for comparison
+def tuple_matching(hauser_2024f, usgs):
+    indiana_wells = hauser_2024f[hauser_2024f['state'] == 'Indiana']
+    kansas_wells = hauser_2024f[hauser_2024f['state'] == 'Kansas']
+    other_wells = hauser_2024f[hauser_2024f['state'] != 'Indiana']
+    other_wells = other_wells[other_wells['state'] != 'Kansas']
+
+    indiana_newly_orphaned = indiana_wells[
+        ~indiana_wells[['well_name', 'spud_date']].apply(tuple, axis=1).isin(
+            usgs[['Well name', 'Well number']].apply(tuple, axis=1))]
+    kansas_newly_orphaned = kansas_wells[
+        ~kansas_wells[['county', 'well_name', 'operator']].apply(tuple, axis=1).isin(
+            usgs[['County', 'Well name', 'Well number']].apply(tuple, axis=1))]
+    other_newly_orphaned = other_wells[~other_wells['api_key'].isin(usgs['api_key'])]
+
+    hauser_status = pd.Series('Orphaned since USGS', index=hauser_2024f.index)
+    hauser_status[hauser_2024f[['state', 'well_name', 'spud_date']].apply(tuple, axis=1).isin(
+        indiana_newly_orphaned[['state', 'well_name', 'spud_date']].apply(tuple, axis=1))] = 'Newly orphaned'
+    hauser_status[hauser_2024f[['state', 'county', 'well_name', 'operator']].apply(tuple, axis=1).isin(
+        kansas_newly_orphaned[['state', 'county', 'well_name', 'operator']].apply(tuple, axis=1))] = 'Newly orphaned'
+    hauser_status[hauser_2024f['api_key'].isin(other_newly_orphaned['api_key'])] = 'Newly orphaned'
+    return hauser_status
+
+# Hashed keys, as in Hauser_orphaned_wells.py now (exact keys only; the
+# fuzzy Indiana/Kansas linkage is timed in bench_linkage.py)
+def hashed_matching(hauser_2024f, usgs):
+    newly_orphaned_mask = ~in_usgs(hauser_2024f, usgs, linkage=None)
+    hauser_status = pd.Series('Orphaned since USGS', index=hauser_2024f.index)
+    hauser_status[newly_orphaned_mask] = 'Newly orphaned'
+    return hauser_status
+
+# USGS and Hauser-shaped tables; about two thirds of the Hauser wells are
+# also in USGS, with Indiana & Kansas matched on names instead of API
+def make_wells(n_usgs, n_hauser, seed=0):
+    rng = np.random.default_rng(seed)
+    states = rng.choice(['Indiana', 'Kansas', 'Ohio', 'Pennsylvania', 'Texas'], n_usgs,
+                        p=[0.1, 0.1, 0.2, 0.3, 0.3])
+    usgs = pd.DataFrame({'api_key': pd.array(rng.choice(10**10, n_usgs, replace=False), dtype='Int64'),
+                         'County': pd.array(rng.integers(0, 100, n_usgs).astype(str), dtype='string'),
+                         'Well name': pd.array(np.char.add('LEASE ', rng.integers(0, 20000, n_usgs).astype(str)), dtype='string'),
+                         'Well number': pd.array(rng.integers(1, 30, n_usgs).astype(str), dtype='string')})
+
+    shared = rng.random(n_hauser) < 2 / 3
+    pick = rng.integers(0, n_usgs, n_hauser)
+    fresh = rng.integers(20000, 40000, n_hauser).astype(str)
+    hauser = pd.DataFrame({'state': np.where(shared, states[pick], rng.choice(states, n_hauser)),
+                           'api_key': pd.array(np.where(shared, usgs['api_key'].to_numpy()[pick],
+                                                        rng.integers(0, 10**10, n_hauser)), dtype='Int64'),
+                           'county': np.where(shared, usgs['County'].to_numpy()[pick], '1'),
+                           'well_name': np.where(shared, usgs['Well name'].to_numpy()[pick],
+                                                 np.char.add('LEASE ', fresh)),
+                           'operator': np.where(shared, usgs['Well number'].to_numpy()[pick], '1')})
+    hauser['spud_date'] = hauser['operator']
+    return usgs, hauser
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--usgs-rows', type=int, default=120_000)
+    parser.add_argument('--hauser-rows', type=int, default=150_000)
+    args = parser.parse_args()
+
+    usgs, hauser = make_wells(args.usgs_rows, args.hauser_rows)
+    print(f'{len(usgs):,} USGS wells, {len(hauser):,} Hauser wells')
+
+    start = time.perf_counter()
+    hashed = hashed_matching(hauser, usgs)
+    hashed_time = time.perf_counter() - start
+    print(f'hashed keys: {hashed_time:.2f}s')
+
+    start = time.perf_counter()
+    tuples = tuple_matching(hauser, usgs)
+    tuple_time = time.perf_counter() - start
+    print(f'tuples:      {tuple_time:.2f}s ({tuple_time / hashed_time:.0f}x slower)')
+    print('same results:', tuples.equals(hashed))
+    print(hashed.value_counts())
+
+if __name__ == '__main__':
+    main()
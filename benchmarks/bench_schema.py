@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "bench_schema.py"
+# Script aim: peak RSS and frame size for loading a national-sized
+#             FracTracker file with plain object/float64 columns vs the
+#             compact schema in wells_schema.py (each in a fresh process so
+#             the peaks don't mix)
+# Usage: python benchmarks/bench_schema.py [--rows 3000000]
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from wells_io import ft_dtypes
+
+# FracTracker-shaped CSV: text columns with realistic repetition
+def write_wells(path, n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    states = ['Texas', 'Oklahoma', 'Kansas', 'Pennsylvania', 'Ohio', 'California', 'Wyoming',
+              'New Mexico', 'Colorado', 'West Virginia', 'Louisiana', 'North Dakota']
+    wells = pd.DataFrame({
+        'api_num': rng.integers(10**9, 10**10, n_rows).astype(str),
+        'stusps': rng.choice(states, n_rows),
+        'well_status': rng.choice(['Active', 'Plugged', 'Shut In', 'Abandoned', 'Orphan', 'Permitted',
+                                   'Temporarily Abandoned', 'Inactive', '7', '14'], n_rows),
+        'latitude': rng.uniform(25, 49, n_rows).round(6),
+        'longitude': rng.uniform(-124, -75, n_rows).round(6),
+        'county': np.char.add('County ', rng.integers(0, 1500, n_rows).astype(str)),
+        'well_name': np.char.add('Lease ', rng.integers(0, 10**6, n_rows).astype(str)),
+        'operator': np.char.add('Operator ', rng.integers(0, 40000, n_rows).astype(str)),
+        'spud_date': pd.to_datetime(rng.integers(0, 365 * 120, n_rows), unit='D',
+                                    origin='1900-01-01').strftime('%Y-%m-%d'),
+        'ft_category': rng.choice(['Production Well', 'Plugged', 'Other / Unknown'], n_rows),
+        'source': 'state agency'})
+    wells.to_csv(path, index=False)
+
+# Child process: load the file one way and print frame MB and peak RSS MB
+def load(mode, path, cache_dir):
+    from wells_io import read_fractracker
+    from wells_schema import peak_rss_mb
+    if mode == 'object':
+        # Old loader: all columns, default dtypes
+        wells = pd.read_csv(path)
+    elif mode == 'pruned':
+        # Only the used columns, still object strings & float64
+        wells = pd.read_csv(path, usecols=list(ft_dtypes), dtype=str)
+        wells[['latitude', 'longitude']] = wells[['latitude', 'longitude']].astype('float64')
+    else:
+        wells = read_fractracker(path, cache_dir=cache_dir)
+    print(wells.memory_usage(deep=True).sum() / 1024 ** 2, peak_rss_mb())
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=3_000_000)
+    parser.add_argument('--child', nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        load(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'wells.csv')
+        write_wells(path, args.rows)
+        print(f'{args.rows:,} rows, {os.path.getsize(path) / 1024 ** 2:.0f} MB CSV')
+        # 'schema' runs twice: parsing the CSV, then from the Parquet cache
+        for mode in ['object', 'pruned', 'schema', 'schema']:
+            out = subprocess.run([sys.executable, __file__, '--child', mode, path, os.path.join(tmp, 'Cache')],
+                                 capture_output=True, text=True, check=True).stdout.split()
+            frame_mb, peak_mb = float(out[-2]), float(out[-1])
+            print(f'{mode:>7}: frame {frame_mb:7.0f} MB, peak RSS {peak_mb:7.0f} MB')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "bench_status.py"
+# Script aim: time the row-wise standardize_well_status apply against the
+#             vectorized classifier in wells_status.py at 1M & 10M rows
+# Usage: python benchmarks/bench_status.py [--rows 1000000 10000000] [--skip-rowwise]
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from wells_status import state_status_dict, plugged_dict, classify_well_status, build_status_lookup
+
+# Old row-wise function, copied from Hauser_orphaned_wells.py for comparison
+def standardize_well_status(row):
+    state = row['stusps']
+    status = row['well_status']
+    if state in state_status_dict and status in state_status_dict[state]:
+        return 'ORPHANED'
+    elif state in plugged_dict and status in plugged_dict[state]:
+        return 'PLUGGED'
+    return status
+
+# FracTracker-shaped state & status columns, mixing dictionary codes with
+# statuses that shouldn't match
+def make_wells(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    codes = sorted({str(code) for d in (state_status_dict, plugged_dict) for codes in d.values() for code in codes})
+    codes += ['Active', 'Producing', 'Shut In', 'Unknown', 'Permitted']
+    states = sorted(set(state_status_dict) | set(plugged_dict))
+    status = pd.Series(rng.choice(codes, n_rows), dtype=object)
+    # Louisiana & Texas report some codes as ints
+    numeric = rng.random(n_rows) < 0.2
+    status[numeric & status.str.isdigit()] = status[numeric & status.str.isdigit()].astype(int)
+    return pd.DataFrame({'stusps': rng.choice(states, n_rows), 'well_status': status})
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--skip-rowwise', action='store_true',
+                        help="don't time the old apply (takes minutes at 10M rows)")
+    args = parser.parse_args()
+
+    lookup = build_status_lookup()
+    for n_rows in args.rows:
+        wells = make_wells(n_rows)
+        print('------------------------------')
+        print(f'{n_rows:,} rows')
+
+        start = time.perf_counter()
+        vectorized = classify_well_status(wells, lookup)
+        vectorized_time = time.perf_counter() - start
+        print(f'vectorized: {vectorized_time:.2f}s')
+
+        if not args.skip_rowwise:
+            start = time.perf_counter()
+            rowwise = wells.apply(standardize_well_status, axis=1)
+            rowwise_time = time.perf_counter() - start
+            print(f'row-wise:   {rowwise_time:.2f}s ({rowwise_time / vectorized_time:.0f}x slower)')
+            print('same results:', rowwise.equals(vectorized))
+
+if __name__ == '__main__':
+    main()
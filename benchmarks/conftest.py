@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+# Title: "conftest.py"
+# Script aim: the synthetic WELLS folder (see synthetic.py) and the pipeline
+#             frames built from it, shared by the pytest-benchmark suite
+# Usage: pytest benchmarks/ [--wells 1M] --benchmark-autosave
+#        pytest benchmarks/ --benchmark-compare --benchmark-compare-fail=mean:15%
+# --wells (or WELLS_BENCH_SIZE) is the number of FracTracker rows, 100k by
+# default. --benchmark-autosave keeps each run's results in .benchmarks/,
+# labelled with the commit, and --benchmark-compare checks a run against
+# the last saved one (pytest-benchmark compare lists the saved runs)
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Stages the benchmarks take their inputs from. validate and export aren't
+# run: validate's point-in-state check is timed on its own in
+# test_bench_pipeline.py (the stage also imports the us library, which the
+# other stages don't need), and export only writes the GeoParquet / FlatGeobuf
+# files, which isn't one of the steps being timed
+input_stages = ['ingest', 'classify', 'dedup', 'assemble', 'remove-plugged', 'newly-orphaned',
+                'newly-plugged']
+
+def pytest_addoption(parser):
+    parser.addoption('--wells', default=None,
+                     help='FracTracker rows in the synthetic dataset, e.g. 100k, 1M, 10M '
+                          '(default: $WELLS_BENCH_SIZE or 100k)')
+    parser.addoption('--wells-seed', type=int, default=0, help='seed for the synthetic dataset')
+
+# The synthetic WELLS folder, written once per session; the benchmarks run
+# from inside it, like the pipeline does
+@pytest.fixture(scope='session')
+def wells_dir(request, tmp_path_factory):
+    from synthetic import parse_size, write_dataset
+    size = request.config.getoption('--wells') or os.environ.get('WELLS_BENCH_SIZE', '100k')
+    out_dir = str(tmp_path_factory.mktemp('WELLS'))
+    write_dataset(out_dir, parse_size(size), request.config.getoption('--wells-seed'))
+
+    cwd = os.getcwd()
+    os.chdir(out_dir)
+    yield out_dir
+    os.chdir(cwd)
+
+# Config for the benchmark runs: no run log, one worker unless a benchmark
+# asks for more
+@pytest.fixture(scope='session')
+def wells_config(wells_dir):
+    from wells_pipeline import default_config
+    return {**default_config, 'run_log' : None, 'max_workers' : 1}
+
+# Every output of the stages up to newly-plugged, built once
+@pytest.fixture(scope='session')
+def wells_frames(wells_dir, wells_config):
+    from wells_pipeline import run_pipeline
+    return run_pipeline(input_stages, wells_config, stage_dir=os.path.join(wells_dir, 'Cache', 'stages'))
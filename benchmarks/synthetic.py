@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "synthetic.py"
+# Script aim: write a WELLS folder of synthetic FracTracker-, USGS- and
+#             state-download-shaped files at any scale (100k, 1M, 10M wells)
+#             so the pipeline can be benchmarked without the real data
+# Usage: python benchmarks/synthetic.py --wells 1M --out /tmp/WELLS [--seed 0]
+#        then e.g. python cli.py orphaned-wells run --data-dir /tmp/WELLS --until newly-plugged
+
+# What's realistic about it:
+#   - statuses mix each state's orphaned & plugged codes (state_status_dict,
+#     plugged_dict) with codes that are in neither
+#   - duplicate APIs at roughly the real file's rates: exact repeats (dedup
+#     step 1), the same API somewhere else (step 2), the same place with
+#     another status (step 3) and repeats only off by rounding
+#   - API numbers formatted like the sources: 14 digits, dashes, spaces,
+#     '.0' floats, blanks, 0000000000, and the dropped leading zero / state
+#     code of the states in api_zfill_states & api_state_prefixes
+#   - USGS re-lists part of FracTracker's wells and has USGS-assigned
+#     'ID…' / 'D…' IDs
+#   - every state download has its own columns (state_fields_dict), Indiana
+#     in UTM, Kansas with township/range/section and no API
+#   - each state is a box on a grid (Boundaries/states_2021.parquet, plus a
+#     Kansas PLSS table) and a few wells fall outside their state
+# The file names are the ones in default_config and state_files
+
+import argparse
+import os
+import sys
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from shapely.geometry import box
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from census_boundaries import store_dir
+from wells_io import ks_wells_columns
+from wells_pipeline import default_config
+from wells_plss import plss_keys, table_dtype, table_path
+from wells_states import (state_files, state_extra_files, state_fields_dict, api_zfill_states,
+                          api_state_prefixes)
+from wells_status import state_status_dict, plugged_dict
+
+# Rows generated (and written) at a time
+chunk_rows = 1_000_000
+
+# State: (USPS abbreviation, API state code, share of the FracTracker wells)
+states = {
+    'Alabama' : ('AL', '01', 1), 'Alaska' : ('AK', '50', 1), 'Arizona' : ('AZ', '02', 1),
+    'Arkansas' : ('AR', '03', 1), 'California' : ('CA', '04', 3), 'Colorado' : ('CO', '05', 2),
+    'Florida' : ('FL', '09', 1), 'Idaho' : ('ID', '11', 1), 'Illinois' : ('IL', '12', 1),
+    'Indiana' : ('IN', '13', 1), 'Kansas' : ('KS', '15', 4), 'Kentucky' : ('KY', '16', 2),
+    'Louisiana' : ('LA', '17', 3), 'Maryland' : ('MD', '19', 1), 'Michigan' : ('MI', '21', 2),
+    'Mississippi' : ('MS', '23', 1), 'Missouri' : ('MO', '24', 1), 'Montana' : ('MT', '25', 1),
+    'Nebraska' : ('NE', '26', 1), 'Nevada' : ('NV', '27', 1), 'New Mexico' : ('NM', '30', 2),
+    'New York' : ('NY', '31', 2), 'North Dakota' : ('ND', '33', 2), 'Ohio' : ('OH', '34', 4),
+    'Oklahoma' : ('OK', '35', 5), 'Oregon' : ('OR', '36', 1), 'Pennsylvania' : ('PA', '37', 4),
+    'South Dakota' : ('SD', '40', 1), 'Tennessee' : ('TN', '41', 1), 'Texas' : ('TX', '42', 10),
+    'Utah' : ('UT', '43', 1), 'Virginia' : ('VA', '45', 1), 'Washington' : ('WA', '46', 1),
+    'West Virginia' : ('WV', '47', 3), 'Wyoming' : ('WY', '49', 2),
+    }
+
+# Share of FracTracker rows that are a repeat of another row's API
+duplicate_rates = {'exact' : 0.04,       # step 1
+                   'moved' : 0.01,       # step 2 (kilometres away)
+                   'restatused' : 0.02,  # step 3
+                   'rounded' : 0.005}    # same place to 4 decimals
+
+# Share of FracTracker API numbers in each format
+api_formats = {'plain' : 0.60, '14-digit' : 0.20, 'dashed' : 0.08, 'float' : 0.05,
+               'spaced' : 0.03, 'no leading zero' : 0.02, 'blank' : 0.01, 'zeros' : 0.005,
+               'short' : 0.005}
+
+# Statuses that aren't in either dictionary
+other_statuses = ['Active', 'Producing', 'Shut In', 'Temporarily Abandoned', 'Permitted',
+                  'Unknown', 'Inactive']
+
+# Size of each part relative to the number of FracTracker wells
+usgs_share = 0.03
+state_download_share = 0.02
+tennessee_share = 0.01
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+# '100k', '1M', '10M', '250000' -> int
+def parse_size(size):
+    size = str(size).strip().upper()
+    scale = {'K' : 10**3, 'M' : 10**6}.get(size[-1:], 1)
+    return int(float(size.rstrip('KM')) * scale)
+
+# (lon_min, lat_min, lon_max, lat_max) for each state: boxes on a grid over
+# the lower 48 with gaps between them, so points in a gap are in no state
+def state_boxes():
+    boxes = {}
+    for i, state in enumerate(sorted(states)):
+        row, col = divmod(i, 7)
+        lon_min, lat_min = -124 + col * 7.5, 25 + row * 4
+        boxes[state] = (lon_min, lat_min, lon_min + 7, lat_min + 3.5)
+    return boxes
+
+# Boundary-store-shaped states (STATEFP, STUSPS, NAME, geometry)
+def state_boundaries():
+    boxes = state_boxes()
+    return gpd.GeoDataFrame({'STATEFP' : [f'{i + 1:02d}' for i in range(len(boxes))],
+                             'STUSPS' : [states[state][0] for state in boxes],
+                             'NAME' : list(boxes),
+                             'geometry' : [box(*bounds) for bounds in boxes.values()]},
+                            crs='EPSG:4326')
+
+def _points(rng, state, n, outside=0.005):
+    lon_min, lat_min, lon_max, lat_max = state_boxes()[state]
+    lat = rng.uniform(lat_min, lat_max, n)
+    lon = rng.uniform(lon_min, lon_max, n)
+    # A few wells fall outside their state
+    stray = rng.random(n) < outside
+    lat[stray] = rng.uniform(25, 49, stray.sum())
+    lon[stray] = rng.uniform(-124, -67, stray.sum())
+    return lat.round(6), lon.round(6)
+
+def _numbered(prefix, values):
+    return np.char.add(prefix, values.astype(str))
+
+# 10-digit APIs, unique for each well id: state code + a scrambled 8 digits
+def _api10(state_codes, ids):
+    body = pd.Series((np.asarray(ids, dtype=np.int64) * 2654435761) % 10**8).astype(str).str.zfill(8)
+    return pd.Series(state_codes, dtype=object).reset_index(drop=True) + body
+
+def _format_apis(rng, api10):
+    api10 = pd.Series(api10, dtype=object).reset_index(drop=True)
+    kind = rng.choice(list(api_formats), len(api10), p=list(api_formats.values()))
+    api = api10.copy()
+    for name, mask in [(name, kind == name) for name in api_formats]:
+        if not mask.any():
+            continue
+        values = api10[mask]
+        if name == '14-digit':
+            api[mask] = values + '0000'
+        elif name == 'dashed':
+            api[mask] = values.str[:2] + '-' + values.str[2:5] + '-' + values.str[5:]
+        elif name == 'float':
+            api[mask] = values + '0000.0'
+        elif name == 'spaced':
+            api[mask] = values.str[:2] + ' ' + values.str[2:5] + ' ' + values.str[5:]
+        elif name == 'no leading zero':
+            api[mask] = values.str.lstrip('0')
+        elif name == 'blank':
+            api[mask] = None
+        elif name == 'zeros':
+            api[mask] = '0000000000'
+        elif name == 'short':
+            api[mask] = values.str[:4]
+    return api
+
+# Orphaned / plugged / other status for each well of one state
+def _statuses(rng, state, n, p_orphaned=0.04, p_plugged=0.35):
+    orphaned = [str(code) for code in state_status_dict.get(state, [])] or other_statuses
+    plugged = [str(code) for code in plugged_dict.get(state, [])] or other_statuses
+    kind = rng.choice(3, n, p=[p_orphaned, p_plugged, 1 - p_orphaned - p_plugged])
+    return np.select([kind == 0, kind == 1],
+                     [rng.choice(orphaned, n), rng.choice(plugged, n)],
+                     rng.choice(other_statuses, n)).astype(object)
+
+def _dates(rng, n, blank=0.1):
+    dates = pd.to_datetime(rng.integers(0, 365 * 120, n), unit='D', origin='1900-01-01')
+    dates = pd.Series(dates.strftime('%Y-%m-%d'), dtype=object)
+    dates[rng.random(n) < blank] = None
+    return dates.to_numpy()
+
+# =============================================================================
+# FracTracker
+# =============================================================================
+
+# Unique wells with ids start .. start + n - 1 (ids make the APIs unique)
+def _ft_wells(rng, n, start, state_names, weights):
+    state = rng.choice(state_names, n, p=weights)
+    ids = np.arange(start, start + n)
+    wells = pd.DataFrame({'api_num' : _api10([states[s][1] for s in state], ids),
+                          'stusps' : state,
+                          'well_status' : np.empty(n, dtype=object),
+                          'latitude' : np.zeros(n),
+                          'longitude' : np.zeros(n),
+                          'county' : _numbered('County ', rng.integers(1, 120, n)),
+                          'well_name' : _numbered('LEASE ', rng.integers(0, 10**6, n)),
+                          'operator' : _numbered('OPERATOR ', rng.integers(0, 40000, n)),
+                          'spud_date' : _dates(rng, n),
+                          'ft_category' : rng.choice(['Production Well', 'Plugged', 'Other / Unknown',
+                                                      'Injection / Storage / Service'], n),
+                          'source' : 'state agency'})
+    for s, rows in wells.groupby('stusps').indices.items():
+        wells.iloc[rows, 2] = _statuses(rng, s, len(rows))
+        wells.iloc[rows, 3], wells.iloc[rows, 4] = _points(rng, s, len(rows))
+    return wells
+
+# Repeats of some of `wells`' APIs at duplicate_rates
+def _ft_duplicates(rng, wells):
+    repeats = []
+    for kind, rate in duplicate_rates.items():
+        rows = wells.iloc[rng.integers(0, len(wells), int(len(wells) * rate))].copy()
+        if kind == 'moved':
+            rows['latitude'] = (rows['latitude'] + rng.choice([-0.5, 0.5], len(rows))).round(6)
+        elif kind == 'restatused':
+            for s, positions in rows.groupby('stusps').indices.items():
+                rows.iloc[positions, rows.columns.get_loc('well_status')] = _statuses(rng, s, len(positions))
+        elif kind == 'rounded':
+            rows[['latitude', 'longitude']] = rows[['latitude', 'longitude']].round(4)
+        repeats.append(rows)
+    return pd.concat(repeats)
+
+# One chunk of the FracTracker file: unique wells, their repeats (shuffled
+# in), and the API numbers in their source formats
+def fractracker_chunk(rng, n_rows, start, state_names=None):
+    state_names = state_names or [s for s in states if s != 'Tennessee']
+    weights = np.array([states[s][2] for s in state_names], dtype=float)
+    n_unique = int(n_rows / (1 + sum(duplicate_rates.values())))
+    wells = _ft_wells(rng, n_unique, start, state_names, weights / weights.sum())
+    clean = wells.copy()
+    chunk = pd.concat([wells, _ft_duplicates(rng, wells)], ignore_index=True)
+    chunk = chunk.iloc[rng.permutation(len(chunk))[:n_rows]].reset_index(drop=True)
+    chunk['api_num'] = _format_apis(rng, chunk['api_num'])
+    return chunk, clean
+
+# Write the FracTracker file(s) a chunk at a time; returns the first chunk's
+# unique wells (clean 10-digit APIs) for the other files to draw on
+def write_fractracker(path, n_rows, rng, start=0, state_names=None):
+    sample = None
+    for offset in range(0, n_rows, chunk_rows):
+        chunk, clean = fractracker_chunk(rng, min(chunk_rows, n_rows - offset), start + offset, state_names)
+        chunk.to_csv(path, index=False, mode='w' if offset == 0 else 'a', header=offset == 0)
+        if sample is None:
+            sample = clean
+    return sample
+
+# =============================================================================
+# State downloads & the Kansas all wells dataset
+# =============================================================================
+
+# Township, range & section for Kansas wells ('12', '7W', '36')
+def _kansas_plss(rng, n):
+    return (rng.integers(1, 36, n).astype(str),
+            np.char.add(rng.integers(1, 44, n).astype(str), rng.choice(['E', 'W'], n, p=[0.2, 0.8])),
+            rng.integers(1, 37, n).astype(str))
+
+# API as the state's download writes it
+def _download_api(state, api10):
+    api10 = pd.Series(api10, dtype=object)
+    if state in api_zfill_states:
+        return api10.str.lstrip('0')
+    prefix = api_state_prefixes.get(state)
+    if prefix is not None:
+        return api10.where(~api10.str.startswith(prefix), api10.str[len(prefix):])
+    return api10
+
+# One state's download, in its own columns; about a quarter of its wells
+# are plugged in FracTracker (Aim 1) and a quarter are already in USGS (Aim 2)
+def state_download(rng, state, n, ft_sample, usgs_api10, start):
+    api10 = _api10([states[state][1]] * n, np.arange(start, start + n))
+    pick = rng.random(n)
+    ft_state = ft_sample[ft_sample['stusps'] == state]
+    plugged = ft_state[ft_state['well_status'].isin([str(code) for code in plugged_dict.get(state, [])])]
+    if state == 'West Virginia':
+        # Its locations come from FracTracker by API
+        plugged = ft_state
+    from_ft = (pick < 0.25) & (len(plugged) > 0)
+    api10[from_ft] = rng.choice(plugged['api_num'].to_numpy(), from_ft.sum()) if len(plugged) else None
+    usgs_state = usgs_api10[usgs_api10.str[:2] == states[state][1]]
+    from_usgs = (pick >= 0.25) & (pick < 0.5) & (len(usgs_state) > 0)
+    api10[from_usgs] = rng.choice(usgs_state.to_numpy(), from_usgs.sum()) if len(usgs_state) else None
+
+    lat, lon = _points(rng, state, n)
+    wells = pd.DataFrame({'api_10' : _download_api(state, api10),
+                          'lat' : lat,
+                          'lon' : lon,
+                          'state' : state,
+                          'county' : _numbered('County ', rng.integers(1, 120, n)),
+                          'well_name' : _numbered('LEASE ', rng.integers(0, 10**5, n)),
+                          'operator' : _numbered('OPERATOR ', rng.integers(0, 5000, n)),
+                          'well_status' : _statuses(rng, state, n, p_orphaned=0.9, p_plugged=0.05),
+                          'spud_date' : _dates(rng, n)})
+    if state == 'Indiana':
+        # No API; UTM Zone 16N coordinates and a well number
+        wells['Utmx'] = rng.uniform(460000, 640000, n).round(1)
+        wells['Utmy'] = rng.uniform(4200000, 4620000, n).round(1)
+        wells[['lat', 'lon']] = np.nan
+        wells['api_10'] = _numbered('', rng.integers(10000, 99999, n))
+        wells['spud_date'] = rng.integers(1, 30, n).astype(str)
+    if state == 'Kansas':
+        # No API; township, section & range in the lat, lon & spud_date fields
+        wells['lat'], wells['spud_date'], wells['lon'] = _kansas_plss(rng, n)
+        wells['operator'] = rng.integers(1, 30, n).astype(str)
+    return wells
+
+# Rename onto the state's columns and split off any extra files
+def download_files(state, wells):
+    fields = {field: col for field, col in state_fields_dict[state].items() if field in wells}
+    if state == 'West Virginia':
+        # Location, county & state come from the FracTracker merge
+        fields = {field: col for field, col in fields.items()
+                  if field not in ('lat', 'lon', 'county', 'state')}
+    if state == 'Kansas':
+        fields.pop('api_10')
+    df = wells[list(fields)].set_axis(list(fields.values()), axis=1)
+    if state == 'Indiana':
+        df[['Utmx', 'Utmy']] = wells[['Utmx', 'Utmy']].to_numpy()
+    if state == 'Colorado':
+        # Facility list (location & status) + well attributes, joined on location ID
+        location_ids = np.arange(len(df))
+        facilities = df[['Latitude', 'Longitude', 'County', 'Facil_Stat']].assign(**{'Location ID' : location_ids})
+        co_wells = df[['API_Label', 'Well_Title', 'Operator', 'Spud_Date']].assign(Loc_ID=location_ids)
+        return [facilities, co_wells]
+    return [df]
+
+# Kansas all wells dataset: most of the Kansas download's wells (about a
+# third plugged) plus wells that aren't in it
+def kansas_all_wells(rng, ks_download, n_extra):
+    township, range_, section = _kansas_plss(rng, n_extra)
+    extra = pd.DataFrame({'well_name' : _numbered('LEASE ', rng.integers(10**5, 2 * 10**5, n_extra)),
+                          'operator' : rng.integers(1, 30, n_extra).astype(str),
+                          'lat' : township, 'spud_date' : range_, 'lon' : section})
+    listed = ks_download.sample(frac=0.6, random_state=int(rng.integers(2**31)))
+    wells = pd.concat([listed[['well_name', 'operator', 'lat', 'spud_date', 'lon']], extra], ignore_index=True)
+    n = len(wells)
+    return pd.DataFrame({'API_NUMBER' : _numbered('15-', rng.integers(10**7, 10**8, n)),
+                         'LEASE' : wells['well_name'].to_numpy(),
+                         'WELL' : wells['operator'].to_numpy(),
+                         'TOWNSHIP' : wells['lat'].to_numpy(),
+                         'RANGE' : wells['spud_date'].to_numpy(),
+                         'SECTION' : wells['lon'].to_numpy(),
+                         'STATUS2' : rng.choice(['Plugged and Abandoned', 'Producing', 'Inactive Well'],
+                                                n, p=[0.35, 0.5, 0.15])})[ks_wells_columns]
+
+# =============================================================================
+# USGS
+# =============================================================================
+
+# USGS orphaned wells: about 60% also in FracTracker, the rest new, with a
+# few USGS-assigned IDs; Kansas rows are Kansas download wells (no API)
+def usgs_wells(rng, n, ft_sample, ks_download, start):
+    n_ks = min(len(ks_download) // 3, n // 20)
+    n_api = n - n_ks
+    listed = rng.random(n_api) < 0.6
+    known = ft_sample.iloc[rng.integers(0, len(ft_sample), n_api)]
+    new_state = rng.choice([s for s in states if s != 'Kansas'], n_api)
+    api10 = np.where(listed, known['api_num'].to_numpy(),
+                     _api10([states[s][1] for s in new_state], np.arange(start, start + n_api)))
+    state = np.where(listed, known['stusps'].to_numpy(), new_state)
+    identifier = pd.Series(api10, dtype=object)
+    assigned = rng.random(n_api) < 0.05
+    identifier[assigned] = _numbered(rng.choice(['ID', 'D'], assigned.sum()),
+                                     rng.integers(10**5, 10**6, assigned.sum()))
+
+    lat = np.where(listed, known['latitude'].to_numpy(), np.nan)
+    lon = np.where(listed, known['longitude'].to_numpy(), np.nan)
+    for s in np.unique(state[~listed]):
+        rows = np.flatnonzero(~listed & (state == s))
+        lat[rows], lon[rows] = _points(rng, s, len(rows))
+    usgs = pd.DataFrame({'Well identifier' : 'USA-' + identifier + '0000',
+                         'State' : state,
+                         'County' : _numbered('County ', rng.integers(1, 120, n_api)),
+                         'Well name' : _numbered('LEASE ', rng.integers(0, 10**6, n_api)),
+                         'Well number' : rng.integers(1, 30, n_api).astype(str),
+                         'Township' : None, 'Range' : None, 'Section' : None,
+                         'Latitude' : lat.round(6), 'Longitude' : lon.round(6)})
+
+    ks = ks_download.iloc[rng.permutation(len(ks_download))[:n_ks]]
+    ks_lat, ks_lon = _points(rng, 'Kansas', n_ks)
+    ks_usgs = pd.DataFrame({'Well identifier' : _numbered('USA-ID', rng.integers(10**6, 10**7, n_ks)),
+                            'State' : 'Kansas',
+                            'County' : ks['county'].to_numpy(),
+                            'Well name' : ks['well_name'].to_numpy(),
+                            'Well number' : ks['operator'].to_numpy(),
+                            'Township' : ks['lat'].to_numpy(),
+                            'Range' : ks['spud_date'].to_numpy(),
+                            'Section' : ks['lon'].to_numpy(),
+                            'Latitude' : ks_lat, 'Longitude' : ks_lon})
+    ks_usgs['Well identifier'] = ks_usgs['Well identifier'] + '0000'
+    return pd.concat([usgs, ks_usgs], ignore_index=True)
+
+# =============================================================================
+# Boundaries
+# =============================================================================
+
+# Kansas PLSS sections (6th PM, townships south) with centroids in the
+# Kansas box
+def kansas_plss_table(rng):
+    township, range_, range_dir, section = [part.ravel() for part in np.meshgrid(
+        np.arange(1, 36), np.arange(1, 44), [0, 1], np.arange(1, 37), indexing='ij')]
+    keys = plss_keys(np.full(len(township), 6), township, np.ones(len(township)), range_, range_dir, section)
+    lat, lon = _points(rng, 'Kansas', len(keys), outside=0)
+    table = np.empty(len(keys), dtype=table_dtype)
+    order = np.argsort(keys)
+    table['key'], table['lat'], table['lon'] = keys[order], lat[order], lon[order]
+    return table
+
+# =============================================================================
+# Everything
+# =============================================================================
+
+# Write a WELLS folder for `n_wells` FracTracker rows under out_dir
+def write_dataset(out_dir, n_wells, seed=0):
+    rng = np.random.default_rng(seed)
+    paths = {name: os.path.join(out_dir, path) for name, path in
+             [('ft', default_config['ft_paths'][0]), ('tennessee', default_config['ft_paths'][1]),
+              ('usgs', default_config['usgs_path']), ('ks_wells', default_config['ks_wells_path'])]}
+    for path in list(paths.values()) + [os.path.join(out_dir, path) for path in state_files.values()]:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.makedirs(os.path.join(out_dir, store_dir), exist_ok=True)
+
+    # FracTracker (ids 0 .. n_wells), Tennessee, USGS and the downloads use
+    # separate id ranges so their APIs only overlap where they're meant to
+    ft_sample = write_fractracker(paths['ft'], n_wells, rng)
+    write_fractracker(paths['tennessee'], max(int(n_wells * tennessee_share), 1), rng,
+                      start=2 * n_wells, state_names=['Tennessee'])
+
+    n_downloads = max(int(n_wells * state_download_share), len(state_files))
+    weights = np.array([states[s][2] for s in state_files], dtype=float)
+    sizes = np.maximum((weights / weights.sum() * n_downloads).astype(int), 1)
+    ks_download = state_download(rng, 'Kansas', int(sizes[list(state_files).index('Kansas')]),
+                                 ft_sample, pd.Series([], dtype=object), 4 * n_wells)
+
+    usgs = usgs_wells(rng, max(int(n_wells * usgs_share), 20), ft_sample, ks_download, 3 * n_wells)
+    usgs.to_csv(paths['usgs'], index=False)
+    usgs_api10 = usgs['Well identifier'].str[4:-4]
+    usgs_api10 = usgs_api10[usgs_api10.str.fullmatch(r'\d{10}')]
+
+    start = 5 * n_wells
+    for state, size in zip(state_files, sizes):
+        wells = ks_download if state == 'Kansas' else state_download(rng, state, int(size), ft_sample,
+                                                                      usgs_api10, start)
+        start += int(size)
+        files = [state_files[state]] + state_extra_files.get(state, [])
+        for path, df in zip(files, download_files(state, wells)):
+            df.to_csv(os.path.join(out_dir, path), index=False)
+
+    kansas_all_wells(rng, ks_download, len(ks_download)).to_csv(paths['ks_wells'], index=False)
+    state_boundaries().to_parquet(os.path.join(out_dir, store_dir, 'states_2021.parquet'))
+    np.save(table_path('KS', os.path.join(out_dir, store_dir)), kansas_plss_table(rng))
+    return out_dir
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--wells', default='100k', help='FracTracker rows, e.g. 100k, 1M, 10M')
+    parser.add_argument('--out', required=True, help='folder to write (the WELLS folder layout)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    n_wells = parse_size(args.wells)
+    write_dataset(args.out, n_wells, args.seed)
+    for root, _, files in sorted(os.walk(args.out)):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            print(f'{os.path.getsize(path) / 1024 ** 2:9.1f} MB  {os.path.relpath(path, args.out)}')
+
+if __name__ == '__main__':
+    main()
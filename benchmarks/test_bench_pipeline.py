@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+# Title: "test_bench_pipeline.py"
+# Script aim: time the wells pipeline's heavy steps on the synthetic dataset
+#             (status classification, dedup, assembly, the plugged anti-join,
+#             Aim 2 & 3 matching and spatial validation) with pytest-benchmark
+# Usage: pytest benchmarks/ [--wells 1M] --benchmark-autosave (see conftest.py)
+
+import geopandas as gpd
+import pandas as pd
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from synthetic import states, state_boundaries
+from wells_aims import remove_plugged_by_state, newly_orphaned_by_state, newly_plugged_by_state
+from wells_dedup import deduplicate_wells
+from wells_pipeline import assemble
+from wells_spatial import validate_points_in_state
+from wells_status import classify_well_status
+
+# A few rounds each: the steps take seconds at 1M+ rows
+rounds = 3
+
+def run(benchmark, func, *args, **kwargs):
+    return benchmark.pedantic(func, args=args, kwargs=kwargs, rounds=rounds, iterations=1,
+                              warmup_rounds=0)
+
+def test_classify_well_status(benchmark, wells_frames):
+    ft_raw = wells_frames['ft_raw']
+    status = run(benchmark, classify_well_status, ft_raw)
+    assert len(status) == len(ft_raw)
+
+def test_deduplicate_wells(benchmark, wells_frames, wells_config):
+    ft_classified = wells_frames['ft_classified']
+    ft, audit = run(benchmark, deduplicate_wells, ft_classified, api_col='api_num', status_col='well_status',
+                    lat_col='latitude', lon_col='longitude', tolerance_m=wells_config['tolerance_m'])
+    assert len(ft) == audit['rows_remaining'].iloc[-1]
+
+# Reads every state download (from the read cache after the first round)
+def test_assemble(benchmark, wells_frames, wells_config, tmp_path):
+    outputs = run(benchmark, assemble, {'ft' : wells_frames['ft']}, wells_config, str(tmp_path))
+    assert len(outputs['hauser_2024']) == len(wells_frames['hauser_2024'])
+
+@pytest.mark.parametrize('max_workers', [1, None])
+def test_remove_plugged(benchmark, wells_frames, max_workers):
+    hauser_unplugged, actually_plugged = run(benchmark, remove_plugged_by_state, wells_frames['hauser_2024'],
+                                             wells_frames['plugged_wells_ft'], wells_frames['plugged_wells_ks'],
+                                             max_workers)
+    assert len(hauser_unplugged) + len(actually_plugged) == len(wells_frames['hauser_2024'])
+
+@pytest.mark.parametrize('max_workers', [1, None])
+def test_newly_orphaned(benchmark, wells_frames, max_workers):
+    hauser_2024f, newly_orphaned = run(benchmark, newly_orphaned_by_state, wells_frames['hauser_unplugged'],
+                                       wells_frames['usgs'], max_workers)
+    assert len(newly_orphaned) == len(wells_frames['newly_orphaned'])
+
+@pytest.mark.parametrize('max_workers', [1, None])
+def test_newly_plugged(benchmark, wells_frames, max_workers):
+    newly_plugged = run(benchmark, newly_plugged_by_state, wells_frames['usgs'], wells_frames['hauser_2024'],
+                        wells_frames['actually_plugged'], wells_frames['plugged_wells_ft'],
+                        wells_frames['plugged_wells_ks'], max_workers)
+    assert len(newly_plugged) == len(wells_frames['newly_plugged'])
+
+# Every well with a location (Kansas's township/section/range aren't
+# geocoded here) against the synthetic state boxes: the Hauser wells, as
+# the pipeline does, and every deduplicated FracTracker well, for scale
+@pytest.mark.parametrize('frame, state_col, lat_col, lon_col', [('hauser_2024f', 'state', 'lat', 'lon'),
+                                                                ('ft', 'stusps', 'latitude', 'longitude')])
+def test_validate_points_in_state(benchmark, wells_frames, frame, state_col, lat_col, lon_col):
+    wells = wells_frames[frame]
+    wells = wells[wells[state_col] != 'Kansas']
+    lat = pd.to_numeric(wells[lat_col], errors='coerce')
+    lon = pd.to_numeric(wells[lon_col], errors='coerce')
+    gdf = gpd.GeoDataFrame({'state' : wells[state_col].astype(str).to_numpy()},
+                           geometry=gpd.points_from_xy(lon, lat), crs='EPSG:4326')
+    state_name_to_abbr = {state.upper(): abbrev for state, (abbrev, _, _) in states.items()}
+    validated = run(benchmark, validate_points_in_state, gdf, state_boundaries(), state_name_to_abbr)
+    # Most wells are inside their state; the strays aren't
+    assert 0.9 < validated['is_within_claimed_state'].mean() < 1
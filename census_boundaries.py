@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "census_boundaries.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: keep the TIGER state & block group boundaries in a local
+#             GeoParquet store so the pipeline doesn't download them (pygris
+#             states() / block_groups()) on every run
+
+# Usage: download the TIGER archives once into one folder, e.g.
+#   tl_2021_us_state.zip, cb_2021_us_state_20m.zip, tl_2021_48_bg.zip, ...
+# then run build_boundary_store('TIGER', 'Boundaries') a single time
+
+import glob
+import os
+import re
+from functools import lru_cache
+
+import geopandas as gpd
+
+# Folder for the GeoParquet store
+store_dir = 'Boundaries'
+
+# =============================================================================
+# Build the store from TIGER archives on disk
+# =============================================================================
+
+# Write one GeoParquet file with a bbox column so reads can skip row groups
+def _write(gdf, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    gdf.to_parquet(path, index=False, write_covering_bbox=True)
+
+def build_boundary_store(tiger_dir, store_dir=store_dir, year=2021):
+    # States (TIGER/Line and cartographic boundary versions)
+    for archive in glob.glob(os.path.join(tiger_dir, f'*_{year}_us_state*.zip')):
+        name = os.path.splitext(os.path.basename(archive))[0]
+        if name.startswith('tl_'):
+            _write(gpd.read_file(archive), os.path.join(store_dir, f'states_{year}.parquet'))
+        else:
+            resolution = name.rsplit('_', 1)[-1]
+            _write(gpd.read_file(archive), os.path.join(store_dir, f'states_cb_{year}_{resolution}.parquet'))
+
+    # Block groups, one file per state
+    for archive in glob.glob(os.path.join(tiger_dir, f'tl_{year}_*_bg.zip')):
+        statefp = re.search(rf'tl_{year}_(\d+)_bg', archive).group(1)
+        block_groups = gpd.read_file(archive).sort_values('GEOID').reset_index(drop=True)
+        _write(block_groups, os.path.join(store_dir, f'block_groups_{year}', f'{statefp}.parquet'))
+
+# =============================================================================
+# Read from the store
+# =============================================================================
+
+# Files are memory-mapped and the results kept for the session, so repeated
+# calls don't touch the disk again (copy before editing the geometries)
+
+# Same as pygris states() / states(cb=True, resolution="20m")
+@lru_cache(maxsize=None)
+def load_states(cb=False, resolution='500k', year=2021, store_dir=store_dir):
+    name = f'states_cb_{year}_{resolution}.parquet' if cb else f'states_{year}.parquet'
+    return gpd.read_parquet(os.path.join(store_dir, name), memory_map=True)
+
+# State FIPS code from a name ('Texas'), abbreviation ('TX') or FIPS ('48')
+def state_fips(state, year=2021, store_dir=store_dir):
+    state = str(state)
+    if state.isdigit():
+        return state.zfill(2)
+    states = load_states(year=year, store_dir=store_dir)
+    match = states[(states['STUSPS'] == state.upper()) | (states['NAME'].str.upper() == state.upper())]
+    if match.empty:
+        raise ValueError(f'Unknown state: {state}')
+    return match['STATEFP'].iloc[0]
+
+# Same as pygris/tigris block_groups(state=..., year=2021); pass a
+# (minx, miny, maxx, maxy) bbox to only read the block groups in that box
+def load_block_groups(state, year=2021, bbox=None, store_dir=store_dir):
+    path = os.path.join(store_dir, f'block_groups_{year}', state_fips(state, year, store_dir) + '.parquet')
+    return gpd.read_parquet(path, bbox=bbox, memory_map=True)
+
+# Every state's block groups that are in the store
+def block_group_states(year=2021, store_dir=store_dir):
+    paths = glob.glob(os.path.join(store_dir, f'block_groups_{year}', '*.parquet'))
+    return sorted(os.path.splitext(os.path.basename(path))[0] for path in paths)
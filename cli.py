@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "cli.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: run the orphaned wells pipeline and the EJScreen x Census build
+#             from the command line (e.g. on a batch server), with the data
+#             & output folders and the states to run given as flags or in a
+#             config file instead of the hard-coded os.chdir paths
+
+# Usage:
+#   python cli.py orphaned-wells run --data-dir WELLS --out-dir OUT [--states TX,PA]
+#   python cli.py ejscreen build --data-dir DATASETS --out-dir OUT/EJ [--states TX,PA]
+# Settings come from default_config (wells_pipeline.py), then the JSON file
+# given with --config, then the flags, e.g. a config file
+#   {"data_dir": "/data/WELLS", "export_dir": "/data/out", "stream_ft": true}
+# Input paths in the config are relative to the data folder, like in
+# default_config. Nothing is shown on screen (matplotlib draws off-screen)
+
+import argparse
+import json
+import os
+import runpy
+import sys
+
+from run_log import profilers
+
+# No window to show plots in on a batch server
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+# Folder this file is in (ejscreenxcensus.py lives next to it)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Stages whose per-state counts are printed; a run includes every one that
+# comes at or before --until in the stage order
+count_stages = ['remove-plugged', 'newly-orphaned', 'newly-plugged']
+
+# =============================================================================
+# Settings
+# =============================================================================
+
+def read_config(path):
+    if path is None:
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+# 'TX,PA' -> ['TX', 'PA']
+def split_states(value):
+    return [state.strip() for state in value.split(',') if state.strip()]
+
+# State names or USPS abbreviations (any case) -> (name, abbreviation) pairs
+def lookup_states(states):
+    from wells_states import state_usps
+    by_key = {}
+    for name, abbrev in state_usps.items():
+        by_key[name.upper()] = by_key[abbrev] = (name, abbrev)
+    pairs = []
+    for state in states:
+        if state.upper() not in by_key:
+            raise SystemExit(f'unknown state: {state} (known: {", ".join(sorted(state_usps.values()))})')
+        pairs.append(by_key[state.upper()])
+    return pairs
+
+# State names as the wells datasets have them ('TX' -> 'Texas')
+def state_names(states):
+    return [name for name, _ in lookup_states(states)]
+
+# USPS abbreviations as EJScreen has them ('Texas' -> 'TX')
+def state_abbrevs(states):
+    return [abbrev for _, abbrev in lookup_states(states)]
+
+# Config file, then flags; folders are made absolute before any os.chdir
+def settings(args):
+    config = read_config(args.config)
+    for key in ('data_dir', 'out_dir', 'states', 'run_log', 'profile'):
+        value = getattr(args, key)
+        if value is not None:
+            config[key] = value
+    if isinstance(config.get('states'), str):
+        config['states'] = split_states(config['states'])
+    for key in ('data_dir', 'out_dir', 'export_dir', 'run_log'):
+        if config.get(key) is not None:
+            config[key] = os.path.abspath(config[key])
+    return config
+
+# =============================================================================
+# orphaned-wells run
+# =============================================================================
+
+def orphaned_wells_run(args):
+    config = settings(args)
+    os.chdir(config.pop('data_dir', os.getcwd()))
+
+    # (imported here so ejscreen build never loads the pipeline)
+    from wells_pipeline import run_pipeline, default_config, stages
+
+    out_dir = config.pop('out_dir', None)
+    if out_dir is not None:
+        config['export_dir'] = out_dir
+    if config.get('states') is not None:
+        config['states'] = state_names(config['states'])
+    if args.stream:
+        config['stream_ft'] = True
+    if args.workers is not None:
+        config['max_workers'] = args.workers
+    if args.flatgeobuf:
+        config['export_flatgeobuf'] = True
+    unknown = set(config) - set(default_config)
+    if unknown:
+        raise SystemExit('unknown settings: ' + ', '.join(sorted(unknown)))
+
+    for name in [args.until, *args.force]:
+        if name not in stages:
+            raise SystemExit(f'unknown stage: {name} (stages: {", ".join(stages)})')
+    order = list(stages)
+    targets = [name for name in count_stages
+               if order.index(name) <= order.index(args.until)] + [args.until]
+    if args.snapshot:
+        targets.append('snapshot')
+    outputs = run_pipeline(list(dict.fromkeys(targets)), config, force=args.force)
+
+    for name, df in outputs.items():
+        if name.endswith('_grouped'):
+            print('-----------------------------------------')
+            print(df.to_string(index=False))
+    if 'ft_changes' in outputs:
+        print('-----------------------------------------')
+        changes = outputs['ft_changes']['change'].value_counts()
+        print(changes.to_string() if len(changes) else 'snapshot: no changes')
+    return 0
+
+# =============================================================================
+# ejscreen build
+# =============================================================================
+
+# ejscreenxcensus.py reads its folders and states from the environment
+def ejscreen_build(args):
+    config = settings(args)
+    if config.get('data_dir') is not None:
+        os.environ['EJSCREEN_DATA_DIR'] = config['data_dir']
+    if config.get('out_dir') is not None:
+        os.makedirs(config['out_dir'], exist_ok=True)
+        os.environ['EJSCREEN_OUT_DIR'] = config['out_dir']
+    if config.get('states') is not None:
+        os.environ['EJSCREEN_STATES'] = ','.join(state_abbrevs(config['states']))
+    if config.get('run_log') is not None:
+        os.environ['EJSCREEN_RUN_LOG'] = config['run_log']
+    if config.get('profile') is not None:
+        os.environ['EJSCREEN_PROFILE'] = config['profile']
+    runpy.run_path(os.path.join(script_dir, 'ejscreenxcensus.py'), run_name='__main__')
+    return 0
+
+# =============================================================================
+# Arguments
+# =============================================================================
+
+def add_common_args(parser):
+    parser.add_argument('--config', help='JSON file of settings (flags override it)')
+    parser.add_argument('--data-dir', dest='data_dir', help='input data folder')
+    parser.add_argument('--out-dir', dest='out_dir', help='folder the results are written to')
+    parser.add_argument('--states', type=split_states,
+                        help='comma-separated state abbreviations to run, e.g. TX,PA (default: all)')
+    parser.add_argument('--run-log', dest='run_log',
+                        help='JSON-lines file for per-stage time, memory & row counts')
+    parser.add_argument('--profile', choices=profilers,
+                        help='profile every stage (files go in a profiles folder next to the run log)')
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py',
+                                     description='Orphaned wells pipeline and EJScreen x Census build')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    wells = commands.add_parser('orphaned-wells', help='orphaned wells pipeline (Hauser_orphaned_wells.py)')
+    wells_commands = wells.add_subparsers(dest='action', required=True)
+    run = wells_commands.add_parser('run', help='run the pipeline stages (cached stages are reused)')
+    add_common_args(run)
+    run.add_argument('--until', default='export',
+                     help='last stage to run, e.g. newly-plugged to skip validate & export; the count '
+                          'stages before it run too (default: export)')
+    run.add_argument('--force', nargs='+', default=(), metavar='STAGE',
+                     help='re-run these stages even if they are cached')
+    run.add_argument('--stream', action='store_true',
+                     help='parse FracTracker in chunks and dedup it one state at a time (lower peak '
+                          'memory while reading; the deduplicated wells are still held nationally)')
+    run.add_argument('--workers', type=int, help='worker processes (default: every core)')
+    run.add_argument('--flatgeobuf', action='store_true',
+                     help='also export each layer as one FlatGeobuf with a spatial index')
+    run.add_argument('--snapshot', action='store_true',
+                     help='also diff FracTracker against the snapshot store and update it '
+                          '(only the --states given, if any)')
+    run.set_defaults(func=orphaned_wells_run)
+
+    ejscreen = commands.add_parser('ejscreen', help='EJScreen x Census dataset (ejscreenxcensus.py)')
+    ejscreen_commands = ejscreen.add_subparsers(dest='action', required=True)
+    build = ejscreen_commands.add_parser('build', help='build acs_ej_final.csv')
+    add_common_args(build)
+    build.set_defaults(func=ejscreen_build)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -15,8 +15,15 @@
 
 
 # set working directory
+# (python cli.py ejscreen build sets these through the environment instead)
 import os
-os.chdir('/Users/gracehauser/Desktop/FracTracker/INDEPENDENT_PROJECT/DATASETS')
+# (defaults: the folder the script is run from, and EJ/ inside it)
+data_dir = os.path.abspath(os.environ.get('EJSCREEN_DATA_DIR', os.getcwd()))
+out_dir = os.path.abspath(os.environ.get('EJSCREEN_OUT_DIR', 'EJ'))
+# states to keep as comma-separated abbreviations (e.g. 'TX,PA'); all if not set
+states = os.environ.get('EJSCREEN_STATES')
+os.makedirs(out_dir, exist_ok=True)
+os.chdir(data_dir)
 
 # load packages
 import numpy as np
@@ -25,12 +32,19 @@ import geopandas as gpd
 from functools import reduce
 import requests, zipfile, io
 import math
+from run_log import RunLog, dropped, keep_rows
+
+# time, memory & row counts for each section, one JSON line per section
+# (EJSCREEN_PROFILE=cprofile or pyinstrument also profiles each; see run_log.py)
+run_log = RunLog(os.environ.get('EJSCREEN_RUN_LOG', os.path.join(out_dir, 'run_log.jsonl')),
+                 'ejscreenxcensus', os.environ.get('EJSCREEN_PROFILE') or None)
 
 
 #%%
 
 
 ### 1. import census data
+run_log.begin('census-import')
 
 # ignore storage space warnings
 import warnings
@@ -56,12 +70,14 @@ acs_b25070 = pd.read_csv('CENSUS/HOUSING/B25070_GROSS_RENT_AS_PCT_HOUSEHOLD_INCO
 # technology
 acs_b28001 = pd.read_csv('CENSUS/TECHNOLOGY/B28001_COMPUTERS/ACSDT5Y2021.B28001-Data.csv')
 acs_b28002 = pd.read_csv('CENSUS/TECHNOLOGY/B28002_INTERNET/ACSDT5Y2021.B28002-Data.csv')
+run_log.end(rows_out={'acs_b15003': len(acs_b15003)})
 
 
 #%%
 
 
 ### 2. select relevant columns & combine all census data
+run_log.begin('census-combine')
 
 # education
 acs_b15003 = acs_b15003[['GEO_ID', 'NAME', 'B15003_001E', 'B15003_001M', 'B15003_002E',
@@ -124,12 +140,14 @@ dfs = [acs_b15003,
 
 # merge
 acs = reduce(lambda left,right: pd.merge(left,right,on=['GEO_ID', 'NAME'], how='outer'), dfs)
+run_log.end(rows_out={'acs': len(acs)})
 
 
 #%%
 
 
 ### 3. clean census data
+run_log.begin('census-clean', rows_in={'acs': len(acs)})
 
 # delete first row
 acs = acs.iloc[1:]
@@ -142,21 +160,26 @@ acs['Block_Group'] = acs.Block_Group.str[12:]
 acs['Census_Tract'] = acs.Census_Tract.str[13:]
 
 # delete hawaii and puerto rico
+n_rows = len(acs)
 acs = acs[acs.State != 'Hawaii']
 acs = acs[acs.State != 'Puerto Rico']
+dropped('Hawaii & Puerto Rico', n_rows - len(acs))
 
 # make ID column since acs's geoid column is the full reference and we only want the 9-digit reference to merge on
 acs['ID'] = acs.GEO_ID.str[9:]
 
 # change type to int to get rid of leading 0s
 acs['ID'] = acs['ID'].astype(int)
+run_log.end(rows_out={'acs': len(acs)})
 
 
 #%%
 
 
 ### 4. import ejscreen data
+run_log.begin('ejscreen-import')
 ejscreen = pd.read_csv('EJSCREEN/EJSCREEN_2023_BG_with_AS_CNMI_GU_VI.csv', encoding='utf-8', encoding_errors='ignore')
+run_log.end(rows_out={'ejscreen': len(ejscreen)})
 
 
 #%%
@@ -164,13 +187,21 @@ ejscreen = pd.read_csv('EJSCREEN/EJSCREEN_2023_BG_with_AS_CNMI_GU_VI.csv', encod
 
 ### 5. clean ejscreen data
 
+run_log.begin('ejscreen-clean', rows_in={'ejscreen': len(ejscreen)})
+
 # delete hawaii, northern mariana island, guam, puerto rico, US virgin islands, and american samoa
+n_rows = len(ejscreen)
 ejscreen = ejscreen[ejscreen.STATE_NAME != 'Hawaii']
 ejscreen = ejscreen[ejscreen.STATE_NAME != 'Northern Mariana Is']
 ejscreen = ejscreen[ejscreen.STATE_NAME != 'Guam']
 ejscreen = ejscreen[ejscreen.STATE_NAME != 'Puerto Rico']
 ejscreen = ejscreen[ejscreen.STATE_NAME != 'Virgin Islands']
 ejscreen = ejscreen[ejscreen.STATE_NAME != 'American Samoa']
+dropped('Hawaii & territories', n_rows - len(ejscreen))
+
+# keep only the states asked for; the merge below keeps only ejscreen's block groups
+if states:
+    ejscreen = keep_rows(ejscreen, ejscreen.ST_ABBREV.isin(states.split(',')), 'state not selected')
 
 # select columns of interest
 ejscreen = ejscreen[['ID', 'ACSTOTPOP',
@@ -181,19 +212,25 @@ ejscreen = ejscreen[['ID', 'ACSTOTPOP',
                      'RSEI_AIR', 'NPL_CNT', 'PNPL', 'TSDF_CNT', 'PTSDF',
                      'PWDIS', 'UST', 'PRE1960', 'PRE1960PCT', 'PRMP',
                      'AREALAND', 'AREAWATER', 'Shape_Length', 'Shape_Area']]
+run_log.end(rows_out={'ejscreen': len(ejscreen)})
 
 
 #%%
 
 ### 6. merge census and ejscreen data
 
+run_log.begin('merge', rows_in={'ejscreen': len(ejscreen), 'acs': len(acs)})
+
 # merge acs data to ejscreen data, keeping all ejscreen data
 acs_ej = ejscreen.merge(acs, on = "ID", how = "left", indicator=True)
 
 # there are 2 block groups that are in the census TIGERLINE file & ejscreen file but not in the ACS files...
 # thus, there are stored as NaNs and throw errors as pandas reads the 2 NaNs as duplicates later on
 # let's delete these for now
+n_rows = len(acs_ej)
 acs_ej.drop_duplicates(subset=['GEO_ID'], inplace = True)
+dropped('no ACS match (duplicate NaN GEO_ID)', n_rows - len(acs_ej))
+run_log.end(rows_out={'acs_ej': len(acs_ej)})
 
 
 #%%
@@ -201,6 +238,8 @@ acs_ej.drop_duplicates(subset=['GEO_ID'], inplace = True)
 
 ### 7. clean merged dataset
 
+run_log.begin('clean-merged', rows_in={'acs_ej': len(acs_ej)})
+
 # bring identifiers to the front of the dataframe
 st = acs_ej['State']
 acs_ej.drop(labels=['State'], axis=1,inplace = True)
@@ -240,12 +279,14 @@ acs_ej = acs_ej.replace({"**": np.nan})
 # ***** : margin of error isn't appropriate because the measure corresponds to a single measure
 # effectively, the margin of error should be treated as 0
 acs_ej = acs_ej.replace({"*****": 0})
+run_log.end(rows_out={'acs_ej': len(acs_ej)})
 
 
 #%%
 
 
 ### 8. create EJ metrics of my own - percentages with no aggregation required
+run_log.begin('pct-metrics', rows_in={'acs_ej': len(acs_ej)})
 
 # list of acs data I want to work with
 acs_list = ['B25009', # for %rented
@@ -326,12 +367,14 @@ for file in acs_list:
     list_pct_ej_metrics.append(df)
     
     print("Complete!")
+run_log.end(rows_out={'list_pct_ej_metrics': sum(len(df) for df in list_pct_ej_metrics)})
 
 
 #%%
 
 
 ### 10. create EJ metrics of my own - percentages with aggregation required
+run_log.begin('agg-metrics', rows_in={'acs_ej': len(acs_ej)})
 
 # list of acs data I want to work with
 metrics_to_agg = ['B11012', # for %single parent household
@@ -457,12 +500,14 @@ for file in metrics_to_agg:
     agg_ej_metric_list.append(df)
     
     print("Complete!")
+run_log.end(rows_out={'agg_ej_metric_list': sum(len(df) for df in agg_ej_metric_list)})
 
 
 #%%
 
 
 ### 12. create EJ metrics of my own - educational attainment score
+run_log.begin('educ-score', rows_in={'acs_ej': len(acs_ej)})
 
 # creating a complex variable here, and my previous cells aren't equipped to include this
 
@@ -545,12 +590,14 @@ df.rename(columns={df.columns[1]: 'B15003_educscore',
 df.set_index('GEO_ID', inplace = True)
 
 agg_ej_metric_list.append(df)
+run_log.end(rows_out={'educ_score': len(df)})
  
 
 #%%
 
 
 ### 9. merge all new fields into one df and attach it to the acs_ej df
+run_log.begin('merge-metrics', rows_in={'acs_ej': len(acs_ej)})
 pct_ej_metrics = pd.concat(list_pct_ej_metrics[:8], axis=1, sort=False).reset_index() 
 
 agg_ej_metrics = pd.concat(agg_ej_metric_list[:10],axis=1, sort=False).reset_index()
@@ -664,12 +711,15 @@ acs_ej_final = acs_ej_final[['FIPS', 'GEOID_21', 'GEOID_12',
                         'LEAD', 'PCT_LEAD', 'RMPSCORE',
                         'AREALAND', 'AREAWATER',
                         'Shape_Length', 'Shape_Area']] 
+run_log.end(rows_out={'acs_ej_final': len(acs_ej_final)})
 
 #%%
 
 ### Export dataset
-os.chdir('/Users/gracehauser/Desktop/Thesis/00 - Data/EJ')
+run_log.begin('export', rows_in={'acs_ej_final': len(acs_ej_final)})
+os.chdir(out_dir)
 acs_ej_final.to_csv('acs_ej_final.csv', sep=',', index=False, encoding='utf-8')
+run_log.end()
 
 
 #%%
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "run_log.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: record where a run's time and memory go, one JSON line per
+#             stage (wall & CPU time, peak memory, rows in / out and rows
+#             dropped by reason), with an optional cProfile or pyinstrument
+#             capture of each stage
+
+# One line per stage, appended to the log, e.g.
+#   {"run_id": "20241111-103520-4242", "script": "wells_pipeline", "stage": "dedup",
+#    "status": "ran", "started": "2024-11-11T10:35:31", "wall_s": 4.2, "cpu_s": 4.1,
+#    "rss_start_mb": 812.0, "peak_rss_mb": 1130.5, "peak_rss_delta_mb": 318.5,
+#    "children_peak_rss_mb": 0.0, "rows_in": {"ft_classified": 1203311},
+#    "rows_out": {"ft": 1187402, "dedup_audit": 3},
+#    "dropped": {"dedup Step 1": 10211, "dedup Step 2": 5698}, "profile": null}
+# status is 'ran', 'cached' (wells pipeline stages read from the cache) or
+# 'error'. Peak memory is for this process only and is reset at the start
+# of each stage where the OS allows it (Linux); worker processes show up in
+# children_peak_rss_mb and their CPU time in cpu_s once they've exited
+# Read a log back with pd.read_json(path, lines=True)
+
+# Usage, a stage at a time:
+#   log = RunLog('Cache/run_log.jsonl', 'my_script', profile='cprofile')
+#   with log.stage('clean', rows_in={'ft' : len(ft)}) as record:
+#       ft = keep_rows(ft, ft['api_num'].notna(), 'no API')
+#       record['rows_out'] = {'ft' : len(ft)}
+# or, in a script of #%% cells, log.begin('clean') at the top of the cell
+# and log.end(rows_out={...}) at the bottom
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+from contextlib import contextmanager
+
+from wells_schema import peak_rss_mb, current_rss_mb, children_peak_rss_mb, reset_peak_rss
+
+# Profilers for RunLog(profile=...); pyinstrument is only needed if asked for
+profilers = ('cprofile', 'pyinstrument')
+
+# Stage records currently open, innermost last (dropped() adds to the last)
+_open_records = []
+
+# =============================================================================
+# Rows dropped
+# =============================================================================
+
+# Count n rows dropped for `reason` in the stage that's running (no-op
+# outside a logged stage)
+def dropped(reason, n):
+    if _open_records and n:
+        counts = _open_records[-1]['dropped']
+        counts[reason] = counts.get(reason, 0) + int(n)
+
+# df[keep], logging the rows that weren't kept as dropped for `reason`
+def keep_rows(df, keep, reason):
+    dropped(reason, len(df) - int(keep.sum()))
+    return df[keep]
+
+# {name: row count} for the frames in `frames` (None for missing outputs)
+def row_counts(frames):
+    return {name: None if df is None else len(df) for name, df in frames.items()}
+
+# =============================================================================
+# Profiling
+# =============================================================================
+
+class _CProfile:
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    # Writes <path>.prof (for snakeviz etc.) and <path>.txt, the top 40
+    # functions by cumulative time
+    def save(self, path):
+        self.profiler.disable()
+        self.profiler.dump_stats(path + '.prof')
+        text = io.StringIO()
+        pstats.Stats(self.profiler, stream=text).sort_stats('cumulative').print_stats(40)
+        with open(path + '.txt', 'w') as f:
+            f.write(text.getvalue())
+        return path + '.prof'
+
+class _Pyinstrument:
+    def __init__(self):
+        import pyinstrument  # optional: pip install pyinstrument
+        self.profiler = pyinstrument.Profiler()
+        self.profiler.start()
+
+    # Writes <path>.html and <path>.txt
+    def save(self, path):
+        self.profiler.stop()
+        with open(path + '.html', 'w') as f:
+            f.write(self.profiler.output_html())
+        with open(path + '.txt', 'w') as f:
+            f.write(self.profiler.output_text())
+        return path + '.html'
+
+# =============================================================================
+# Run log
+# =============================================================================
+
+class RunLog:
+    # path        : JSON-lines file the records are appended to (None to
+    #               only time stages, e.g. for profiles)
+    # script      : which script the run is from (goes in every record)
+    # profile     : None, 'cprofile' or 'pyinstrument'
+    # profile_dir : profiles go in <profile_dir>/<run_id>/<stage>.*
+    #               (default: a 'profiles' folder next to the log)
+    def __init__(self, path, script, profile=None, profile_dir=None):
+        if profile not in (None,) + profilers:
+            raise ValueError(f'profile must be one of {profilers}, not {profile!r}')
+        self.path = path
+        self.script = script
+        self.profile = profile
+        self.profile_dir = profile_dir or os.path.join(os.path.dirname(path or ''), 'profiles')
+        self.run_id = time.strftime('%Y%m%d-%H%M%S') + '-' + str(os.getpid())
+        self._begun = None
+
+    def _write(self, record):
+        if self.path is None:
+            return
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record, default=str) + '\n')
+
+    # A stage that didn't run (e.g. read from the cache); `fields` are added
+    # to its record
+    def skipped(self, name, status='cached', **fields):
+        self._write({'run_id' : self.run_id, 'script' : self.script, 'stage' : name,
+                     'status' : status, 'started' : time.strftime('%Y-%m-%dT%H:%M:%S'), **fields})
+
+    # Time the block; the yielded record can be filled in with rows_out
+    # (and rows_in) before it ends
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        record = {'run_id' : self.run_id, 'script' : self.script, 'stage' : name,
+                  'status' : 'ran', 'started' : time.strftime('%Y-%m-%dT%H:%M:%S'),
+                  'rows_in' : dict(rows_in or {}), 'rows_out' : {}, 'dropped' : {},
+                  'profile' : None}
+        rss_start = current_rss_mb()
+        peak_start = peak_rss_mb()
+        peak_reset = reset_peak_rss()
+        times_start = os.times()
+        wall_start = time.perf_counter()
+        profiler = {'cprofile' : _CProfile, 'pyinstrument' : _Pyinstrument}[self.profile]() if self.profile else None
+
+        _open_records.append(record)
+        try:
+            yield record
+        except BaseException:
+            record['status'] = 'error'
+            raise
+        finally:
+            _open_records.remove(record)
+            times_end = os.times()
+            record['wall_s'] = round(time.perf_counter() - wall_start, 3)
+            record['cpu_s'] = round(sum(times_end[:4]) - sum(times_start[:4]), 3)
+            peak = peak_rss_mb(since_reset=True)
+            record['rss_start_mb'] = None if rss_start is None else round(rss_start, 1)
+            record['peak_rss_mb'] = round(peak, 1)
+            # Without a reset the peak may be from before the stage; then
+            # only a new high counts
+            start = rss_start if peak_reset and rss_start is not None else peak_start
+            record['peak_rss_delta_mb'] = round(max(peak - start, 0), 1)
+            record['children_peak_rss_mb'] = round(children_peak_rss_mb(), 1)
+            if profiler is not None:
+                profile_dir = os.path.join(self.profile_dir, self.run_id)
+                os.makedirs(profile_dir, exist_ok=True)
+                record['profile'] = profiler.save(os.path.join(profile_dir, name))
+            self._write(record)
+
+    # Same as stage(), for scripts run cell by cell: begin() at the top of a
+    # cell, end() at the bottom (a begin() without an end() is closed by the
+    # next begin())
+    def begin(self, name, rows_in=None):
+        if self._begun is not None:
+            self.end()
+        context = self.stage(name, rows_in)
+        self._begun = (context, context.__enter__())
+
+    def end(self, rows_out=None):
+        if self._begun is None:
+            return
+        context, record = self._begun
+        self._begun = None
+        record['rows_out'].update(rows_out or {})
+        context.__exit__(None, None, None)
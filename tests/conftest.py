@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+
+# Title: "conftest.py"
+# Script aim: make the wells modules importable from tests/
+# Usage: pytest tests/
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+# Title: "test_wells_keys.py"
+# Script aim: exact plugged-well keys (wells_keys.py), without the fuzzy
+#             linkage
+
+import pandas as pd
+
+from wells_keys import remove_plugged
+from wells_plss import plss_number
+
+# A Kansas Hauser well the way assemble leaves it: township (lat) and section
+# (lon) as PLSS numbers, range still text in spud_date
+def kansas_hauser(township, section, range_):
+    return pd.DataFrame({'state' : ['Kansas'],
+                         'well_name' : ['SMITH'],
+                         'operator' : ['2'],
+                         'lat' : plss_number(pd.Series([township])).astype('float64'),
+                         'lon' : plss_number(pd.Series([section])).astype('float64'),
+                         'spud_date' : [range_],
+                         'api_key' : pd.array([pd.NA], dtype='Int64')})
+
+def plugged_sources(township, section, range_):
+    ks = pd.DataFrame({'LEASE' : ['SMITH'], 'WELL' : ['2'], 'TOWNSHIP' : [township],
+                       'SECTION' : [section], 'RANGE' : [range_]})
+    ft = pd.DataFrame({'api_key' : pd.array([], dtype='Int64'),
+                       'operator' : pd.Series([], dtype='string'),
+                       'well_name' : pd.Series([], dtype='string')})
+    return {'ft' : ft, 'ks' : ks}
+
+def test_kansas_matches_on_exact_key():
+    hauser = kansas_hauser('12S', '36', '7W')
+    still_orphaned, plugged = remove_plugged(hauser, plugged_sources('12', 36, '7W'), linkage={})
+    assert len(plugged) == 1 and still_orphaned.empty
+
+def test_kansas_township_and_range_are_normalized():
+    hauser = kansas_hauser(12, '-36', '007 w')
+    _, plugged = remove_plugged(hauser, plugged_sources('12S', '36', '7W'), linkage={})
+    assert len(plugged) == 1
+
+def test_kansas_different_section_does_not_match():
+    hauser = kansas_hauser('12S', '35', '7W')
+    _, plugged = remove_plugged(hauser, plugged_sources('12S', '36', '7W'), linkage={})
+    assert plugged.empty
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+# Title: "test_wells_stream.py"
+# Script aim: FracTracker parsed in chunks and deduplicated one state at a
+#             time (wells_stream.py) against the national pass, on the
+#             synthetic dataset (benchmarks/synthetic.py)
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import write_dataset
+from wells_pipeline import default_config, run_pipeline
+from wells_stream import deduplicate_states, state_file
+
+@pytest.fixture(scope='module')
+def wells_dir(tmp_path_factory):
+    out_dir = tmp_path_factory.mktemp('WELLS')
+    write_dataset(str(out_dir), 20_000, seed=1)
+    return out_dir
+
+def run_dedup(wells_dir, monkeypatch, **settings):
+    monkeypatch.chdir(wells_dir)
+    config = {**default_config, 'run_log' : None, 'max_workers' : 1, **settings}
+    return run_pipeline(['dedup'], config, stage_dir=str(wells_dir / 'Cache' / 'stages'))
+
+# Same wells and the same audit as deduplicate_wells over the whole file
+def test_stream_matches_national_dedup(wells_dir, monkeypatch):
+    national = run_dedup(wells_dir, monkeypatch)
+    streamed = run_dedup(wells_dir, monkeypatch, stream_ft=True)
+    pd.testing.assert_frame_equal(national['dedup_audit'], streamed['dedup_audit'], check_dtype=False)
+    pd.testing.assert_frame_equal(national['ft'].astype(str), streamed['ft'].astype(str))
+
+# Kansas isn't taken from FracTracker, so a Kansas-only run has no state files
+def test_stream_without_state_files(wells_dir, monkeypatch):
+    streamed = run_dedup(wells_dir, monkeypatch, stream_ft=True, states=['Kansas'])
+    assert streamed['ft'].empty
+    assert (streamed['dedup_audit']['rows_removed'] == 0).all()
+
+# An API listed under two states would be deduplicated separately in each
+def test_api_in_two_states_raises(tmp_path):
+    state_dir = tmp_path / 'ft_states'
+    state_dir.mkdir()
+    wells = pd.DataFrame({'api_num' : ['4200100001'], 'well_status' : ['ORPHANED'],
+                          'latitude' : [31.0], 'longitude' : [-100.0]})
+    for state in ['Texas', 'Oklahoma']:
+        wells.assign(stusps=state).to_parquet(state_file(state, str(state_dir)), index=False)
+    with pytest.raises(ValueError, match='more than one state'):
+        deduplicate_states(str(state_dir), out_dir=str(tmp_path / 'ft_dedup'), status_col='well_status',
+                           lat_col='latitude', lon_col='longitude')
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_adapters.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: keep everything about one state download (files, column mapping,
+#             coordinates, API number fixes, special formatting) in one
+#             adapter, and run all the adapters at once in a process pool
+# (status codes aren't here: they classify the FracTracker wells of every
+# state, downloaded or not, see wells_status.py)
+
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import pandas as pd
+
+from wells_assembly import standardize_state
+from wells_coords import project_to_latlon
+from wells_io import read_state_download
+from wells_states import (state_files, state_extra_files, state_fields_dict, required_fields,
+                          api_zfill_states, api_state_prefixes)
+
+# =============================================================================
+# Adapter
+# =============================================================================
+
+@dataclass
+class StateAdapter:
+    state: str
+    files: list                      # download first, then anything merged onto it
+    fields: dict                     # {required field: source column}
+    prepare: object = None           # special formatting: prepare(frames, ft_state) -> df
+    uses_ft: bool = False            # prepare needs the state's FracTracker wells
+    crs: str = None                  # CRS of projected coordinates, None if lat/lon
+    xy_columns: tuple = None         # (x, y) source columns when crs is set
+    crs_fallback: tuple = None       # (crs, lon_min, lon_max) to re-transform, see wells_coords
+    bogus_id_column: str = None      # number the wells here when the state has no API
+    api_prefix: str = None           # state code missing from the API
+    api_zfill: bool = False          # leading zero of the state code dropped
+
+    # Read the state's files (from the Parquet cache after the first run)
+    def load(self):
+        return [read_state_download(path, self.state) for path in self.files]
+
+    # Load, format and rename one state onto the Hauser df fields
+    def run(self, ft_state=None):
+        frames = self.load()
+        if self.bogus_id_column is not None:
+            frames[0][self.bogus_id_column] = frames[0].index + 1
+        if self.crs is not None:
+            x_col, y_col = self.xy_columns
+            project_to_latlon(frames[0], x_col, y_col, self.crs,
+                              lat_col=self.fields['lat'], lon_col=self.fields['lon'],
+                              fallback=self.crs_fallback)
+        df = self.prepare(frames, ft_state) if self.prepare is not None else frames[0]
+        return standardize_state(df, self.fields, required_fields, state=self.state)
+
+# =============================================================================
+# Specific state formatting
+# =============================================================================
+
+# Colorado: attach well attributes to the facility list
+def merge_colorado_wells(frames, ft_state):
+    colorado, co_wells = frames
+    return pd.merge(colorado, co_wells, left_on='Location ID', right_on='Loc_ID', how='left')
+
+# West Virginia: locations come from the FracTracker wells with the same API
+def merge_westvirginia_ft(frames, ft_state):
+    westvirginia = frames[0]
+    westvirginia['Well API'] = westvirginia['Well API'].astype("string")
+    return pd.merge(westvirginia, ft_state, left_on='Well API', right_on='api_num', how='left')
+
+# =============================================================================
+# Registry
+# =============================================================================
+
+# Anything that isn't just "read the file and rename the columns"
+state_overrides = {
+    'Colorado' : {'prepare' : merge_colorado_wells},
+    # Indiana coordinates are UTM Zone 16N, with Zone 17N for longitudes in [-84, -78)
+    'Indiana' : {'crs' : 'EPSG:32616',
+                 'xy_columns' : ('Utmx', 'Utmy'),
+                 'crs_fallback' : ('EPSG:32617', -84, -78)},
+    'Kansas' : {'bogus_id_column' : 'order'}, # Kansas doesn't use API
+    'West Virginia' : {'prepare' : merge_westvirginia_ft, 'uses_ft' : True}
+    }
+
+def build_adapters():
+    adapters = {}
+    for state, path in state_files.items():
+        adapters[state] = StateAdapter(
+            state=state,
+            files=[path] + state_extra_files.get(state, []),
+            fields=state_fields_dict[state],
+            api_prefix=api_state_prefixes.get(state),
+            api_zfill=state in api_zfill_states,
+            **state_overrides.get(state, {}))
+    return adapters
+
+# One adapter per state that required a separate download
+state_adapters = build_adapters()
+
+# The adapters' API fixes as normalize_api takes them (wells_api.py)
+def api_rules(adapters=None):
+    if adapters is None:
+        adapters = state_adapters
+    return {'zfill_states' : [state for state, adapter in adapters.items() if adapter.api_zfill],
+            'state_prefixes' : {state: adapter.api_prefix for state, adapter in adapters.items()
+                                if adapter.api_prefix is not None}}
+
+# =============================================================================
+# Runner
+# =============================================================================
+
+# Fork on Linux, so workers inherit the inputs instead of unpickling them;
+# elsewhere the platform default (spawn on macOS, where forking after
+# pyarrow's and BLAS's threads have started isn't safe), which imports the
+# main script in every worker, so scripts that run pools keep their code
+# under `if __name__ == '__main__'`
+def pool_context():
+    if sys.platform.startswith('linux'):
+        return multiprocessing.get_context('fork')
+    return None
+
+# Run adapters side by side and stack the results in registry order
+#   states      : optional list of state names to (re-)run just those
+#   ft          : FracTracker wells, for adapters that use them
+#   max_workers : defaults to every core
+def run_adapters(adapters=None, states=None, ft=None, max_workers=None):
+    if adapters is None:
+        adapters = state_adapters
+    if states is not None:
+        adapters = {state: adapters[state] for state in states}
+    if not adapters:
+        return pd.DataFrame(columns=required_fields)
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(adapters))
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=pool_context()) as pool:
+        futures = {}
+        for state, adapter in adapters.items():
+            ft_state = ft[ft['stusps'] == state] if adapter.uses_ft and ft is not None else None
+            futures[state] = pool.submit(adapter.run, ft_state)
+        clean_dfs = [futures[state].result() for state in adapters]
+
+    for state, clean_df in zip(adapters, clean_dfs):
+        print(state + ": " + str(len(clean_df)) + " orphaned wells in 2024")
+    print('')
+    return pd.concat(clean_dfs, ignore_index=True)
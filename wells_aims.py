@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_aims.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: run Aim 1 (remove wells that are actually plugged), Aim 2 (newly
+#             orphaned since USGS) and Aim 3 (newly plugged since USGS) one
+#             state at a time in a process pool, and put the per-state
+#             results back together exactly as the serial run has them
+
+# How it works:
+#   - The inputs (Hauser wells, USGS, plugged FT & KS wells) and the matching
+#     key indexes are set up once in the parent; forked workers (Linux)
+#     inherit them and spawned ones get one pickled copy each, instead of
+#     each state getting its own (see wells_adapters.pool_context)
+#   - A worker gets one state's row positions and sends back boolean masks
+#     over those rows (plugged, newly orphaned, newly plugged)
+#   - The parent scatters the masks into full-length masks and slices the
+#     frames once, so row order and contents are the same as the serial run
+# Every state's wells are still matched against all of USGS and all plugged
+# wells (a Hauser API can match a record filed under another state), so
+# splitting by state never changes a match
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from wells_adapters import pool_context
+from wells_keys import is_matched, match_key_index
+from wells_linkage import is_linked, swap_rule
+from wells_states import (plugged_match_keys, default_plugged_match_key, plugged_linkage_rules,
+                          usgs_match_keys, default_usgs_match_key, usgs_linkage_rules,
+                          ks_usgs_plugged_rule)
+
+# =============================================================================
+# Per-state runner
+# =============================================================================
+
+# Set in each worker by _set_inputs: the frames and key indexes the mask
+# functions below read from
+_inputs = {}
+
+def _set_inputs(inputs):
+    _inputs.clear()
+    _inputs.update(inputs)
+
+def _run_masks(func, rows):
+    return func(rows, _inputs)
+
+# Run func(rows, inputs) -> {mask name: bool array over those rows} for each
+# state and scatter the results into full-length masks
+#   labels      : {frame name: state of each row}, e.g. {'hauser': ..., 'usgs': ...}
+#   masks       : {mask name: frame name it covers}
+#   max_workers : defaults to every core; 1 runs func once over all rows here
+# Rows without a state go through as one more group
+def run_by_state(func, inputs, labels, masks, max_workers=None):
+    labels = {frame: np.asarray(states, dtype=object) for frame, states in labels.items()}
+    if max_workers == 1:
+        return func({frame: np.arange(len(states)) for frame, states in labels.items()}, inputs)
+
+    states = sorted(set().union(*(pd.unique(states[pd.notna(states)]) for states in labels.values())))
+    groups = [{frame: np.flatnonzero(states == state) for frame, states in labels.items()}
+              for state in states]
+    groups.append({frame: np.flatnonzero(pd.isna(states)) for frame, states in labels.items()})
+    groups = [rows for rows in groups if any(len(positions) for positions in rows.values())]
+
+    full = {name: np.zeros(len(labels[frame]), dtype=bool) for name, frame in masks.items()}
+    if not groups:
+        return full
+
+    # The initializer hands the inputs to each worker: inherited as they are
+    # in memory where workers are forked, pickled once per worker otherwise
+    max_workers = min(max_workers or os.cpu_count() or 1, len(groups))
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=pool_context(),
+                             initializer=_set_inputs, initargs=(inputs,)) as pool:
+        futures = [pool.submit(_run_masks, func, rows) for rows in groups]
+        for rows, future in zip(groups, futures):
+            for name, mask in future.result().items():
+                full[name][rows[masks[name]]] = mask
+    return full
+
+# Well count per state, e.g. hauser_2024_grouped, in alphabetical order of
+# state (a categorical state column would otherwise group in category order)
+def state_counts(df, state_col, name):
+    counts = df.groupby(state_col, observed=True).size().reset_index(name=name)
+    return counts.sort_values(state_col, key=lambda states: states.astype(str), kind='stable',
+                              ignore_index=True)
+
+# =============================================================================
+# AIM 1: wells listed as plugged in FracTracker (or the Kansas all wells ds)
+# =============================================================================
+
+def plugged_mask(rows, inputs):
+    hauser = inputs['hauser'].iloc[rows['hauser']]
+    plugged = is_matched(hauser, {'ft' : inputs['plugged_ft'], 'ks' : inputs['plugged_ks']},
+                         plugged_match_keys, default_plugged_match_key, 'plugged',
+                         plugged_linkage_rules, inputs['plugged_index'])
+    return {'plugged' : plugged.to_numpy()}
+
+# Split Hauser wells into (still orphaned, actually plugged), like
+# wells_keys.remove_plugged
+def remove_plugged_by_state(hauser, plugged_ft, plugged_ks, max_workers=None):
+    sources = {'ft' : plugged_ft, 'ks' : plugged_ks}
+    inputs = {'hauser' : hauser, 'plugged_ft' : plugged_ft, 'plugged_ks' : plugged_ks,
+              'plugged_index' : match_key_index(sources, plugged_match_keys,
+                                                default_plugged_match_key, 'plugged')}
+    plugged = run_by_state(plugged_mask, inputs, {'hauser' : hauser['state']},
+                           {'plugged' : 'hauser'}, max_workers)['plugged']
+    return hauser[~plugged].copy(), hauser[plugged].copy()
+
+# =============================================================================
+# AIM 2: still-orphaned wells that aren't in USGS
+# =============================================================================
+
+def newly_orphaned_mask(rows, inputs):
+    hauser = inputs['hauser'].iloc[rows['hauser']]
+    found = is_matched(hauser, inputs['usgs'], usgs_match_keys, default_usgs_match_key, 'usgs',
+                       usgs_linkage_rules, inputs['usgs_index'])
+    return {'newly_orphaned' : ~found.to_numpy()}
+
+# (Hauser wells with a hauser_status column, newly orphaned wells: Indiana,
+# then Kansas, then everyone else)
+def newly_orphaned_by_state(hauser_f, usgs, max_workers=None):
+    inputs = {'hauser' : hauser_f, 'usgs' : usgs,
+              'usgs_index' : match_key_index(usgs, usgs_match_keys, default_usgs_match_key, 'usgs')}
+    mask = run_by_state(newly_orphaned_mask, inputs, {'hauser' : hauser_f['state']},
+                        {'newly_orphaned' : 'hauser'}, max_workers)['newly_orphaned']
+
+    is_indiana = (hauser_f['state'] == 'Indiana').to_numpy()
+    is_kansas = (hauser_f['state'] == 'Kansas').to_numpy()
+    newly_orphaned = pd.concat([hauser_f[mask & is_indiana],
+                                hauser_f[mask & is_kansas],
+                                hauser_f[mask & ~is_indiana & ~is_kansas]])
+
+    hauser_f = hauser_f.copy()
+    hauser_f['hauser_status'] = 'Orphaned since USGS'
+    hauser_f.loc[mask, 'hauser_status'] = 'Newly orphaned'
+    return hauser_f, newly_orphaned
+
+# =============================================================================
+# AIM 3: USGS wells that have been plugged since
+# =============================================================================
+
+# USGS wells that aren't in Hauser 2024 (before the plugged wells were taken
+# out), are plugged in FT, aren't actually plugged wells still listed as
+# orphaned and aren't USGS-assigned APIs; Kansas wells instead aren't in
+# Hauser on county, well name & operator and are plugged in the all wells
+# ds on lease, well number and township/range/section (exactly or fuzzy)
+def newly_plugged_mask(rows, inputs):
+    usgs = inputs['usgs'].iloc[rows['usgs']]
+    hauser, plugged_ft, plugged_ks = inputs['hauser'], inputs['plugged_ft'], inputs['plugged_ks']
+
+    newly_plugged = (~usgs['api_key'].isin(hauser['api_key']) &
+                     usgs['api_key'].isin(plugged_ft['api_key']) &
+                     ~usgs['api_key'].isin(inputs['actually_plugged']['api_key']) &
+                     ~usgs['api_synthetic']).to_numpy(dtype=bool)
+
+    ks_newly_plugged = np.zeros(len(usgs), dtype=bool)
+    is_ks_usgs = (usgs['State'] == 'Kansas').to_numpy()
+    if is_ks_usgs.any():
+        ks_usgs = usgs[is_ks_usgs]
+        ks_hauser = hauser[hauser['state'] == 'Kansas']
+        ks_in_hauser = ks_usgs.set_index(['County', 'Well name', 'Well number']).index.isin(
+            ks_hauser.set_index(['county', 'well_name', 'operator']).index)
+        ks_in_hauser |= is_linked(ks_usgs, ks_hauser, swap_rule(usgs_linkage_rules['Kansas'])).to_numpy()
+        ks_newly = ks_usgs[~ks_in_hauser]
+
+        ks_plugged = ks_newly.set_index(['Well name', 'Well number', 'Township', 'Range', 'Section']).index.isin(
+            plugged_ks.set_index(['LEASE', 'WELL', 'TOWNSHIP', 'RANGE', 'SECTION']).index)
+        ks_plugged |= is_linked(ks_newly, plugged_ks, ks_usgs_plugged_rule).to_numpy()
+
+        ks_positions = np.flatnonzero(is_ks_usgs)[~ks_in_hauser]
+        ks_newly_plugged[ks_positions[ks_plugged]] = True
+
+    return {'newly_plugged' : newly_plugged, 'ks_newly_plugged' : ks_newly_plugged}
+
+# Newly plugged USGS wells (API matches first, then Kansas)
+def newly_plugged_by_state(usgs, hauser, actually_plugged, plugged_ft, plugged_ks, max_workers=None):
+    inputs = {'usgs' : usgs, 'hauser' : hauser, 'actually_plugged' : actually_plugged,
+              'plugged_ft' : plugged_ft, 'plugged_ks' : plugged_ks}
+    masks = run_by_state(newly_plugged_mask, inputs, {'usgs' : usgs['State']},
+                         {'newly_plugged' : 'usgs', 'ks_newly_plugged' : 'usgs'}, max_workers)
+    return pd.concat([usgs[masks['newly_plugged']], usgs[masks['ks_newly_plugged']]],
+                     ignore_index=True)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_api.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: clean API numbers from every source in one vectorized pass and
+#             turn them into int64 keys so merges don't compare strings
+
+import numpy as np
+import pandas as pd
+
+# Dashes, commas, whitespace & a trailing '.0' left over from float parsing
+api_junk = r'[\s,-]|\.0+$'
+
+# Strip formatting from an API column, missing/empty values become NA
+def clean_api(values):
+    cleaned = values.astype('string').str.replace(api_junk, '', regex=True)
+    return cleaned.mask(cleaned == '')
+
+# Canonical API for each well:
+#   api_10        : cleaned API, cut to 10 digits, with the state fixes applied
+#                   (zfill for CA & FL, state code prefix for PA, TN, TX & WY;
+#                   the state adapters own these, see wells_adapters.api_rules)
+#   api_key       : api_10 as an int64; IDs that aren't all digits (USGS 'ID…'
+#                   and 'D…' values) get a negative hash of the ID instead, so
+#                   they only ever match the same ID
+#   api_synthetic : True for those non-numeric IDs
+# `states` is an optional column of full state names aligned with `values`;
+# zfill_states and state_prefixes ({state: missing state code}) are the
+# fixes applied to those states
+def normalize_api(values, states=None, zfill_states=(), state_prefixes=None):
+    api = clean_api(values)
+    numeric = api.str.fullmatch(r'\d+').fillna(False).astype(bool)
+
+    # Cut to 10 digits (drops 12/14-digit sidetrack & completion codes)
+    api = api.mask(numeric, api.str[:10])
+
+    if states is not None:
+        zfill = numeric & states.isin(list(zfill_states))
+        api = api.mask(zfill, api.str.zfill(10))
+        for state, prefix in (state_prefixes or {}).items():
+            # Only add the state code where it's actually missing
+            prefixed = numeric & (states == state) & (api.str.len() <= 10 - len(prefix))
+            api = api.mask(prefixed, prefix + api)
+
+    key = api.where(numeric).astype('Int64')
+    synthetic = api.notna() & ~numeric
+    if synthetic.any():
+        hashed = pd.util.hash_array(api[synthetic].to_numpy(dtype=object))
+        key[synthetic] = -(hashed >> np.uint64(1)).astype(np.int64) - 1
+
+    return pd.DataFrame({'api_10': api.astype(object).where(api.notna(), np.nan),
+                         'api_key': key,
+                         'api_synthetic': synthetic},
+                        index=values.index)
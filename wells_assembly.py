@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_assembly.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: map each source's columns onto the Hauser df fields and stack
+#             the states together with a single concat
+
+import pandas as pd
+
+# Rename a source's columns to the required fields in one go
+#   fields          : {required field: source column}, like state_fields_dict[state]
+#   required_fields : columns of the result, in order; unmapped or missing
+#                     source columns come back as NaN
+#   state           : if given, fills the 'state' column with this name
+def standardize_state(df, fields, required_fields, state=None):
+    mapped = {std_col: state_col for std_col, state_col in fields.items()
+              if std_col in required_fields and state_col in df.columns}
+    clean_df = df[list(mapped.values())].set_axis(list(mapped), axis=1)
+    clean_df = clean_df.reindex(columns=required_fields)
+    if state is not None:
+        clean_df['state'] = state
+    return clean_df
+
+# Define a function to standardize and combine datasets into one
+# (each state is renamed on its own and everything is concatenated once)
+def standardize_and_combine(states_data, state_fields_dict, required_fields):
+    clean_dfs = []
+    for state_name, state_df in states_data.items():
+        print('---------------------')
+        print('Cleaning ' + state_name)
+        clean_df = standardize_state(state_df, state_fields_dict[state_name],
+                                     required_fields, state=state_name)
+        print(state_name + ": " + str(len(clean_df)) + " orphaned wells in 2024")
+        print('')
+        clean_dfs.append(clean_df)
+
+    return pd.concat(clean_dfs, ignore_index=True)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_cbg.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: count orphaned, plugged and unplugged wells in every 2021 Census
+#             Block Group (CBG) in the country in one pass, join the counts to
+#             the EJ dataset, and write the per-state files Thesis.Rmd reads
+#             (replaces the per-state st_join / st_intersection chunks)
+
+import argparse
+import os
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from census_boundaries import load_block_groups, block_group_states, load_states, store_dir
+
+# EJ columns Thesis.Rmd drops before the join
+ej_drop_columns = ['AREALAND', 'AREAWATER', 'Shape_Length', 'Shape_Area']
+
+# FTA categories used for plugged vs unplugged wells (same as Thesis.Rmd)
+fta_categories = ['Production Well', 'Plugged', 'Other / Unknown',
+                  'Injection / Storage / Service']
+
+# =============================================================================
+# Assign wells to block groups
+# =============================================================================
+
+# Every state's 2021 block groups from the boundary store, in WGS84
+def load_national_block_groups(year=2021, store_dir=store_dir):
+    block_groups = pd.concat([load_block_groups(statefp, year=year, store_dir=store_dir)
+                              for statefp in block_group_states(year=year, store_dir=store_dir)],
+                             ignore_index=True)
+    return gpd.GeoDataFrame(block_groups, geometry='geometry').to_crs(4326)
+
+# GEOID of the block group each point falls in (None if outside all of them)
+# One STRtree over the block group polygons, queried with all points at once;
+# a point on a shared edge goes to the first block group it touches
+def assign_block_groups(points, block_groups):
+    polygons = block_groups.geometry.values
+    tree = shapely.STRtree(polygons)
+    point_idx, polygon_idx = tree.query(np.asarray(points), predicate='intersects')
+    point_idx, first = np.unique(point_idx, return_index=True)
+
+    geoids = np.full(len(points), None, dtype=object)
+    geoids[point_idx] = block_groups['GEOID'].to_numpy(dtype=object)[polygon_idx[first]]
+    return geoids
+
+# Orphaned / Plugged / Unplugged counts per GEOID from one spatial query
+#   wells     : orphaned wells (Hauser df) as a GeoDataFrame
+#   all_wells : FTA wells as a GeoDataFrame with an 'ft_category' column
+def count_wells_by_cbg(wells, all_wells, block_groups):
+    all_wells = all_wells[all_wells['ft_category'].isin(fta_categories)]
+    points = np.concatenate([wells.to_crs(4326).geometry.values,
+                             all_wells.to_crs(4326).geometry.values])
+    kind = np.concatenate([np.full(len(wells), 'Orphaned', dtype=object),
+                           np.where(all_wells['ft_category'] == 'Plugged', 'Plugged', 'Unplugged')])
+
+    geoids = assign_block_groups(points, block_groups)
+    assigned = pd.notna(geoids)
+    counts = pd.crosstab(pd.Series(geoids[assigned], name='GEOID'),
+                         pd.Series(kind[assigned], name=None))
+    return counts.reindex(columns=['Orphaned', 'Plugged', 'Unplugged'], fill_value=0)
+
+# =============================================================================
+# Join counts to the EJ dataset
+# =============================================================================
+
+# One row per block group with at least one orphaned, plugged or unplugged
+# well: block group attributes, EJ indicators, POP_DENSITY and the counts
+def build_cbg_wells(wells, all_wells, ej, year=2021, store_dir=store_dir):
+    block_groups = load_national_block_groups(year=year, store_dir=store_dir)
+    counts = count_wells_by_cbg(wells, all_wells, block_groups)
+    states = load_states(year=year, store_dir=store_dir)[['STATEFP', 'STUSPS']]
+
+    # Drop the EJ area & shape columns and clean GEOID_12 (same as Thesis.Rmd)
+    ej = ej.drop(columns=ej_drop_columns, errors='ignore')
+    ej['GEOID_12'] = ej['GEOID_12'].astype(str).str[2:-1]
+
+    cbg = pd.DataFrame(block_groups.drop(columns='geometry'))
+    cbg = cbg.merge(pd.DataFrame(states), how='left', on='STATEFP')
+    cbg = cbg.merge(ej, how='left', left_on='GEOID', right_on='GEOID_12')
+    cbg['POP_DENSITY'] = (cbg['POP'] / cbg['ALAND']) * 1609.34
+    cbg = cbg.merge(counts, how='inner', left_on='GEOID', right_index=True)
+    return cbg.reset_index(drop=True)
+
+# Write one CSV per state (e.g. Contains_Within/TX.csv) and, if national_path
+# is given, a national file; keep that one out of out_dir, since Thesis.Rmd
+# reads every CSV in the folder and would count each well twice
+def write_cbg_wells(cbg, out_dir, national_path=None, state_col='STUSPS'):
+    os.makedirs(out_dir, exist_ok=True)
+    if national_path is not None:
+        cbg.to_csv(national_path, index=False, na_rep='')
+    for st_abbrev, state_cbg in cbg.groupby(state_col):
+        state_cbg.to_csv(os.path.join(out_dir, st_abbrev + '.csv'), index=False, na_rep='')
+
+#%%
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Count wells per Census block group')
+    parser.add_argument('--data-dir', default=os.getcwd(),
+                        help='thesis data folder with the Thesis.Rmd inputs (default: current folder)')
+    parser.add_argument('--store-dir', default=store_dir,
+                        help='boundary store, usually Boundaries/ in the WELLS folder '
+                             f'(default: {store_dir})')
+    args = parser.parse_args()
+
+    # Block groups come from the boundary store in the WELLS folder
+    boundaries = os.path.abspath(args.store_dir)
+
+    # Run from the thesis data folder (same inputs as Thesis.Rmd)
+    os.chdir(args.data_dir)
+
+    wells = gpd.read_parquet('Hauser_2024/hauser_2024')
+    ej = pd.read_csv('EJ/acs_ej_final.csv')
+    all_wells = pd.read_csv('FTA/wells_250131.csv',
+                            usecols=['stusps', 'ft_category', 'latitude', 'longitude'])
+    all_wells = all_wells.dropna(subset=['latitude', 'longitude'])
+    all_wells = gpd.GeoDataFrame(all_wells,
+                                 geometry=gpd.points_from_xy(all_wells.longitude, all_wells.latitude),
+                                 crs="EPSG:4326")
+
+    cbg_wells = build_cbg_wells(wells, all_wells, ej, store_dir=boundaries)
+    write_cbg_wells(cbg_wells, 'Contains_Within', national_path='Contains_Within_US.csv')
+    print(cbg_wells[['Orphaned', 'Plugged', 'Unplugged']].sum())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_coords.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: convert projected coordinates (e.g. Indiana's UTM) to lat/lon
+#             for whole columns at once
+
+from functools import lru_cache
+
+import numpy as np
+from pyproj import Transformer
+
+# =============================================================================
+# Transformers
+# =============================================================================
+
+# One transformer per CRS pair, reused across calls
+# (always_xy so input is easting/northing and output is lon/lat, whatever
+# axis order the EPSG definition uses)
+@lru_cache(maxsize=None)
+def get_transformer(src_crs, dst_crs='EPSG:4326'):
+    return Transformer.from_crs(src_crs, dst_crs, always_xy=True)
+
+# Transform arrays of x/y in `crs` to arrays of lon/lat
+def to_lonlat(x, y, crs):
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    return get_transformer(crs).transform(x, y)
+
+# =============================================================================
+# Coordinate normalization for a state download
+# =============================================================================
+
+# Fill lat/lon columns from projected x/y columns
+#   crs      : CRS the x/y columns are in, e.g. "EPSG:32616" (UTM Zone 16N)
+#   fallback : optional (crs, lon_min, lon_max); points whose longitude lands
+#              in [lon_min, lon_max) are transformed again through that CRS
+#              (Indiana: Zone 16N first, then Zone 17N between -84 and -78)
+# Adds a 'source_crs' column saying which CRS each point was converted from
+def project_to_latlon(df, x_col, y_col, crs, lat_col='Latitude', lon_col='Longitude',
+                      fallback=None):
+    x = df[x_col].to_numpy(dtype='float64')
+    y = df[y_col].to_numpy(dtype='float64')
+    lon, lat = to_lonlat(x, y, crs)
+    source_crs = np.full(len(df), crs, dtype=object)
+
+    if fallback is not None:
+        fallback_crs, lon_min, lon_max = fallback
+        retry = (lon >= lon_min) & (lon < lon_max)
+        if retry.any():
+            lon[retry], lat[retry] = to_lonlat(x[retry], y[retry], fallback_crs)
+            source_crs[retry] = fallback_crs
+
+    df[lat_col] = lat
+    df[lon_col] = lon
+    df['source_crs'] = source_crs
+    return df
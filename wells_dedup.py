@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_dedup.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: resolve FracTracker wells that are listed more than once under
+#             the same API number without looping over groups in Python
+
+import numpy as np
+import pandas as pd
+
+from wells_neighbors import groups_within
+
+# Status priority when one API has several entries
+status_priority = {'PLUGGED' : 2,
+                   'ORPHANED' : 1}
+
+# Suggested tolerance_m for deduplicate_wells: entries of one API that are
+# all within this many meters of each other are treated as the same location
+# (rounding, datum shifts) in step 2. Off by default (exact lat/lon, as in
+# the thesis counts)
+location_tolerance_m = 100
+
+# =============================================================================
+# [STEP 3]: Keep one row per API, prioritizing plugged then orphaned
+# =============================================================================
+
+# Positions of the row to keep for each API, in API order, like
+# ft.groupby(api_col).apply(prioritize_status) did:
+#   (3a) keep the last entry listed as plugged
+#   (3b) if none is plugged, keep the last entry listed as orphaned
+#   (3c) if neither, keep the last entry
+def _priority_winners(api_codes, priority):
+    # Stable sort by (API, priority) so the original order breaks ties;
+    # the last row of each API is then the one to keep
+    order = np.lexsort((priority, api_codes))
+    sorted_codes = api_codes[order]
+    last = np.ones(len(order), dtype=bool)
+    last[:-1] = sorted_codes[1:] != sorted_codes[:-1]
+    return order[last]
+
+# =============================================================================
+# All three steps in one pass
+# =============================================================================
+
+# Methodology:
+# [STEP 1]: If they have the same api, well status, lat, and lon keep the last entry
+# [STEP 2]: If an api is still listed more than once, delete all of its entries
+#           (with tolerance_m: only if its entries aren't all within
+#           tolerance_m of each other; otherwise they go on to step 3)
+# [STEP 3]: Of what's left, keep plugged > orphaned > last entry per api
+# Every decision is made on arrays (one hash per row, one api code per row)
+# and the frame is only sliced once at the end. Returns the surviving rows
+# (sorted by api, fresh index) and an audit table of what each step removed.
+def deduplicate_wells(df, api_col='api_num', status_col='well_status',
+                      lat_col='latitude', lon_col='longitude', tolerance_m=None):
+    n_rows = len(df)
+    api_codes, api_uniques = pd.factorize(df[api_col], sort=True)
+
+    # [STEP 1]: last entry of each (api, status, lat, lon) combination
+    row_hash = pd.util.hash_pandas_object(df[[api_col, status_col, lat_col, lon_col]], index=False)
+    keep = ~row_hash.duplicated(keep='last').to_numpy()
+    removed_1 = n_rows - keep.sum()
+
+    # [STEP 2]: APIs that still have more than one entry
+    counts = np.bincount(api_codes[keep & (api_codes >= 0)], minlength=len(api_uniques))
+    repeated = np.zeros(n_rows, dtype=bool)
+    repeated[api_codes >= 0] = counts[api_codes[api_codes >= 0]] > 1
+
+    # Spare the APIs whose entries are all within tolerance_m of each other
+    # (one KD-tree query over every repeated entry, see wells_neighbors.py)
+    if tolerance_m:
+        rows = np.flatnonzero(keep & repeated)
+        within = groups_within(df[lat_col].to_numpy()[rows], df[lon_col].to_numpy()[rows],
+                               api_codes[rows], tolerance_m)
+        repeated[rows[within]] = False
+
+    removed_2 = (keep & repeated).sum()
+    keep &= ~repeated
+
+    # [STEP 3]: status priority within each API (rows with no API drop here)
+    positions = np.flatnonzero(keep & (api_codes >= 0))
+    priority = df[status_col].map(status_priority).astype('float64').fillna(0).to_numpy()[positions]
+    positions = positions[_priority_winners(api_codes[positions], priority)]
+    removed_3 = keep.sum() - len(positions)
+
+    audit = pd.DataFrame({
+        'step' : ['Step 1', 'Step 2', 'Step 3'],
+        'rule' : ['Exact duplicate of api, status, lat & lon (kept last entry)',
+                  'Same api listed more than once (deleted all entries)' if not tolerance_m else
+                  f'Same api more than {tolerance_m:g} m apart (deleted all entries)',
+                  'Same api, lower status priority or no api'],
+        'rows_removed' : [removed_1, removed_2, removed_3]})
+    audit['rows_remaining'] = n_rows - audit['rows_removed'].cumsum()
+
+    return df.iloc[positions].reset_index(drop=True), audit
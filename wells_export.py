@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_export.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: write the well layers (Hauser 2024, newly plugged, newly
+#             orphaned) as GeoParquet, one file per state, instead of ESRI
+#             Shapefiles (10-character field names, 2 GB limit, slow to write
+#             and to st_read), plus an optional FlatGeobuf for GIS users
+
+# Layout, for each layer:
+#   <folder>/<layer>/<ST>.parquet   one file per state (USPS abbreviation),
+#                                   rows in Hilbert-curve order
+#   <folder>/<layer>.fgb            every state, with a spatial index (optional)
+# Each Parquet row group stores min / max statistics for every column and a
+# bbox column, so readers skip the row groups outside a box, e.g.
+#   gpd.read_parquet('Hauser_2024/hauser_2024/TX.parquet')                one state
+#   gpd.read_parquet('Hauser_2024/hauser_2024', bbox=(-104, 31, -100, 33))  one box
+#   gpd.read_file('Hauser_2024/hauser_2024.fgb', bbox=(-104, 31, -100, 33))
+# and in R, sfarrow::st_read_parquet() for a file or st_read() for the .fgb
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from wells_states import state_usps
+
+# Rows per Parquet row group: small enough that a bbox read skips most of a
+# big state, big enough that the statistics stay a small part of the file
+row_group_rows = 10_000
+
+# File name for wells without a state
+unknown_state = 'unknown'
+
+# =============================================================================
+# Arrow schema
+# =============================================================================
+
+# Arrow type of every column of the layer, inferred from all of its rows.
+# Each file would otherwise infer its own: a column that is null in every row
+# of one state comes out null-typed there, and readers that take the schema
+# from one file (arrow::open_dataset) then read the column with the wrong
+# type. Columns that are null in every row of the layer are typed as strings
+def layer_schema(gdf):
+    attrs = pd.DataFrame(gdf.drop(columns=gdf.geometry.name))
+    schema = pa.Schema.from_pandas(attrs, preserve_index=False)
+    for i, arrow_field in enumerate(schema):
+        if pa.types.is_null(arrow_field.type):
+            schema = schema.set(i, arrow_field.with_type(pa.string()))
+    return schema
+
+# `gdf` with its object columns (the only ones whose type depends on the
+# rows) held as Arrow arrays of the schema's type, so every file gets it
+def apply_layer_schema(gdf, schema):
+    gdf = gdf.copy()
+    for col in gdf.columns:
+        if col != gdf.geometry.name and gdf[col].dtype == object:
+            gdf[col] = pd.array(gdf[col], dtype=pd.ArrowDtype(schema.field(col).type))
+    return gdf
+
+# USPS abbreviation for a state name or abbreviation
+def state_file_name(state):
+    if state == unknown_state or state in state_usps.values():
+        return state
+    if state in state_usps:
+        return state_usps[state]
+    raise ValueError(f'no USPS abbreviation for state: {state!r}')
+
+# =============================================================================
+# GeoParquet
+# =============================================================================
+
+# Points close together on the map end up close together in the file (and
+# in the same row groups); empty points go last
+def spatial_order(gdf):
+    empty = (gdf.geometry.is_empty | gdf.geometry.isna()).to_numpy()
+    hilbert = np.zeros(len(gdf), dtype=np.int64)
+    if (~empty).any():
+        located = gdf.geometry[~empty]
+        hilbert[~empty] = located.hilbert_distance(total_bounds=located.total_bounds)
+    return gdf.iloc[np.lexsort((hilbert, empty))]
+
+# Write `gdf` to out_dir as one GeoParquet file per state in `state_col`
+# (state names or abbreviations), all with the layer's schema; the folder is
+# replaced, so states that dropped out of a run don't linger. Returns
+# {file name: rows}
+def write_state_partitions(gdf, out_dir, state_col, row_group_rows=row_group_rows):
+    states = gdf[state_col].astype('string').fillna(unknown_state).to_numpy()
+    names = {state: state_file_name(state) for state in np.unique(states)}
+    gdf = apply_layer_schema(gdf, layer_schema(gdf))
+
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir)
+
+    written = {}
+    for state, name in names.items():
+        state_gdf = spatial_order(gdf[states == state])
+        state_gdf.to_parquet(os.path.join(out_dir, name + '.parquet'), index=False,
+                             write_covering_bbox=True, row_group_size=row_group_rows)
+        written[name + '.parquet'] = len(state_gdf)
+    return written
+
+# =============================================================================
+# FlatGeobuf
+# =============================================================================
+
+# One FlatGeobuf file with a packed R-tree, for QGIS / ArcGIS / st_read
+def write_flatgeobuf(gdf, path):
+    if os.path.exists(path):
+        os.remove(path)
+    spatial_order(gdf).to_file(path, driver='FlatGeobuf', SPATIAL_INDEX='YES')
+    return path
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_io.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: read the FracTracker, USGS and state download CSVs once, keeping
+#             only the columns the pipeline uses, and cache them as Parquet so
+#             later runs skip the CSV parsing
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv
+from pyarrow import parquet as pq
+
+from wells_schema import apply_schema, ft_schema, usgs_schema
+from wells_states import state_fields_dict, state_extra_columns
+
+# Folder for the Parquet cache, relative to the WELLS directory
+cache_dir = 'Cache'
+
+# =============================================================================
+# Columns & dtypes for each source
+# =============================================================================
+
+# FracTracker fields that are actually used in the pipeline; repeated text
+# is read straight into categoricals (see wells_schema.py). Coordinates stay
+# float64: dedup compares exact lat/lon, and float32 would merge entries a
+# few meters apart
+ft_dtypes = {'api_num' : 'str',
+             'stusps' : 'category',
+             'well_status' : 'category',
+             'latitude' : 'float64',
+             'longitude' : 'float64',
+             'county' : 'category',
+             'well_name' : 'str',
+             'operator' : 'category',
+             'spud_date' : 'str'}
+
+# USGS is exported as-is at the end, so every column is kept; these are the
+# ones used for matching
+usgs_dtypes = {'Well identifier' : 'str',
+               'State' : 'category',
+               'County' : 'category',
+               'Well name' : 'str',
+               'Well number' : 'str',
+               'Township' : 'str',
+               'Range' : 'str',
+               'Section' : 'str',
+               'Latitude' : 'float64',
+               'Longitude' : 'float64'}
+
+# Kansas all wells dataset
+ks_wells_columns = ['API_NUMBER', 'LEASE', 'WELL', 'TOWNSHIP', 'RANGE', 'SECTION', 'STATUS2']
+
+# =============================================================================
+# Parquet cache
+# =============================================================================
+
+# Hash the contents of a file in 8 MB blocks
+def file_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(8 * 1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Arrow types for the dtype names used above
+# ('category' is dictionary-encoded by pyarrow, so the strings are never
+# materialized one per row)
+arrow_types = {'str' : pa.string(),
+               'category' : pa.dictionary(pa.int32(), pa.string()),
+               'float32' : pa.float32(),
+               'float64' : pa.float64(),
+               'int64' : pa.int64()}
+
+# Only ask for columns that are actually in the file
+def present_columns(path, usecols=None, dtype=None):
+    if usecols is not None or dtype is not None:
+        header = pd.read_csv(path, nrows=0).columns
+        if usecols is not None:
+            usecols = [col for col in header if col in set(usecols)]
+        if dtype is not None:
+            dtype = {col: typ for col, typ in dtype.items() if col in header}
+    return usecols, dtype
+
+# pyarrow options for reading `usecols` with `dtype` (shared with the chunked
+# reader in wells_stream.py)
+def csv_convert_options(usecols=None, dtype=None):
+    return csv.ConvertOptions(
+        include_columns=usecols,
+        column_types={col: arrow_types[typ] for col, typ in (dtype or {}).items()},
+        strings_can_be_null=True)
+
+# Read a CSV with pyarrow, or load it from the cache if this exact file has
+# been read with these exact options before
+# (dtypes are given to pyarrow directly so text columns like API numbers are
+# never parsed as numbers and lose their leading zeros)
+# (`schema` is applied before caching, see wells_schema.apply_schema)
+def read_csv_cached(path, usecols=None, dtype=None, schema=None, cache_dir=cache_dir):
+    usecols, dtype = present_columns(path, usecols, dtype)
+
+    # Cache file: <file stem>-<read options hash>-<file contents hash>.parquet
+    options = json.dumps({'usecols': usecols, 'dtype': dtype, 'schema': schema}, sort_keys=True)
+    prefix = (os.path.splitext(os.path.basename(path))[0] + '-'
+              + hashlib.blake2b(options.encode(), digest_size=8).hexdigest() + '-')
+    cache_path = os.path.join(cache_dir, prefix + file_hash(path) + '.parquet')
+
+    if os.path.exists(cache_path):
+        return pq.read_table(cache_path, memory_map=True).to_pandas(split_blocks=True, self_destruct=True)
+
+    convert_options = csv_convert_options(usecols, dtype)
+    # (self_destruct frees each Arrow column as soon as it's converted)
+    df = csv.read_csv(path, convert_options=convert_options).to_pandas(split_blocks=True, self_destruct=True)
+    if schema is not None:
+        df = apply_schema(df, schema)
+
+    # Write the new cache file and clear out stale ones for the same source
+    # read with the same options (other reads of it keep their own entries)
+    os.makedirs(cache_dir, exist_ok=True)
+    for old in os.listdir(cache_dir):
+        if old.startswith(prefix) and old.endswith('.parquet'):
+            os.remove(os.path.join(cache_dir, old))
+    df.to_parquet(cache_path, index=False)
+    return df
+
+# =============================================================================
+# Readers for each source
+# =============================================================================
+
+def read_fractracker(path, cache_dir=cache_dir):
+    return read_csv_cached(path, usecols=list(ft_dtypes), dtype=ft_dtypes, schema=ft_schema,
+                           cache_dir=cache_dir)
+
+def read_usgs(path, cache_dir=cache_dir):
+    return read_csv_cached(path, dtype=usgs_dtypes, schema=usgs_schema, cache_dir=cache_dir)
+
+def read_ks_wells(path, cache_dir=cache_dir):
+    return read_csv_cached(path, usecols=ks_wells_columns, dtype={'API_NUMBER': 'str'},
+                           cache_dir=cache_dir)
+
+# State downloads: only the mapped columns plus any merge keys, with the API
+# column read as text so leading zeros survive
+def read_state_download(path, state, cache_dir=cache_dir):
+    fields = state_fields_dict[state]
+    usecols = list(fields.values()) + state_extra_columns.get(state, [])
+    dtype = {fields['api_10']: 'str'}
+    return read_csv_cached(path, usecols=usecols, dtype=dtype, cache_dir=cache_dir)
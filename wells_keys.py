@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_keys.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: hash multi-column matching keys (operator + well name, lease +
+#             well number + township/range/section, API...) into one int64
+#             column, so matching wells across datasets (plugged wells, USGS)
+#             is a single isin
+
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from wells_linkage import is_linked
+from wells_plss import plss_defaults, plss_text
+from wells_states import (plugged_match_keys, default_plugged_match_key,
+                          usgs_match_keys, default_usgs_match_key,
+                          plugged_linkage_rules, usgs_linkage_rules)
+
+# =============================================================================
+# Hashed keys
+# =============================================================================
+
+# Text version of a key column, so 12, 12.0 and '12' all give the same key
+def _key_text(values):
+    if pd.api.types.is_numeric_dtype(values):
+        numbers = values.astype('float64')
+        integral = numbers.isna() | (numbers % 1 == 0)
+        if integral.all():
+            return numbers.astype('Int64').astype('string')
+    return values.astype('string')
+
+# How a rule's key columns can be written before hashing ('normalize' in
+# wells_states.plugged_match_keys); Kansas townships are all south
+key_normalizers = {'township': partial(plss_text, default_dir=plss_defaults['KS']['township_dir']),
+                   'range': plss_text,
+                   'section': plss_text}
+
+# One int64 per row from several columns; `tag` keeps keys built under
+# different rules (e.g. Indiana vs API) from matching each other, and
+# `normalize` (one name from key_normalizers or None per column) rewrites
+# columns that are written differently on the two sides
+def hash_key(df, columns, tag='', normalize=None):
+    normalize = normalize or [None] * len(columns)
+    keys = pd.DataFrame({i: _key_text(df[col] if kind is None else
+                                      key_normalizers[kind](df[col]).set_axis(df.index))
+                         for i, (col, kind) in enumerate(zip(columns, normalize))}, index=df.index)
+    keys['tag'] = tag
+    return pd.Series(pd.util.hash_pandas_object(keys, index=False).to_numpy().view(np.int64),
+                     index=df.index)
+
+# =============================================================================
+# Matching Hauser wells to other datasets
+# =============================================================================
+
+# Each set of rules (plugged_match_keys, usgs_match_keys) gives, per state,
+# the Hauser columns and the matching columns on the other side (`side`);
+# the Hauser keys are built the same way for every comparison. Indiana and
+# Kansas are also fuzzy-matched within county / PLSS blocks (linkage rules)
+
+# Matching key for every Hauser well, using each state's rule from
+# `match_keys` (the default rule, usually API key, for everyone else)
+def hauser_match_keys(hauser, match_keys=plugged_match_keys, default=default_plugged_match_key):
+    keys = np.zeros(len(hauser), dtype=np.int64)
+    special = hauser['state'].isin(list(match_keys)).to_numpy()
+    for state, rule in match_keys.items():
+        in_state = (hauser['state'] == state).to_numpy()
+        if in_state.any():
+            keys[in_state] = hash_key(hauser[in_state], rule['hauser'], tag=state,
+                                      normalize=rule.get('normalize')).to_numpy()
+    keys[~special] = hash_key(hauser[~special], default['hauser'], tag='default').to_numpy()
+    return pd.Series(keys, index=hauser.index)
+
+# The other side for a rule: `sources` is one DataFrame, or a dict of them
+# picked by the rule's 'source'
+def _source(sources, rule):
+    return sources[rule['source']] if isinstance(sources, dict) else sources
+
+# Every key the other side could match, built once per rule
+def match_key_index(sources, match_keys, default, side):
+    keys = [hash_key(_source(sources, default), default[side], tag='default')]
+    for state, rule in match_keys.items():
+        keys.append(hash_key(_source(sources, rule), rule[side], tag=state,
+                             normalize=rule.get('normalize')))
+    return np.unique(np.concatenate([key.to_numpy() for key in keys]))
+
+# True for Hauser wells that have a match on the other side, either on the
+# exact keys or, for states in `linkage`, a fuzzy match (wells_linkage.py)
+# (`index`: the match_key_index of `sources`, if it was already built)
+def is_matched(hauser, sources, match_keys, default, side, linkage=None, index=None):
+    if index is None:
+        index = match_key_index(sources, match_keys, default, side)
+    matched = hauser_match_keys(hauser, match_keys, default).isin(index).to_numpy()
+    for state, rule in (linkage or {}).items():
+        in_state = (hauser['state'] == state).to_numpy()
+        other = _source(sources, rule)
+        if 'state_col' in rule:
+            other = other[other[rule['state_col']] == state]
+        if in_state.any() and len(other):
+            matched[in_state] |= is_linked(hauser[in_state], other, rule).to_numpy()
+    return pd.Series(matched, index=hauser.index)
+
+# =============================================================================
+# Plugged wells & USGS
+# =============================================================================
+
+# Split Hauser wells into (still orphaned, actually plugged) with one anti-join
+# `sources`: {'ft': plugged FT wells, 'ks': plugged KS wells}
+def remove_plugged(hauser, sources, match_keys=plugged_match_keys, default=default_plugged_match_key,
+                   linkage=plugged_linkage_rules, index=None):
+    plugged = is_matched(hauser, sources, match_keys, default, 'plugged', linkage, index)
+    return hauser[~plugged].copy(), hauser[plugged].copy()
+
+# True for Hauser wells that are already in the USGS dataset
+def in_usgs(hauser, usgs, match_keys=usgs_match_keys, default=default_usgs_match_key,
+            linkage=usgs_linkage_rules, index=None):
+    return is_matched(hauser, usgs, match_keys, default, 'usgs', linkage, index)
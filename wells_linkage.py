@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_linkage.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: match wells that have no API number (Indiana, Kansas) across
+#             datasets on lease / operator / well number, allowing for small
+#             formatting differences, by only comparing wells in the same
+#             county or PLSS section
+
+# How it works:
+#   1. Normalize the text (case, punctuation, 'NO.', leading zeros...)
+#   2. Block: candidate pairs are every left/right pair with the same block
+#      key (e.g. county + township + range + section), so the work grows with
+#      block sizes instead of left x right
+#   3. Score every candidate pair at once: bigram Dice similarity for names,
+#      exact match for well numbers, averaged over the compared fields
+#   4. Keep each left well's best candidate if it scores >= threshold
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Minimum average similarity for two wells to count as the same well
+link_threshold = 0.8
+
+# =============================================================================
+# Normalize
+# =============================================================================
+
+# Words that don't help tell leases/operators apart
+name_stopwords = ['THE', 'INC', 'LLC', 'CO', 'CORP', 'CORPORATION', 'COMPANY', 'LTD', 'LP']
+stopword_pattern = r'\b(?:' + '|'.join(name_stopwords) + r')\b'
+
+# Lease, operator and county names: upper case, '&' -> AND, punctuation and
+# stopwords removed, single spaces
+def normalize_name(values):
+    text = values.astype('string').str.upper()
+    text = text.str.replace('&', ' AND ', regex=False)
+    text = text.str.replace(r'[^A-Z0-9 ]', ' ', regex=True)
+    text = text.str.replace(stopword_pattern, ' ', regex=True)
+    text = text.str.replace(r'\s+', ' ', regex=True).str.strip()
+    return text.mask(text == '')
+
+# Counties: same as names, without a trailing 'COUNTY'
+def normalize_county(values):
+    text = normalize_name(values).str.replace(r'\s*COUNTY$', '', regex=True)
+    return text.mask(text == '')
+
+# Well numbers: '#1', 'No. 1', '01' and '1' are all '1'
+def normalize_number(values):
+    text = values.astype('string').str.upper()
+    text = text.str.replace(r'^\s*(?:NO\.?|NUMBER|#)\s*', '', regex=True)
+    text = text.str.replace(r'[^A-Z0-9]', '', regex=True)
+    text = text.str.replace(r'(?<![0-9])0+(?=[0-9])', '', regex=True)
+    text = text.str.replace(r'\.0$', '', regex=True)
+    return text.mask(text == '')
+
+# Township / range / section: just the number ('12S', '012', 12.0 -> '12')
+def normalize_plss(values):
+    numbers = pd.to_numeric(values.astype('string').str.extract(r'(\d+)', expand=False), errors='coerce')
+    return numbers.astype('Int64').astype('string')
+
+# Run a normalizer once per distinct value (lease names, counties and PLSS
+# numbers repeat a lot) and spread the results back over the rows
+def _on_distinct(normalize):
+    def normalize_distinct(values):
+        codes, uniques = pd.factorize(values)
+        normalized = normalize(pd.Series(uniques, dtype=object)).to_numpy(dtype=object)
+        result = np.full(len(values), None, dtype=object)
+        result[codes >= 0] = normalized[codes[codes >= 0]]
+        return pd.Series(result, index=values.index, dtype='string')
+    return normalize_distinct
+
+normalizers = {'name': _on_distinct(normalize_name),
+               'county': _on_distinct(normalize_county),
+               'number': _on_distinct(normalize_number),
+               'plss': _on_distinct(normalize_plss)}
+
+# =============================================================================
+# Block
+# =============================================================================
+
+# Every (left row, right row) pair that shares a block key; rows with a
+# missing block key aren't paired with anything
+def candidate_pairs(left_blocks, right_blocks):
+    codes, _ = pd.factorize(pd.concat([left_blocks, right_blocks], ignore_index=True))
+    left_codes, right_codes = codes[:len(left_blocks)], codes[len(left_blocks):]
+
+    order = np.argsort(right_codes, kind='stable')
+    sorted_codes = right_codes[order]
+    start = np.searchsorted(sorted_codes, left_codes, side='left')
+    end = np.searchsorted(sorted_codes, left_codes, side='right')
+    counts = np.where(left_codes < 0, 0, end - start)
+
+    left_idx = np.repeat(np.arange(len(left_codes)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    right_idx = order[np.repeat(start, counts) + offsets]
+    return left_idx, right_idx
+
+# One block key per row from several normalized columns (missing if any
+# part is missing)
+def block_keys(df, columns, kinds):
+    parts = [normalizers[kind](df[col]) for col, kind in zip(columns, kinds)]
+    keys = parts[0]
+    for part in parts[1:]:
+        keys = keys + '|' + part
+    return keys.reset_index(drop=True)
+
+# =============================================================================
+# Score
+# =============================================================================
+
+# Binary bigram matrix (one row per distinct string)
+def _bigram_matrix(strings):
+    vocab = {}
+    rows, cols = [], []
+    for i, text in enumerate(strings):
+        padded = ' ' + text + ' '
+        for gram in {padded[j:j + 2] for j in range(len(padded) - 1)}:
+            rows.append(i)
+            cols.append(vocab.setdefault(gram, len(vocab)))
+    return sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)),
+                             shape=(len(strings), max(len(vocab), 1)))
+
+# Bigram Dice similarity for every (left_text[i], right_text[j]) pair, computed
+# once per distinct pair of strings; 0 where either side is missing
+def name_similarity(left_text, right_text, left_idx, right_idx):
+    codes, uniques = pd.factorize(pd.concat([left_text, right_text], ignore_index=True))
+    left_codes = codes[:len(left_text)][left_idx]
+    right_codes = codes[len(left_text):][right_idx]
+    scores = np.zeros(len(left_idx))
+    valid = (left_codes >= 0) & (right_codes >= 0)
+    if not valid.any():
+        return scores
+
+    pairs, inverse = np.unique(np.stack([left_codes[valid], right_codes[valid]], axis=1),
+                               axis=0, return_inverse=True)
+    grams = _bigram_matrix(list(uniques))
+    sizes = np.asarray(grams.sum(axis=1)).ravel()
+    shared = np.asarray(grams[pairs[:, 0]].multiply(grams[pairs[:, 1]]).sum(axis=1)).ravel()
+    scores[valid] = (2 * shared / (sizes[pairs[:, 0]] + sizes[pairs[:, 1]]))[inverse.ravel()]
+    return scores
+
+# 1 where the normalized values are equal, else 0
+def exact_similarity(left_text, right_text, left_idx, right_idx):
+    left = left_text.to_numpy(dtype=object)[left_idx]
+    right = right_text.to_numpy(dtype=object)[right_idx]
+    return (pd.notna(left) & pd.notna(right) & (left == right)).astype(float)
+
+# =============================================================================
+# Link
+# =============================================================================
+
+# A rule is {'block': [(left_col, right_col, kind), ...],
+#            'compare': [(left_col, right_col, kind), ...]}
+# with kinds from `normalizers`; 'name' fields are compared with bigram Dice,
+# everything else must match exactly
+
+# Best right-hand match for each left row that scores >= threshold:
+# DataFrame of left index label, right index label, score and field scores
+def link_records(left, right, rule, threshold=link_threshold):
+    left_cols, right_cols, kinds = zip(*rule['block'])
+    left_idx, right_idx = candidate_pairs(block_keys(left, left_cols, kinds),
+                                          block_keys(right, right_cols, kinds))
+
+    field_scores = {}
+    for left_col, right_col, kind in rule['compare']:
+        left_text = normalizers[kind](left[left_col]).reset_index(drop=True)
+        right_text = normalizers[kind](right[right_col]).reset_index(drop=True)
+        similarity = name_similarity if kind == 'name' else exact_similarity
+        field_scores[left_col + '_score'] = similarity(left_text, right_text, left_idx, right_idx)
+
+    pairs = pd.DataFrame({'left': left.index.to_numpy()[left_idx],
+                          'right': right.index.to_numpy()[right_idx],
+                          **field_scores})
+    pairs['score'] = pairs[list(field_scores)].mean(axis=1)
+    pairs = pairs[pairs['score'] >= threshold]
+
+    # Best candidate per left row
+    best = pairs.sort_values('score', ascending=False, kind='stable')
+    best = best.drop_duplicates(subset='left', keep='first')
+    return best.sort_values('left', kind='stable').reset_index(drop=True)
+
+# True for left rows with a match on the right
+def is_linked(left, right, rule, threshold=link_threshold):
+    links = link_records(left.reset_index(drop=True), right.reset_index(drop=True), rule, threshold)
+    linked = np.zeros(len(left), dtype=bool)
+    linked[links['left'].to_numpy()] = True
+    return pd.Series(linked, index=left.index)
+
+# Same rule with left and right swapped (e.g. USGS -> Hauser instead of
+# Hauser -> USGS)
+def swap_rule(rule):
+    return {part: [(right_col, left_col, kind) for left_col, right_col, kind in rule[part]]
+            for part in ('block', 'compare')}
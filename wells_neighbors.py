@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_neighbors.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: find wells within some distance of each other with KD-trees
+#             (points on the unit sphere, so distances are great-circle),
+#             queried for all pairs at once, to
+#               - tell same-API records that are only off by rounding or a
+#                 datum shift apart from ones that are really elsewhere
+#               - find co-located wells with different APIs across the
+#                 FracTracker, USGS and state datasets
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+# Mean Earth radius in meters
+earth_radius_m = 6371008.8
+
+# =============================================================================
+# Neighbour queries
+# =============================================================================
+
+# Lat/lon in degrees -> 3D points on the unit sphere; the straight-line
+# (chord) distance between two of them converts exactly to the great-circle
+# (haversine) distance, and a KD-tree over them needs no special metric
+def _unit_vectors(lat, lon):
+    lat = np.radians(np.asarray(lat, dtype='float64'))
+    lon = np.radians(np.asarray(lon, dtype='float64'))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+def _chord_to_meters(chord):
+    return 2 * earth_radius_m * np.arcsin(np.clip(chord / 2, 0, 1))
+
+def _meters_to_chord(meters):
+    return 2 * np.sin(meters / earth_radius_m / 2)
+
+# All (i, j) pairs of points within tolerance_m of each other, i < j, with
+# their great-circle distance in meters; points with missing coordinates
+# are skipped
+def neighbor_pairs(lat, lon, tolerance_m):
+    points = _unit_vectors(lat, lon)
+    valid = np.flatnonzero(~np.isnan(points).any(axis=1))
+    tree = cKDTree(points[valid])
+    pairs = tree.query_pairs(_meters_to_chord(tolerance_m), output_type='ndarray')
+    i, j = valid[pairs[:, 0]], valid[pairs[:, 1]]
+    order = np.lexsort((j, i))
+    i, j = i[order], j[order]
+    return i, j, _chord_to_meters(np.linalg.norm(points[i] - points[j], axis=1))
+
+# True for each point whose group (e.g. its API) has every point within
+# tolerance_m of every other one, i.e. the group's diameter is at most
+# tolerance_m (chains of close points that end up further apart don't count);
+# a group with a point that has missing coordinates is never within
+def groups_within(lat, lon, groups, tolerance_m):
+    i, j, _ = neighbor_pairs(lat, lon, tolerance_m)
+    group_codes, group_uniques = pd.factorize(np.asarray(groups))
+    same = group_codes[i] == group_codes[j]
+    close_pairs = np.bincount(group_codes[i[same]], minlength=len(group_uniques))
+    sizes = np.bincount(group_codes, minlength=len(group_uniques))
+    return (close_pairs == sizes * (sizes - 1) // 2)[group_codes]
+
+# =============================================================================
+# Co-located wells across datasets
+# =============================================================================
+
+# Pairs of wells from two different `sources` ({name: (df, key_col, lat_col,
+# lon_col)}) that are within tolerance_m of each other but have different
+# keys (e.g. API keys); each source gets its own KD-tree and only the trees
+# of different sources are queried against each other, so wells on the same
+# multi-well pad within one source are never paired up
+def colocated_wells(sources, tolerance_m=25):
+    wells = {}
+    for name, (df, key_col, lat_col, lon_col) in sources.items():
+        points = _unit_vectors(df[lat_col].to_numpy(dtype='float64'), df[lon_col].to_numpy(dtype='float64'))
+        valid = np.flatnonzero(~np.isnan(points).any(axis=1))
+        wells[name] = (pd.DataFrame({'source': name,
+                                     'key': df[key_col].to_numpy(),
+                                     'lat': df[lat_col].to_numpy(dtype='float64'),
+                                     'lon': df[lon_col].to_numpy(dtype='float64'),
+                                     'row': np.arange(len(df))}),
+                       valid, cKDTree(points[valid]))
+
+    names = list(wells)
+    pairs = []
+    for n, name_a in enumerate(names):
+        for name_b in names[n + 1:]:
+            wells_a, valid_a, tree_a = wells[name_a]
+            wells_b, valid_b, tree_b = wells[name_b]
+            found = tree_a.sparse_distance_matrix(tree_b, _meters_to_chord(tolerance_m), output_type='ndarray')
+            order = np.lexsort((found['j'], found['i']))
+            i, j = valid_a[found['i'][order]], valid_b[found['j'][order]]
+            keys_a = wells_a['key'].to_numpy(dtype=object)[i]
+            keys_b = wells_b['key'].to_numpy(dtype=object)[j]
+            different = pd.isna(keys_a) | pd.isna(keys_b) | (keys_a != keys_b)
+            a = wells_a.iloc[i[different]].reset_index(drop=True).add_suffix('_a')
+            b = wells_b.iloc[j[different]].reset_index(drop=True).add_suffix('_b')
+            pairs.append(pd.concat([a, b], axis=1).assign(
+                distance_m=_chord_to_meters(found['v'][order][different])))
+    if not pairs:
+        return pd.DataFrame(columns=['source_a', 'key_a', 'lat_a', 'lon_a', 'row_a', 'source_b', 'key_b',
+                                     'lat_b', 'lon_b', 'row_b', 'distance_m'])
+    return pd.concat(pairs, ignore_index=True)
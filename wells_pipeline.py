@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_pipeline.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: the orphaned wells pipeline as named stages with declared inputs
+#             and outputs; every stage's outputs are cached as Parquet under
+#             a hash of its inputs, settings and code, so changing something
+#             in Aim 3 only re-runs Aim 3
+
+# Stages (in order):
+#   ingest         : read USGS, FracTracker and the Kansas all wells ds
+#   classify       : FracTracker statuses -> ORPHANED / PLUGGED / ...
+#   dedup          : FracTracker duplicate APIs (steps 1-3)
+#   snapshot       : diff FracTracker against the snapshot store (only on request)
+#   assemble       : Hauser 2024 = FracTracker states + state downloads
+#   remove-plugged : AIM 1, take out wells that are actually plugged
+#   newly-orphaned : AIM 2, wells orphaned since the USGS report
+#   newly-plugged  : AIM 3, wells plugged since the USGS report
+#   validate       : Kansas geocoding, wells checked against state outlines
+#   export         : GeoParquet by state for the thesis (always runs, never cached)
+
+# Cache layout (one folder per stage, only the latest key is kept):
+#   Cache/stages/<stage>/<key>/<output>.parquet
+#   Cache/stages/<stage>/<key>/done.json    written last, lists the outputs
+# A stage's key hashes its code (the stage function, the functions here it
+# calls and every local module they import, found by following the imports,
+# see code_hash), the settings it reads, the contents of the files it reads
+# and the keys of the stages its inputs come from, so a change anywhere
+# upstream changes every key below it
+
+import ast
+import hashlib
+import inspect
+import json
+import os
+import shutil
+from dataclasses import dataclass, field
+
+import geopandas as gpd
+import pandas as pd
+from pyarrow import parquet as pq
+
+from census_boundaries import load_states, store_dir as boundary_store_dir
+from run_log import RunLog, dropped, keep_rows, row_counts
+from wells_adapters import state_adapters, run_adapters, api_rules
+from wells_aims import (remove_plugged_by_state, newly_orphaned_by_state, newly_plugged_by_state,
+                        state_counts)
+from wells_api import clean_api, normalize_api
+from wells_assembly import standardize_state
+from wells_dedup import deduplicate_wells
+from wells_export import write_state_partitions, write_flatgeobuf
+from wells_io import cache_dir, file_hash, read_fractracker, read_usgs, read_ks_wells
+from wells_plss import geocode_plss, plss_number, table_path
+from wells_schema import apply_schema, ft_schema, hauser_schema, hauser_export_schema
+from wells_snapshots import update_snapshot
+from wells_spatial import validate_points_in_state
+from wells_states import required_fields, ft_fields, state2abbrev
+from wells_status import classify_well_status
+from wells_stream import clean_fractracker, stream_fractracker, deduplicate_states, read_states
+
+# Folder for the stage cache, relative to the WELLS directory
+stage_dir = os.path.join(cache_dir, 'stages')
+
+# =============================================================================
+# Settings
+# =============================================================================
+
+# Everything a run can change; each stage only hashes the keys it lists in
+# `params` (max_workers, run_log and profile don't change any result, so no
+# stage lists them)
+default_config = {
+    # Inputs, relative to the WELLS directory
+    'usgs_path' : 'USGS/US_orphaned_wells.csv',
+    'ft_paths' : ['FracTracker/full_dataset.csv',
+                  # Tennessee ds, which was accidentally not included in FT dataset
+                  'FracTracker/tennessee_wells_071624.csv'],
+    'ks_wells_path' : 'USGS/State_Downloads/ks_wells.txt',
+    # Kansas is replaced with the all wells dataset; the rest aren't studied
+    'exclude_states' : ['Kansas', 'Arizona', 'Idaho', 'Illinois', 'Maryland', 'Oregon',
+                        'Virginia', 'Washington'],
+    # States that are completely included in FracTracker (USGS sourced these
+    # from "all_wells" datasets), in the order they're listed in
+    'ft_states' : ['Alabama', 'Arkansas', 'Louisiana', 'Mississippi', 'Missouri',
+                   'Nebraska', 'North Dakota', 'Ohio', 'Oklahoma', 'South Dakota'],
+    # Only run these states (e.g. ['Texas', 'Pennsylvania'] for a quick
+    # development run); None runs every state
+    'states' : None,
+    # Parse FracTracker in chunks and dedup it one state at a time (lower
+    # peak memory while reading, see wells_stream.py for what it bounds)
+    'stream_ft' : False,
+    # Same-API entries all within this many meters of each other are one
+    # location in dedup step 2, e.g. location_tolerance_m (100); None keeps
+    # the exact lat/lon match the thesis counts use
+    'tolerance_m' : None,
+    # Outputs, relative to the WELLS directory like the inputs (point it at
+    # the thesis data folder for Thesis.Rmd)
+    'export_dir' : 'Export',
+    # Also write each layer as one FlatGeobuf (with a spatial index) next to
+    # its per-state GeoParquet files
+    'export_flatgeobuf' : False,
+    'max_workers' : None,
+    # Per-stage timing, memory and row counts, one JSON line per stage (None
+    # to turn off), and an optional 'cprofile' or 'pyinstrument' capture of
+    # each stage that runs (see run_log.py)
+    'run_log' : os.path.join(cache_dir, 'run_log.jsonl'),
+    'profile' : None,
+    }
+
+# `names` (states) that are in config['states'], in the order given
+def selected_states(names, config):
+    return [name for name in names if config['states'] is None or name in config['states']]
+
+# =============================================================================
+# Stages
+# =============================================================================
+
+@dataclass
+class Stage:
+    name: str
+    func: object                     # func(inputs, config, workdir) -> {output: frame or None}
+    inputs: list                     # outputs of earlier stages
+    outputs: list
+    params: list = field(default_factory=list)   # config keys the stage reads
+    files: object = None             # files(config) -> paths of the files it reads
+    cache: bool = True
+
+# INGEST: USGS (section 1), FracTracker with clean APIs and the original
+# statuses (section 2), and the Kansas all wells dataset
+def ingest(inputs, config, workdir):
+    usgs = read_usgs(config['usgs_path'])
+    usgs['Well identifier'] = clean_api(usgs['Well identifier'].str[4:-4])
+    # Integer API key for joins; USGS-assigned IDs ('ID…', 'D…') are flagged
+    usgs[['api_key', 'api_synthetic']] = normalize_api(usgs['Well identifier'])[['api_key', 'api_synthetic']]
+    usgs['Status'] = "ORPHANED"
+    if config['states'] is not None:
+        usgs = keep_rows(usgs, usgs['State'].isin(config['states']), 'state not selected').reset_index(drop=True)
+
+    kansas_all_wells = read_ks_wells(config['ks_wells_path'])
+
+    if config['stream_ft']:
+        # Chunks are cleaned and classified on the way in and written one
+        # file per state inside this stage's cache folder
+        state_dir, ft_status = stream_fractracker(config['ft_paths'], config['exclude_states'],
+                                                  out_dir=os.path.join(workdir, 'ft_states'),
+                                                  states=config['states'])
+        return {'usgs' : usgs, 'kansas_all_wells' : kansas_all_wells, 'ft_status' : ft_status,
+                'ft_raw' : None, 'ft_state_dir' : pd.DataFrame({'path' : [state_dir]})}
+
+    # (re-apply the schema: concat turns categoricals with different
+    # categories back into plain text)
+    ft = apply_schema(pd.concat([read_fractracker(path) for path in config['ft_paths']],
+                                ignore_index=True), ft_schema)
+    ft = clean_fractracker(ft, config['exclude_states'], config['states'])
+    ft_status = pd.DataFrame(ft.groupby('stusps', observed=True).well_status.value_counts())
+    return {'usgs' : usgs, 'kansas_all_wells' : kansas_all_wells, 'ft_status' : ft_status,
+            'ft_raw' : ft, 'ft_state_dir' : None}
+
+def ingest_files(config):
+    return [config['usgs_path'], config['ks_wells_path']] + list(config['ft_paths'])
+
+# CLASSIFY: one (state, status) lookup applied to the whole column
+def classify(inputs, config, workdir):
+    if inputs['ft_raw'] is None:
+        # Streamed: already classified chunk by chunk
+        return {'ft_classified' : None}
+    ft = inputs['ft_raw'].copy()
+    ft['well_status'] = classify_well_status(ft).astype('category')
+    return {'ft_classified' : ft}
+
+# DEDUP: steps 1-3 in one pass (one state at a time when streamed)
+def dedup(inputs, config, workdir):
+    dedup_kwargs = dict(api_col='api_num', status_col='well_status', lat_col='latitude',
+                        lon_col='longitude', tolerance_m=config['tolerance_m'])
+    if inputs['ft_classified'] is None:
+        state_dir = inputs['ft_state_dir']['path'].iloc[0]
+        dedup_dir, dedup_audit = deduplicate_states(state_dir, out_dir=os.path.join(workdir, 'ft_dedup'),
+                                                    **dedup_kwargs)
+        ft = read_states(dedup_dir)
+    else:
+        ft, dedup_audit = deduplicate_wells(inputs['ft_classified'], **dedup_kwargs)
+    for step, removed in zip(dedup_audit['step'], dedup_audit['rows_removed']):
+        dropped('dedup ' + step, removed)
+    return {'ft' : ft, 'dedup_audit' : dedup_audit}
+
+# SNAPSHOT: diff this FracTracker release against the snapshot store (see
+# wells_snapshots.py). Nothing else reads it, so it only runs when asked for
+# (cli.py --snapshot); on a run limited to config['states'] only those
+# states are diffed and rewritten
+def snapshot(inputs, config, workdir):
+    ft_changes = update_snapshot(inputs['ft'], pd.Timestamp.today().strftime('%Y%m%d'),
+                                 states=config['states'])
+    return {'ft_changes' : ft_changes}
+
+# ASSEMBLE: orphaned wells from the FracTracker states (section 4) plus every
+# state download (sections 5-6), cleaned (section 7)
+def assemble(inputs, config, workdir):
+    ft = inputs['ft']
+    states = selected_states(config['ft_states'], config)
+
+    # Orphaned wells from the FracTracker states, in the order listed
+    ft_orphaned = ft[ft['stusps'].isin(states) & (ft['well_status'] == "ORPHANED")]
+    ft_orphaned = ft_orphaned.sort_values('stusps', kind='stable',
+                                          key=lambda col: col.map({state: i for i, state in enumerate(states)}))
+    for state, count in ft_orphaned['stusps'].value_counts().reindex(states, fill_value=0).items():
+        print(state + ": " + str(count) + " orphaned wells in 2024")
+    print('')
+    hauser_2024 = standardize_state(ft_orphaned, ft_fields, required_fields).reset_index(drop=True)
+
+    # Every state download, one adapter per process (see wells_adapters.py)
+    hauser_add_on = run_adapters(state_adapters, states=selected_states(state_adapters, config),
+                                 ft=ft, max_workers=config['max_workers'])
+    hauser_2024_combo = pd.concat([hauser_2024, hauser_add_on], ignore_index=True, sort=False)
+
+    # Delete duplicate wells, rows with no API number and missing lat/lons
+    hauser_2024 = keep_rows(hauser_2024_combo, ~hauser_2024_combo.duplicated(subset='api_10', keep=False),
+                            'duplicate API')
+    hauser_2024 = keep_rows(hauser_2024, hauser_2024['api_10'].notna(), 'no API')
+    hauser_2024 = keep_rows(hauser_2024, hauser_2024['lat'].notna() & hauser_2024['lon'].notna(),
+                            'missing lat/lon')
+    hauser_2024 = keep_rows(hauser_2024, (hauser_2024['lat'] != 0) & (hauser_2024['lon'] != 0),
+                            'lat/lon of 0')
+    hauser_2024 = keep_rows(hauser_2024, (hauser_2024['lat'] != 'nan') & (hauser_2024['lon'] != 'nan'),
+                            "lat/lon of 'nan'")
+
+    # Numeric lat & lon, all lons negative (lats are within bounds); Kansas
+    # keeps its township (lat) and section (lon) as plain PLSS numbers for
+    # the plugged key and the geocoding in validate
+    is_kansas = (hauser_2024['state'] == 'Kansas').to_numpy()
+    for col in ['lat', 'lon']:
+        hauser_2024[col] = pd.to_numeric(hauser_2024[col].where(~is_kansas, plss_number(hauser_2024[col])),
+                                         errors='coerce')
+    hauser_2024['lon'] = hauser_2024['lon'].where(is_kansas, hauser_2024['lon'].abs()*-1)
+
+    # Consistent API (see wells_api.py) and the integer key
+    hauser_api = normalize_api(hauser_2024['api_10'], hauser_2024['state'], **api_rules())
+    hauser_2024['api_10'] = hauser_api['api_10'].astype("string")
+    hauser_2024['api_key'] = hauser_api['api_key']
+
+    hauser_2024['st_abbrev'] = hauser_2024['state'].map(state2abbrev)
+    return {'hauser_2024' : apply_schema(hauser_2024, hauser_schema)}
+
+def assemble_files(config):
+    return [path for state in selected_states(state_adapters, config)
+            for path in state_adapters[state].files]
+
+# REMOVE-PLUGGED (AIM 1): wells listed as plugged in FracTracker (or the
+# Kansas all wells dataset) come out of Hauser 2024
+def remove_plugged(inputs, config, workdir):
+    ft, kansas_all_wells = inputs['ft'], inputs['kansas_all_wells']
+    plugged_wells_ft = ft[ft['well_status'] == 'PLUGGED']
+    plugged_wells_ft = plugged_wells_ft[['stusps', 'api_num', 'api_key', 'county', 'operator', 'well_name']]
+    plugged_wells_ft['api_num'] = plugged_wells_ft['api_num'].astype("string")
+    plugged_wells_ks = kansas_all_wells[kansas_all_wells['STATUS2'] == 'Plugged and Abandoned']
+
+    hauser_unplugged, actually_plugged = remove_plugged_by_state(
+        inputs['hauser_2024'], plugged_wells_ft, plugged_wells_ks, config['max_workers'])
+    dropped('actually plugged', len(actually_plugged))
+    return {'hauser_unplugged' : hauser_unplugged,
+            'actually_plugged' : actually_plugged,
+            'plugged_wells_ft' : plugged_wells_ft,
+            'plugged_wells_ks' : plugged_wells_ks,
+            'hauser_2024_grouped' : state_counts(hauser_unplugged, 'state', 'Hauser_well_count')}
+
+# NEWLY-ORPHANED (AIM 2): still orphaned and not in USGS; adds hauser_status
+def newly_orphaned(inputs, config, workdir):
+    hauser_2024f, newly_orphaned = newly_orphaned_by_state(inputs['hauser_unplugged'], inputs['usgs'],
+                                                           config['max_workers'])
+    return {'hauser_2024f' : hauser_2024f,
+            'newly_orphaned' : newly_orphaned,
+            'newly_orphaned_grouped' : state_counts(newly_orphaned, 'state', 'new_orphaned_well_count')}
+
+# NEWLY-PLUGGED (AIM 3): in USGS, not in Hauser 2024, plugged now
+def newly_plugged(inputs, config, workdir):
+    newly_plugged = newly_plugged_by_state(inputs['usgs'], inputs['hauser_2024'], inputs['actually_plugged'],
+                                           inputs['plugged_wells_ft'], inputs['plugged_wells_ks'],
+                                           config['max_workers'])
+    return {'newly_plugged' : newly_plugged,
+            'newly_plugged_grouped' : state_counts(newly_plugged, 'State', 'since_plugged_well_count')}
+
+# VALIDATE: Kansas township/section/range -> section centroid, then every
+# well checked against the state it claims to be in
+def validate(inputs, config, workdir):
+    hauser_2024f = inputs['hauser_2024f'].copy()
+
+    # Kansas: township (lat), section (lon) and range (spud_date)
+    is_kansas = hauser_2024f['state'] == 'Kansas'
+    ks_lat, ks_lon = geocode_plss(township=hauser_2024f.loc[is_kansas, 'lat'],
+                                  range_=hauser_2024f.loc[is_kansas, 'spud_date'],
+                                  section=hauser_2024f.loc[is_kansas, 'lon'],
+                                  state='KS')
+    hauser_2024f.loc[is_kansas, 'lat'] = ks_lat
+    hauser_2024f.loc[is_kansas, 'lon'] = ks_lon
+    hauser_2024f[['lat', 'lon']] = hauser_2024f[['lat', 'lon']].apply(pd.to_numeric, errors='coerce')
+
+    # Kansas wells whose section isn't in the PLSS table can't be mapped
+    print('Kansas wells without a PLSS section:', (is_kansas & hauser_2024f['lat'].isna()).sum())
+    hauser_2024f = keep_rows(hauser_2024f, ~(is_kansas & hauser_2024f['lat'].isna()), 'Kansas PLSS section not found')
+
+    # Fix Indiana & Kansas attributes
+    hauser_2024f.loc[hauser_2024f['state'].isin(['Indiana', 'Kansas']), 'spud_date'] = pd.NA
+    hauser_2024f = apply_schema(hauser_2024f, hauser_export_schema)
+
+    hauser_2024_gdf = gpd.GeoDataFrame(hauser_2024f,
+                                       geometry=gpd.points_from_xy(hauser_2024f.lon, hauser_2024f.lat),
+                                       crs="EPSG:4326")
+    import us  # us library provides mappings for state names and abbreviations
+    state_name_to_abbr = {state.name.upper(): state.abbr for state in us.states.STATES}
+    hauser_2024_gdf = validate_points_in_state(hauser_2024_gdf, load_states(), state_name_to_abbr)
+    return {'hauser_2024_gdf' : hauser_2024_gdf}
+
+def validate_files(config):
+    return [table_path('KS'), os.path.join(boundary_store_dir, 'states_2021.parquet')]
+
+# EXPORT: GeoParquet for the thesis, one file per state (see wells_export.py),
+# plus a FlatGeobuf of each layer if config['export_flatgeobuf']
+def export(inputs, config, workdir):
+    export_dir = config['export_dir']
+    newly_plugged, newly_orphaned = inputs['newly_plugged'], inputs['newly_orphaned']
+
+    newly_plugged_gdf = gpd.GeoDataFrame(newly_plugged,
+                                         geometry=gpd.points_from_xy(newly_plugged.Longitude, newly_plugged.Latitude),
+                                         crs="EPSG:4326")
+    newly_orphaned_gdf = gpd.GeoDataFrame(newly_orphaned,
+                                          geometry=gpd.points_from_xy(newly_orphaned.lon, newly_orphaned.lat),
+                                          crs="EPSG:4326")
+
+    # (folder, layer, wells, state column)
+    layers = [('Hauser_2024', 'hauser_2024', inputs['hauser_2024_gdf'], 'state'),
+              ('Newly_Plugged', 'newly_plugged', newly_plugged_gdf, 'State'),
+              ('Newly_Orphaned', 'newly_orphaned', newly_orphaned_gdf, 'state')]
+    for folder, layer, gdf, state_col in layers:
+        path = os.path.join(export_dir, folder, layer)
+        written = write_state_partitions(gdf, path, state_col)
+        print(f'{layer}: {len(gdf)} wells in {len(written)} state files')
+        if config['export_flatgeobuf']:
+            write_flatgeobuf(gdf, path + '.fgb')
+    return {}
+
+# The graph, in run order
+stages = {stage.name: stage for stage in [
+    Stage('ingest', ingest, [], ['usgs', 'kansas_all_wells', 'ft_status', 'ft_raw', 'ft_state_dir'],
+          params=['usgs_path', 'ft_paths', 'ks_wells_path', 'exclude_states', 'states', 'stream_ft'],
+          files=ingest_files),
+    Stage('classify', classify, ['ft_raw'], ['ft_classified']),
+    Stage('dedup', dedup, ['ft_classified', 'ft_state_dir'], ['ft', 'dedup_audit'],
+          params=['tolerance_m']),
+    Stage('snapshot', snapshot, ['ft'], ['ft_changes'], params=['states']),
+    Stage('assemble', assemble, ['ft'], ['hauser_2024'],
+          params=['ft_states', 'states'],
+          files=assemble_files),
+    Stage('remove-plugged', remove_plugged, ['hauser_2024', 'ft', 'kansas_all_wells'],
+          ['hauser_unplugged', 'actually_plugged', 'plugged_wells_ft', 'plugged_wells_ks',
+           'hauser_2024_grouped']),
+    Stage('newly-orphaned', newly_orphaned, ['hauser_unplugged', 'usgs'],
+          ['hauser_2024f', 'newly_orphaned', 'newly_orphaned_grouped']),
+    Stage('newly-plugged', newly_plugged,
+          ['usgs', 'hauser_2024', 'actually_plugged', 'plugged_wells_ft', 'plugged_wells_ks'],
+          ['newly_plugged', 'newly_plugged_grouped']),
+    Stage('validate', validate, ['hauser_2024f'], ['hauser_2024_gdf'],
+          files=validate_files),
+    Stage('export', export, ['hauser_2024_gdf', 'newly_plugged', 'newly_orphaned'], [],
+          params=['export_dir', 'export_flatgeobuf'],
+          cache=False),
+    ]}
+
+# Stage that makes each output
+producers = {output: stage.name for stage in stages.values() for output in stage.outputs}
+
+# =============================================================================
+# Keys
+# =============================================================================
+
+def _digest(text):
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+# Folder this file is in; the .py files in it are the pipeline's own code
+code_dir = os.path.dirname(os.path.abspath(__file__))
+
+def _local_path(module):
+    path = os.path.join(code_dir, module.split('.')[0] + '.py')
+    return path if os.path.exists(path) else None
+
+# {name: module} for every import statement in a file (including imports
+# inside functions)
+def _imports(path):
+    with open(path) as f:
+        tree = ast.parse(f.read())
+    names = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                names[alias.asname or alias.name.split('.')[0]] = alias.name
+        elif isinstance(node, ast.ImportFrom) and node.module is not None and node.level == 0:
+            for alias in node.names:
+                names[alias.asname or alias.name] = node.module
+    return names
+
+# Paths of the local modules `path` imports, directly or through each other
+def _module_closure(path, seen):
+    if path in seen:
+        return
+    seen.add(path)
+    for module in set(_imports(path).values()):
+        if _local_path(module) is not None:
+            _module_closure(_local_path(module), seen)
+
+def _code_names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _code_names(const)
+    return names
+
+# Everything a stage's results depend on: the source of the stage function
+# and of the functions in this file it calls (and they call), plus every
+# local module any of them uses, with those modules' own local imports
+# (so editing any code a stage runs changes its key)
+def code_hash(stage):
+    here = __file__
+    imported = _imports(here)
+    functions, paths = {}, set()
+    todo = [stage.func, _storable]
+    while todo:
+        func = todo.pop()
+        if func.__name__ in functions:
+            continue
+        functions[func.__name__] = inspect.getsource(func)
+        for name in _code_names(func.__code__):
+            value = globals().get(name)
+            if inspect.isfunction(value) and value.__module__ == __name__:
+                todo.append(value)
+            elif name in imported and _local_path(imported[name]) is not None:
+                _module_closure(_local_path(imported[name]), paths)
+    parts = [functions[name] for name in sorted(functions)]
+    for path in sorted(paths):
+        with open(path) as f:
+            parts.append(f.read())
+    return _digest('\n'.join(parts))
+
+# Key for every stage in `names` and everything upstream of it
+def stage_keys(names, config):
+    keys = {}
+    for stage in stages.values():
+        if stage.name not in names:
+            continue
+        files = stage.files(config) if stage.files is not None else []
+        keys[stage.name] = _digest(json.dumps({
+            'stage' : stage.name,
+            'code' : code_hash(stage),
+            'params' : {param: config[param] for param in stage.params},
+            'files' : {path: file_hash(path) for path in files},
+            'inputs' : {name: keys[producers[name]] for name in stage.inputs},
+            }, sort_keys=True, default=str))
+    return keys
+
+# Stages needed for `targets`, in run order
+def upstream(targets):
+    needed = set()
+    todo = list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in needed:
+            needed.add(name)
+            todo.extend(producers[output] for output in stages[name].inputs)
+    return [name for name in stages if name in needed]
+
+# =============================================================================
+# Cache
+# =============================================================================
+
+def _entry_dir(name, key, stage_dir=stage_dir):
+    return os.path.join(stage_dir, name, key)
+
+def is_cached(name, key, stage_dir=stage_dir):
+    return stages[name].cache and os.path.exists(os.path.join(_entry_dir(name, key, stage_dir), 'done.json'))
+
+# Mixed text/number object columns (or categories) can't go into Parquet,
+# and Parquet only keeps the categories that are used; both are fixed before
+# the first write, so a fresh run and a cached run see the same frame
+def _storable(df):
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.remove_unused_categories()
+            if pd.api.types.infer_dtype(df[col].cat.categories) in ('mixed', 'mixed-integer'):
+                df[col] = df[col].astype('string').astype('category')
+        elif df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True) in ('mixed', 'mixed-integer'):
+            df[col] = df[col].astype('string')
+    return df
+
+def _write_outputs(name, key, results, stage_dir=stage_dir):
+    entry = _entry_dir(name, key, stage_dir)
+    kinds = {}
+    for output, df in results.items():
+        if df is None:
+            kinds[output] = None
+            continue
+        df.to_parquet(os.path.join(entry, output + '.parquet'))
+        kinds[output] = 'geo' if isinstance(df, gpd.GeoDataFrame) else 'frame'
+    with open(os.path.join(entry, 'done.json'), 'w') as f:
+        json.dump({'stage' : name, 'key' : key, 'outputs' : kinds}, f, indent=1)
+
+def load_output(name, key, output, stage_dir=stage_dir):
+    entry = _entry_dir(name, key, stage_dir)
+    with open(os.path.join(entry, 'done.json')) as f:
+        kind = json.load(f)['outputs'][output]
+    if kind is None:
+        return None
+    path = os.path.join(entry, output + '.parquet')
+    if kind == 'geo':
+        return gpd.read_parquet(path)
+    table = pq.read_table(path)
+    df = table.to_pandas()
+    # (an empty categorical column comes back as object)
+    for col in table.schema.pandas_metadata['columns']:
+        if col['pandas_type'] == 'categorical' and col['name'] in df and df[col['name']].dtype == object:
+            df[col['name']] = df[col['name']].astype('category')
+    return df
+
+# =============================================================================
+# Run
+# =============================================================================
+
+# Run the stages needed for `targets` (stage names), re-running only those
+# whose key has no cache entry (or that are in `force`); returns every
+# output of the target stages
+# Every stage, run or cached, gets a line in config['run_log']
+def run_pipeline(targets, config=None, force=(), stage_dir=stage_dir):
+    config = {**default_config, **(config or {})}
+    order = upstream(targets)
+    keys = stage_keys(order, config)
+    log = RunLog(config['run_log'], 'wells_pipeline', config['profile'])
+
+    to_run = [name for name in order if name in force or not is_cached(name, keys[name], stage_dir)]
+
+    # Outputs are loaded from the cache only when something asks for them
+    values = {}
+    def value(output):
+        if output not in values:
+            values[output] = load_output(producers[output], keys[producers[output]], output, stage_dir)
+        return values[output]
+
+    for name in order:
+        stage = stages[name]
+        if name not in to_run:
+            print(f'[{name}] cached')
+            log.skipped(name, key=keys[name])
+            continue
+        print(f'[{name}] running')
+        inputs = {output: value(output) for output in stage.inputs}
+
+        if os.path.isdir(os.path.join(stage_dir, name)):
+            shutil.rmtree(os.path.join(stage_dir, name))
+        entry = _entry_dir(name, keys[name], stage_dir)
+        os.makedirs(entry)
+
+        with log.stage(name, row_counts(inputs)) as record:
+            record['key'] = keys[name]
+            results = stage.func(inputs, config, entry)
+            results = {output: None if results[output] is None else _storable(results[output])
+                       for output in stage.outputs}
+            record['rows_out'] = row_counts(results)
+        if stage.cache:
+            _write_outputs(name, keys[name], results, stage_dir)
+        values.update(results)
+
+    return {output: value(output) for name in targets for output in stages[name].outputs}
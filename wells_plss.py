@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_plss.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: turn PLSS township / range / section (e.g. Kansas wells) into
+#             lat/lon at the section centroid, using a lookup table built
+#             once from the BLM PLSS sections file and memory-mapped after
+
+# Usage: download the BLM CadNSDI PLSS data for a state once (the
+# PLSSFirstDivision layer has one polygon per section), then run
+#   build_plss_table('PLSS/KS_PLSS.gdb', 'KS', layer='PLSSFirstDivision')
+# a single time; the table goes in the boundary store (Boundaries/)
+
+import os
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+
+from census_boundaries import store_dir
+from wells_coords import to_lonlat
+
+# Equal-area CRS for section areas & centroids (CONUS Albers)
+centroid_crs = 'EPSG:5070'
+
+# Township & range direction codes
+direction_codes = {'N': 0, 'S': 1, 'E': 0, 'W': 1}
+
+# Principal meridian and township direction when a state's wells don't say
+# (all of Kansas is south of the baseline on the 6th Principal Meridian)
+plss_defaults = {'KS' : {'meridian' : 6, 'township_dir' : 'S'}}
+
+# One row per section: integer key (see plss_keys) and centroid lat/lon
+table_dtype = np.dtype([('key', 'int64'), ('lat', 'float64'), ('lon', 'float64')])
+
+# =============================================================================
+# Keys
+# =============================================================================
+
+# One int64 per (meridian, township + dir, range + dir, section); any missing
+# part gives -1
+def plss_keys(meridian, township, township_dir, range_, range_dir, section):
+    parts = [np.asarray(pd.to_numeric(pd.Series(part), errors='coerce'), dtype='float64')
+             for part in (meridian, township, township_dir, range_, range_dir, section)]
+    meridian, township, township_dir, range_, range_dir, section = parts
+    keys = (((((meridian * 1000 + township) * 2 + township_dir) * 1000 + range_) * 2 + range_dir) * 100 + section)
+    missing = np.isnan(keys)
+    keys = np.where(missing, -1, keys).astype(np.int64)
+    return keys
+
+# '12', '12S', '012 S', 12.0 -> (12, 'S' or None)
+def _number_and_direction(values):
+    parts = pd.Series(values).astype('string').str.upper().str.extract(r'(\d+)(?:\.0)?\s*([NSEW])?')
+    return pd.to_numeric(parts[0], errors='coerce'), parts[1]
+
+# Township / range / section numbers ('12S', '012', -36 -> 12, 12, 36)
+def plss_number(values):
+    return _number_and_direction(values)[0]
+
+# Township / range / section as text for exact matching keys: the number
+# plus its direction ('012 s', '12S' -> '12S'; 12.0 -> '12S' with
+# default_dir 'S'; section -36 -> '36')
+def plss_text(values, default_dir=None):
+    number, direction = _number_and_direction(values)
+    if default_dir is not None:
+        direction = direction.fillna(default_dir)
+    return number.astype('Int64').astype('string') + direction.fillna('')
+
+def _direction_codes(directions):
+    return directions.map(direction_codes).astype('float64')
+
+# =============================================================================
+# Build the lookup table from a PLSS sections file
+# =============================================================================
+
+def table_path(state, store_dir=store_dir):
+    return os.path.join(store_dir, f'plss_sections_{state}.npy')
+
+# BLM PLSSID, e.g. 'KS060120S0070E0': state, meridian, township (3 digits +
+# fraction), township dir, range (3 digits + fraction), range dir, duplicate
+plssid_pattern = r'^(?P<state>[A-Z]{2})(?P<meridian>\d{2})(?P<township>\d{3})\d(?P<township_dir>[NS])(?P<range>\d{3})\d(?P<range_dir>[EW])'
+
+def build_plss_table(plss_path, state, layer=None, store_dir=store_dir,
+                     id_col='PLSSID', section_col='FRSTDIVNO'):
+    sections = gpd.read_file(plss_path, layer=layer, columns=[id_col, section_col])
+    parts = sections[id_col].str.extract(plssid_pattern)
+    sections = sections[parts['state'] == state]
+    parts = parts[parts['state'] == state]
+
+    keys = plss_keys(parts['meridian'], parts['township'], _direction_codes(parts['township_dir']),
+                     parts['range'], _direction_codes(parts['range_dir']), sections[section_col])
+
+    # A section can be split into several polygons; use the area-weighted
+    # centroid of all of them
+    projected = sections.geometry.to_crs(centroid_crs)
+    pieces = pd.DataFrame({'key': keys,
+                           'area': projected.area.to_numpy(),
+                           'x': projected.centroid.x.to_numpy(),
+                           'y': projected.centroid.y.to_numpy()})
+    pieces = pieces[pieces['key'] >= 0]
+    pieces['x'] *= pieces['area']
+    pieces['y'] *= pieces['area']
+    sums = pieces.groupby('key')[['area', 'x', 'y']].sum()
+    lon, lat = to_lonlat(sums['x'] / sums['area'], sums['y'] / sums['area'], centroid_crs)
+
+    table = np.empty(len(sums), dtype=table_dtype)
+    table['key'] = sums.index.to_numpy()
+    table['lat'] = lat
+    table['lon'] = lon
+    os.makedirs(store_dir, exist_ok=True)
+    np.save(table_path(state, store_dir), table)
+    return table
+
+# Section table for a state, memory-mapped (sorted by key)
+def load_plss_table(state, store_dir=store_dir):
+    return np.load(table_path(state, store_dir), mmap_mode='r')
+
+# =============================================================================
+# Geocode
+# =============================================================================
+
+# Section-centroid (lat, lon) arrays for township / range / section columns
+# written like '12S', '7E', '36' (NaN where the section isn't in the table
+# or a direction is missing and has no default)
+def geocode_plss(township, range_, section, state, meridian=None, store_dir=store_dir):
+    defaults = plss_defaults.get(state, {})
+    township, township_dir = _number_and_direction(township)
+    range_, range_dir = _number_and_direction(range_)
+    section = pd.to_numeric(pd.Series(section).astype('string').str.extract(r'(\d+)', expand=False),
+                            errors='coerce')
+    township_dir = township_dir.fillna(defaults.get('township_dir'))
+    if meridian is None:
+        meridian = defaults.get('meridian', np.nan)
+
+    keys = plss_keys(np.full(len(township), meridian, dtype='float64'), township,
+                     _direction_codes(township_dir), range_, _direction_codes(range_dir), section)
+
+    # One vectorized lookup against the sorted table
+    table = load_plss_table(state, store_dir)
+    pos = np.minimum(np.searchsorted(table['key'], keys), len(table) - 1)
+    found = (keys >= 0) & (table['key'][pos] == keys)
+    lat = np.where(found, table['lat'][pos], np.nan)
+    lon = np.where(found, table['lon'][pos], np.nan)
+    return lat, lon
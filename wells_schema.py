@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_schema.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: compact dtypes for the wells frames (categoricals for repeated
+#             text, int64 API keys, nullable dates, float32 coordinates once
+#             they're only exported) and
+#             a memory report, so the national all-wells file fits on a
+#             small machine
+
+# Note: group categorical columns with observed=True, otherwise every
+# category shows up in the counts (with 0 for the ones filtered out)
+
+import resource
+import sys
+
+import pandas as pd
+
+# =============================================================================
+# Schemas
+# =============================================================================
+
+# dtype names: 'category', 'float32', 'float64', 'Int64' (nullable int64)
+# and 'date' (parsed to datetime64, unparseable -> NaT)
+
+# Source coordinates stay float64 until dedup and matching are done (dedup
+# compares exact lat/lon); float32, within a meter or so, is only used for
+# the exported wells (hauser_export_schema)
+ft_schema = {'stusps' : 'category',
+             'well_status' : 'category',
+             'county' : 'category',
+             'operator' : 'category',
+             'latitude' : 'float64',
+             'longitude' : 'float64',
+             'api_key' : 'Int64',
+             'spud_date' : 'date'}
+
+usgs_schema = {'State' : 'category',
+               'County' : 'category',
+               'Status' : 'category',
+               'Latitude' : 'float64',
+               'Longitude' : 'float64',
+               'api_key' : 'Int64'}
+
+# Hauser wells while they're being matched: lat/lon/spud_date still hold
+# township, section & range for Kansas and well number for Indiana
+hauser_schema = {'state' : 'category',
+                 'st_abbrev' : 'category',
+                 'county' : 'category',
+                 'operator' : 'category',
+                 'well_status' : 'category',
+                 'api_key' : 'Int64'}
+
+# Hauser wells ready for export (after the Kansas geocoding)
+hauser_export_schema = {**hauser_schema,
+                        'lat' : 'float32',
+                        'lon' : 'float32',
+                        'spud_date' : 'date'}
+
+# =============================================================================
+# Casting
+# =============================================================================
+
+def _cast(values, dtype):
+    if dtype == 'date':
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values
+        return pd.to_datetime(values, errors='coerce', format='mixed')
+    if dtype in ('float32', 'float64'):
+        return pd.to_numeric(values, errors='coerce').astype(dtype)
+    if dtype == 'category' and isinstance(values.dtype, pd.CategoricalDtype):
+        # Drop categories left over from rows that were filtered out
+        return values.cat.remove_unused_categories()
+    return values.astype(dtype)
+
+# Cast the columns of `df` that are in `schema` (others are left alone);
+# also re-run after a concat, which turns mismatched categoricals into objects
+def apply_schema(df, schema):
+    for col, dtype in schema.items():
+        if col in df:
+            df[col] = _cast(df[col], dtype)
+    return df
+
+# =============================================================================
+# Memory report
+# =============================================================================
+
+def _ru_maxrss_mb(who):
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+def _proc_status_mb(field):
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+# Highest peak seen before the last reset_peak_rss()
+_peak_before_reset = 0.0
+
+# Peak resident memory of this process so far, in MB (or since the last
+# reset_peak_rss() with since_reset=True)
+# (VmHWM on Linux; elsewhere ru_maxrss, which is in bytes on macOS)
+def peak_rss_mb(since_reset=False):
+    peak = _proc_status_mb('VmHWM')
+    if peak is None:
+        peak = _ru_maxrss_mb(resource.RUSAGE_SELF)
+    return peak if since_reset else max(peak, _peak_before_reset)
+
+# Resident memory right now, in MB (None where /proc isn't available)
+def current_rss_mb():
+    return _proc_status_mb('VmRSS')
+
+# Largest peak of any finished child process (e.g. pool workers), in MB
+def children_peak_rss_mb():
+    return _ru_maxrss_mb(resource.RUSAGE_CHILDREN)
+
+# Start peak_rss_mb() over from the current RSS (Linux only); True if it was
+# reset, so a peak can be measured for one step instead of the whole run
+def reset_peak_rss():
+    global _peak_before_reset
+    _peak_before_reset = peak_rss_mb()
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+# In-memory size of each frame (strings counted in full) plus the process's
+# peak RSS, in MB
+def memory_report(frames):
+    report = pd.DataFrame({'rows' : [len(df) for df in frames.values()],
+                           'memory_mb' : [df.memory_usage(deep=True).sum() / 1024 ** 2
+                                          for df in frames.values()]},
+                          index=pd.Index(list(frames), name='frame'))
+    report.loc['peak RSS'] = [pd.NA, peak_rss_mb()]
+    return report.round(1)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_snapshots.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: keep the last FracTracker release's wells (key, status, location)
+#             on disk and diff each new release against it, so refreshes only
+#             look at the wells that actually changed
+
+# Store layout (one Parquet file per state, only rewritten if it changed):
+#   Snapshots/wells/<state>.parquet      canonical wells from the last release
+#   Snapshots/changes/<release>.parquet  what changed in each release
+
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from wells_keys import hash_key
+
+# Folder for the snapshot store, relative to the WELLS directory
+store_dir = 'Snapshots'
+
+# Columns kept for every well
+snapshot_columns = ['well_key', 'stusps', 'api_num', 'well_status',
+                    'latitude', 'longitude', 'row_hash']
+
+# Wells without an API are keyed on these instead
+fallback_key_columns = ['stusps', 'operator', 'well_name']
+
+# A well counts as moved if either coordinate shifts by more than this many
+# degrees (about 10 m); coordinates are rounded to it before hashing
+move_tolerance = 1e-4
+
+# =============================================================================
+# Canonical wells
+# =============================================================================
+
+# int64 key per well: the API key where there is one, else a hash of
+# fallback_key_columns
+def well_keys(wells, api_col='api_key', fallback=fallback_key_columns):
+    has_api = wells[api_col].notna().to_numpy()
+    keys = np.empty(len(wells), dtype=np.int64)
+    keys[has_api] = wells.loc[has_api, api_col].to_numpy(dtype=np.int64)
+    keys[~has_api] = hash_key(wells[~has_api], [col for col in fallback if col in wells], tag='snapshot').to_numpy()
+    return keys
+
+# One row per well key, sorted by key, with a hash of state, status and
+# location so
+# unchanged wells can be skipped without comparing every column
+def canonical_wells(wells, api_col='api_key'):
+    canonical = pd.DataFrame({'well_key': well_keys(wells, api_col),
+                              'stusps': wells['stusps'].to_numpy(),
+                              'api_num': wells['api_num'].to_numpy(),
+                              'well_status': wells['well_status'].to_numpy(),
+                              'latitude': wells['latitude'].to_numpy(dtype='float64'),
+                              'longitude': wells['longitude'].to_numpy(dtype='float64')})
+    hashed = canonical[['stusps', 'well_status']].assign(
+        latitude=canonical['latitude'].div(move_tolerance).round(),
+        longitude=canonical['longitude'].div(move_tolerance).round())
+    canonical['row_hash'] = pd.util.hash_pandas_object(hashed, index=False).to_numpy().view(np.int64)
+    canonical = canonical.drop_duplicates('well_key', keep='last')
+    return canonical.sort_values('well_key', kind='stable').reset_index(drop=True)
+
+# =============================================================================
+# Diff two releases
+# =============================================================================
+
+# Change labels:
+#   newly_orphaned : now ORPHANED (new well, or status changed to ORPHANED)
+#   newly_plugged  : now PLUGGED (new well, or status changed to PLUGGED)
+#   re_statused    : any other status change
+#   moved          : location changed by more than move_tolerance, or the
+#                    well is now listed under another state
+#   added / removed: well appeared or disappeared with any other status
+# A well that changed status and moved gets one row for each
+
+def _status_change(status, is_new):
+    return np.select([status == 'ORPHANED', status == 'PLUGGED', is_new],
+                     ['newly_orphaned', 'newly_plugged', 'added'], 're_statused')
+
+def diff_snapshots(new, old):
+    # Look every new key up in the old (sorted) keys and drop the wells
+    # whose key and status/location hash are both unchanged
+    old_keys = old['well_key'].to_numpy()
+    new_keys = new['well_key'].to_numpy()
+    pos = np.searchsorted(old_keys, new_keys)
+    found = pos < len(old_keys)
+    found[found] = old_keys[pos[found]] == new_keys[found]
+    same = found.copy()
+    same[found] = old['row_hash'].to_numpy()[pos[found]] == new['row_hash'].to_numpy()[found]
+    changed = ~same
+
+    # Only the changed wells are compared column by column (new wells get an
+    # empty 'before' row)
+    after = new[changed].reset_index(drop=True)
+    before = old.reset_index(drop=True).reindex(np.where(found, pos, -1)[changed]).reset_index(drop=True)
+    is_new = ~found[changed]
+
+    status_changed = is_new | (before['well_status'].to_numpy() != after['well_status'].to_numpy())
+    moved = ~is_new & ((before['latitude'] - after['latitude']).abs().gt(move_tolerance) |
+                       (before['longitude'] - after['longitude']).abs().gt(move_tolerance) |
+                       before['stusps'].ne(after['stusps'])).to_numpy()
+
+    columns = {'well_key': after['well_key'], 'stusps': after['stusps'], 'old_stusps': before['stusps'],
+               'api_num': after['api_num'],
+               'old_status': before['well_status'], 'new_status': after['well_status'],
+               'old_latitude': before['latitude'], 'old_longitude': before['longitude'],
+               'new_latitude': after['latitude'], 'new_longitude': after['longitude']}
+    detail = pd.DataFrame(columns)
+    status_rows = detail[status_changed].assign(
+        change=_status_change(after['well_status'].to_numpy()[status_changed], is_new[status_changed]))
+    moved_rows = detail[moved].assign(change='moved')
+
+    # Wells in the old release that aren't in the new one
+    gone = old[~np.isin(old_keys, new_keys)]
+    removed_rows = pd.DataFrame({'well_key': gone['well_key'], 'old_stusps': gone['stusps'],
+                                 'api_num': gone['api_num'], 'old_status': gone['well_status'],
+                                 'old_latitude': gone['latitude'], 'old_longitude': gone['longitude'],
+                                 'change': 'removed'})
+
+    changes = pd.concat([status_rows, moved_rows, removed_rows], ignore_index=True)
+    return changes[['change'] + list(columns)]
+
+# =============================================================================
+# Store
+# =============================================================================
+
+def _state_path(state, store_dir):
+    return os.path.join(store_dir, 'wells', str(state).replace(' ', '_') + '.parquet')
+
+# Canonical wells from the last release (empty if the store is new)
+def load_snapshot(store_dir=store_dir):
+    paths = sorted(glob.glob(os.path.join(store_dir, 'wells', '*.parquet')))
+    if not paths:
+        return pd.DataFrame({col: pd.Series(dtype='int64' if col in ('well_key', 'row_hash') else
+                                            'float64' if col in ('latitude', 'longitude') else object)
+                             for col in snapshot_columns})
+    snapshot = pd.concat([pd.read_parquet(path, memory_map=True) for path in paths], ignore_index=True)
+    return snapshot.sort_values('well_key', kind='stable').reset_index(drop=True)
+
+# Diff a new release (e.g. FracTracker after dedup) against the store, save
+# the changes as Snapshots/changes/<release>.parquet, and rewrite only the
+# states that changed. With `states` (a run limited to some states) only
+# those states are compared, so the rest of the store isn't taken as removed
+def update_snapshot(wells, release, api_col='api_key', store_dir=store_dir, states=None):
+    old = load_snapshot(store_dir)
+    new = canonical_wells(wells, api_col)
+    if states is not None:
+        old = old[old['stusps'].isin(states)].reset_index(drop=True)
+        new = new[new['stusps'].isin(states)].reset_index(drop=True)
+    changes = diff_snapshots(new, old)
+
+    os.makedirs(os.path.join(store_dir, 'changes'), exist_ok=True)
+    os.makedirs(os.path.join(store_dir, 'wells'), exist_ok=True)
+    changes.to_parquet(os.path.join(store_dir, 'changes', release + '.parquet'), index=False)
+
+    # States with a changed well, before or after (a well can change state)
+    touched = set(changes['stusps'].dropna()) | set(changes['old_stusps'].dropna())
+    for state, state_wells in new[new['stusps'].isin(touched)].groupby('stusps'):
+        state_wells.to_parquet(_state_path(state, store_dir), index=False)
+    for state in touched - set(new['stusps']):
+        if os.path.exists(_state_path(state, store_dir)):
+            os.remove(_state_path(state, store_dir))
+    return changes
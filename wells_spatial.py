@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_spatial.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: spatial checks on the wells (which state each well actually
+#             falls in) using a spatial index instead of looping over rows
+
+import numpy as np
+import shapely
+
+# =============================================================================
+# Point-in-state lookup
+# =============================================================================
+
+# For every point, find the polygons that contain it in one indexed query.
+# The STRtree is built over the points and queried with the (prepared)
+# polygons, so each complex state outline is only prepared once.
+# Returns (point index, polygon index) pairs.
+def points_in_polygons(points, polygons):
+    polygons = np.asarray(polygons)
+    shapely.prepare(polygons)
+    tree = shapely.STRtree(np.asarray(points))
+    polygon_idx, point_idx = tree.query(polygons, predicate='contains')
+    return point_idx, polygon_idx
+
+# Mark each well as inside or outside the state it claims to be in, and
+# report the state it actually falls in
+#   is_within_claimed_state : True if the point is inside its claimed state
+#   actual_state            : USPS abbreviation of the state the point is in
+#                             (None if it isn't inside any state)
+def validate_points_in_state(gdf, state_boundaries, state_name_to_abbr):
+    # Standardize and map full state names to abbreviations
+    claimed = gdf['state'].str.upper().map(state_name_to_abbr).to_numpy(dtype=object)
+
+    if state_boundaries.crs is not None and gdf.crs is not None:
+        state_boundaries = state_boundaries.to_crs(gdf.crs)
+    state_abbr = state_boundaries['STUSPS'].to_numpy(dtype=object)
+
+    point_idx, polygon_idx = points_in_polygons(gdf.geometry.values, state_boundaries.geometry.values)
+    found = state_abbr[polygon_idx]
+    in_claimed = found == claimed[point_idx]
+
+    within = np.zeros(len(gdf), dtype=bool)
+    within[point_idx[in_claimed]] = True
+
+    # A point on a shared border keeps its claimed state (those pairs are
+    # written last)
+    actual = np.full(len(gdf), None, dtype=object)
+    order = np.argsort(in_claimed, kind='stable')
+    actual[point_idx[order]] = found[order]
+
+    gdf['is_within_claimed_state'] = within
+    gdf['actual_state'] = actual
+    return gdf
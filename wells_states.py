@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_states.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: hold the per-state settings for the states that required a
+#             separate download (file names, column mapping, extra columns)
+
+# =============================================================================
+# State downloads
+# =============================================================================
+
+# File for each state, relative to the WELLS directory
+state_files = {
+    'Alaska' : 'USGS/State_Downloads/Alaska_06282024.csv',
+    'California' : 'USGS/State_Downloads/California_07012024.csv',
+    'Colorado' : 'USGS/State_Downloads/Colorado_06282024.csv',
+    'Florida' : 'USGS/State_Downloads/Florida_08142024.csv',
+    'Indiana' : 'USGS/State_Downloads/Indiana_10092024.csv',
+    'Kansas' : 'USGS/State_Downloads/Kansas_11102024.csv',
+    'Kentucky' : 'USGS/State_Downloads/Kentucky_08262024.csv',
+    'Michigan' : 'USGS/State_Downloads/Michigan_09232024.csv',
+    'Montana' : 'USGS/State_Downloads/Montana_09132024.csv',
+    'Nevada' : 'USGS/State_Downloads/Nevada_06212024.csv',
+    'New Mexico' : 'USGS/State_Downloads/NewMexico_07152024.csv',
+    'New York' : 'USGS/State_Downloads/NewYork_10092024.csv',
+    'Oklahoma' : 'USGS/State_Downloads/Oklahoma_06212024.csv',
+    'Pennsylvania' : 'USGS/State_Downloads/Pennsylvania_06212024.csv',
+    'Tennessee' : 'USGS/State_Downloads/Tennessee_07012024.csv',
+    'Texas' : 'USGS/State_Downloads/Texas_06212024.csv',
+    'Utah' : 'USGS/State_Downloads/Utah_06212024.csv',
+    'West Virginia' : 'USGS/State_Downloads/WestVirginia_06212024.csv',
+    'Wyoming' : 'USGS/State_Downloads/Wyoming_09132024.csv'
+    }
+
+# Extra files merged onto a state's download in section 6
+state_extra_files = {
+    'Colorado' : ['USGS/State_Downloads/Colorado_Wells_06282024.csv']
+    }
+
+# Columns needed for the state-specific formatting in section 6 that aren't
+# part of the column mapping below (merge keys, UTM coordinates)
+state_extra_columns = {
+    'Colorado' : ['Location ID', 'Loc_ID'],
+    'Indiana' : ['Utmx', 'Utmy']
+    }
+
+# Define the column mapping for each state
+state_fields_dict = { 
+                    'Alaska' : 
+                     {'api_10' : 'US Well ID/API',
+                      'lat' : 'Latitude',
+                      'lon' : 'Longitude',
+                      'state' : 'State',
+                      #'county'
+                      'well_name' : 'Well Name',
+                      'operator' : 'Surface Managing Entity Name'
+                      #'well_status' 
+                      #'spud_date' 
+                      }, 
+                     
+                     'California' :
+                     {'api_10' : 'API 10',
+                      'lat' : 'lat',
+                      'lon' : 'lon',
+                      #'state'
+                      'county' : 'County',
+                      'well_name' : 'Well Designation',
+                      'operator' : 'Operator Name'
+                      #'well_status'
+                      #'spud_date'
+                      },
+                     
+                     'Colorado' : 
+                     {'api_10' : 'API_Label',
+                      'lat' : 'Latitude',
+                      'lon' : 'Longitude',
+                       #'state'
+                       'county' : 'County',
+                       'well_name' : 'Well_Title',
+                       'operator' : 'Operator',
+                       'well_status' : 'Facil_Stat',
+                       'spud_date' : 'Spud_Date'
+                       },
+                     
+                     'Florida' :
+                     {'api_10' : 'API',
+                      'lat' : 'Latitude',
+                      'lon' : 'Longitude',
+                       #'state'
+                       'county' : 'COUNTY',
+                       'well_name' : 'WELL_NAME',
+                       #'operator'
+                       'well_status' : 'Current Status',
+                      },
+                     
+                     'Indiana' :
+                     {'api_10' : 'Permit_Number', # Indiana doesn't use API
+                      'lat' : 'Latitude',
+                      'lon' : 'Longitude',
+                       #'state'
+                       'county' : 'County',
+                       'well_name' : 'Lease_Name',
+                       'operator' : 'Operator_Name',
+                       'well_status' : 'Status',
+                       'spud_date' : 'Well_Number' # I'm cheating and putting well number here
+                      },
+                     
+                     'Kansas' :
+                     {'api_10' : 'order', # Kansas doesn't use API; made bogus ones so they don't get dropped during cleaning
+                      'lat' : 'Twp.', # Cheating and putting twp here
+                      'lon' : 'Sect.', # Cheating and putting sect here
+                      #'state'
+                      'county' : 'County',
+                      'well_name' : 'Lease Name',
+                      'operator' : 'Well Number', # I'm cheating and putting well number here
+                      #'well_status'
+                      'spud_date' : 'Rng.' # Cheating and putting rng here
+                      },
+                     
+                     'Kentucky' :
+                     {'api_10' : ' API No ',
+                      'lat' : 'LAT',
+                      'lon' : 'LONG',
+                      #'state'
+                      'county' : 'County',
+                      'well_name' : 'Well Name',
+                      #'operator' 
+                      'well_status' : 'Well Type'
+                      #'spud_date'
+                      },
+                     
+                     'Michigan' :
+                     {'api_10' : 'API #',
+                      'lat' : 'Latitude',
+                      'lon' : 'Longitude',
+                      #'state'
+                      'county' : 'Cnty',
+                      'well_name' : 'Name',
+                      'operator' : 'Operator',
+                      'well_status' : 'Status'
+                      #'spud_date'
+                      },
+                     
+                     'Montana' :
+                     {'api_10' : 'API #',
+                      'lat' : 'LAT',
+                      'lon' : 'LON',
+                      #'state'
+                      'county' : 'County',
+                      'well_name' : 'Well_Nm',
+                      'operator' : 'CoName'
+                      #'well_status' 
+                      #'spud_date'
+                      },
+                     
+                     'Nevada' :
+                     {'api_10' : 'apino',
+                      'lat' : 'latdegree',
+                      'lon' : 'longdegree',
+                      'state' : 'state_',
+                      'county' : 'county',
+                      'well_name' : 'wellname',
+                      'operator' : 'operator_',
+                      'well_status' : 'status',
+                      'spud_date' : 'spuddatetime'
+                      },
+                     
+                     'New Mexico' :
+                     {'api_10' : 'API',
+                      'lat' : 'Latitude',
+                      'lon' : 'Longitude',
+                      #'state' 
+                      #'county'
+                      'well_name' : 'Well Name',
+                      'operator' : 'Current Operator',
+                      'well_status' : 'Status',
+                      'spud_date' : 'Spud Date'
+                      },
+                     
+                     'New York' :
+                     {'api_10' : 'API WELL NUMBER',
+                      'lat' : 'SURFACE LATITUDE',
+                      'lon' : 'SURFACE LONGITUDE',
+                      #'state' 
+                      'county' : 'COUNTY',
+                      'well_name' : 'WELL NAME',
+                      'operator' : 'COMPANY NAME',
+                      'well_status' : 'WELL STATUS',
+                      # 'spud_date'
+                      },
+                     
+                     'Oklahoma' :
+                     {'api_10' : 'API',
+                      'lat' : 'Y',
+                      'lon' : 'X',
+                      #'state' 
+                      'county' : 'CountyName',
+                      'well_name' : 'WellName',
+                      'operator' : 'OperatorName',
+                      'well_status' : 'WellStatus'
+                      #'spud_date'
+                      },
+                     
+                     'Pennsylvania' :
+                     {'api_10' : 'API',
+                      'lat' : 'LATITUDE_DECIMAL',
+                      'lon' : 'LONGITUDE_DECIMAL',
+                      #'state' 
+                      'county' : 'COUNTY',
+                      'well_name' : 'FARM_NAME',
+                      'operator' : 'OPERATOR',
+                      'well_status' : 'WELL_STATUS'
+                      #'spud_date'
+                      },
+                     
+                     'Tennessee' :
+                     {'api_10' : 'API',
+                      'lat' : 'LAT',
+                      'lon' : 'LONG',
+                      #'state' 
+                      'county' : 'COUNTYNAME',
+                      'well_name' : 'WELLNAME',
+                      'operator' : 'OPNAME',
+                      'well_status' : 'WELL_STATUS'
+                      #'spud_date'
+                      },
+                     
+                     'Texas' :
+                     {'api_10' : 'API',
+                      'lat' : 'latitude',
+                      'lon' : 'longitude',
+                      #'state' 
+                      'county' : 'COUNTY_NAME',
+                      #'well_name'
+                      'operator' : 'OPERATOR_NAME'
+                      #'well_status'
+                      #'spud_date'
+                      },
+                     
+                     'Utah' :
+                     {'api_10' : 'API',
+                      'lat' : 'Latitude',
+                      'lon' : 'Longitude',
+                      #'state' 
+                      'county' : 'CountyName',
+                      'well_name' : 'WellName',
+                      'operator' : 'Operator',
+                      'well_status' : 'wellstatus'
+                      #'spud_date'
+                      },
+                     
+                     'West Virginia' :
+                     {'api_10' : 'Well API',
+                      'lat' : 'latitude',
+                      'lon' : 'longitude',
+                      'state' : 'stusps', 
+                      'county' : 'county',
+                      'well_name' : 'Well Number',
+                      'operator' : 'Surface Owner',
+                      'well_status' : 'Well Status'
+                      #'spud_date'
+                      },
+                     
+                     'Wyoming' :
+                     {'api_10' : 'Apino',
+                      'lat' : 'Lat',
+                      'lon' : 'Lon',
+                      #'state' 
+                      #'county'
+                      'well_name' : 'Wellname',
+                      'operator' : 'Company',
+                      'well_status' : 'F2Status'
+                      #'spud_date'
+                      },
+                     }
+
+# Define the required fields for Hauser df
+required_fields = ['api_10', 'lat', 'lon', 'state', 'county', 'well_name', 'operator', 'well_status', 'spud_date']
+
+# =============================================================================
+# API number fixes
+# =============================================================================
+
+# States whose downloads drop the leading zero of the state code
+api_zfill_states = ['California', 'Florida']
+
+# States whose downloads leave the state code off entirely
+api_state_prefixes = {
+    'Pennsylvania' : '37',
+    'Tennessee' : '41',
+    'Texas' : '42',
+    'Wyoming' : '490'
+    }
+
+# =============================================================================
+# FracTracker
+# =============================================================================
+
+# Column mapping for states that are completely included in FracTracker
+ft_fields = {'api_10' : 'api_num',
+             'lat' : 'latitude',
+             'lon' : 'longitude',
+             'state' : 'stusps',
+             'county' : 'county',
+             'well_name' : 'well_name',
+             'operator' : 'operator',
+             'well_status' : 'well_status',
+             'spud_date' : 'spud_date'}
+
+# =============================================================================
+# Matching Hauser wells to plugged wells
+# =============================================================================
+
+# Columns used to find a Hauser well among the plugged wells, for states that
+# can't match on API. 'source' is which plugged list to look in:
+#   ft : wells listed as PLUGGED in FracTracker
+#   ks : wells listed as 'Plugged and Abandoned' in the Kansas all wells dataset
+# (Kansas Hauser wells carry township in lat, section in lon and range in
+# spud_date, see state_fields_dict). 'normalize' names how each key column
+# is written before hashing, on both sides (see wells_keys.key_normalizers)
+plugged_match_keys = {
+    'Indiana' : {'source' : 'ft',
+                 'hauser' : ['operator', 'well_name'],
+                 'plugged' : ['operator', 'well_name']},
+    'Kansas' : {'source' : 'ks',
+                'hauser' : ['well_name', 'operator', 'lat', 'lon', 'spud_date'],
+                'plugged' : ['LEASE', 'WELL', 'TOWNSHIP', 'SECTION', 'RANGE'],
+                'normalize' : [None, None, 'township', 'section', 'range']}
+    }
+
+# Every other state matches on the integer API key
+default_plugged_match_key = {'source' : 'ft',
+                             'hauser' : ['api_key'],
+                             'plugged' : ['api_key']}
+
+# Columns used to find a Hauser well in the USGS dataset (Aim 2), for states
+# that can't match on API
+usgs_match_keys = {
+    'Indiana' : {'hauser' : ['well_name', 'spud_date'],
+                 'usgs' : ['Well name', 'Well number']},
+    'Kansas' : {'hauser' : ['county', 'well_name', 'operator'],
+                'usgs' : ['County', 'Well name', 'Well number']}
+    }
+
+default_usgs_match_key = {'hauser' : ['api_key'],
+                          'usgs' : ['api_key']}
+
+# Fuzzy matching for the states without API numbers (see wells_linkage.py),
+# on top of the exact keys above: wells are only compared within a block
+# (county and/or PLSS township, range & section) and count as the same well
+# if their names / numbers are similar enough
+# Each entry is (Hauser column, other column, normalizer); 'state_col' limits
+# the other dataset to the same state
+plugged_linkage_rules = {
+    'Indiana' : {'source' : 'ft',
+                 'state_col' : 'stusps',
+                 'block' : [('county', 'county', 'county')],
+                 'compare' : [('operator', 'operator', 'name'),
+                              ('well_name', 'well_name', 'name')]},
+    'Kansas' : {'source' : 'ks',
+                'block' : [('lat', 'TOWNSHIP', 'plss'),
+                           ('spud_date', 'RANGE', 'plss'),
+                           ('lon', 'SECTION', 'plss')],
+                'compare' : [('well_name', 'LEASE', 'name'),
+                             ('operator', 'WELL', 'number')]}
+    }
+
+usgs_linkage_rules = {
+    'Indiana' : {'state_col' : 'State',
+                 'block' : [('county', 'County', 'county')],
+                 'compare' : [('well_name', 'Well name', 'name'),
+                              ('spud_date', 'Well number', 'number')]},
+    'Kansas' : {'state_col' : 'State',
+                'block' : [('county', 'County', 'county'),
+                           ('lat', 'Township', 'plss'),
+                           ('spud_date', 'Range', 'plss'),
+                           ('lon', 'Section', 'plss')],
+                'compare' : [('well_name', 'Well name', 'name'),
+                             ('operator', 'Well number', 'number')]}
+    }
+
+# Kansas USGS wells against the Kansas all wells dataset (Aim 3)
+ks_usgs_plugged_rule = {'block' : [('Township', 'TOWNSHIP', 'plss'),
+                                   ('Range', 'RANGE', 'plss'),
+                                   ('Section', 'SECTION', 'plss')],
+                        'compare' : [('Well name', 'LEASE', 'name'),
+                                     ('Well number', 'WELL', 'number')]}
+
+# Hauser df state abbreviations (st_abbrev column)
+state2abbrev = {'Alaska': 'AK',
+                'Alabama': 'AL',
+                'Arkansas': 'AR',
+                'California': 'CA',
+                'Colorado': 'CO',
+                'Florida': 'FL',
+                'Indiana': 'IN',
+                'Kansas': 'KS',
+                'Kentucky': 'KY',
+                'Louisiana': 'LA',
+                'Michigan': 'MI',
+                'Missouri': 'MO',
+                'Mississippi': 'MS',
+                'Montana': 'MT',
+                'North Dakota': 'ND',
+                'Nebraska': 'NE',
+                'New Mexico': 'NM',
+                'Nevada': 'NV',
+                'New York': 'NY',
+                'Ohio': 'OH',
+                'Oklahoma': 'OK',
+                'Pennsylvania': 'PA',
+                'South Dakota': 'SD',
+                'Tennessee': 'TN',
+                'Texas': 'TX',
+                'Utah': 'UT',
+                'Virginia': 'VA',
+                'West Virginia': 'WV',
+                'Wyoming': 'WY'}
+
+# USPS abbreviation of every state, DC and the territories (export file names)
+state_usps = {'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR',
+              'California': 'CA', 'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE',
+              'District of Columbia': 'DC', 'Florida': 'FL', 'Georgia': 'GA', 'Hawaii': 'HI',
+              'Idaho': 'ID', 'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA',
+              'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME',
+              'Maryland': 'MD', 'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN',
+              'Mississippi': 'MS', 'Missouri': 'MO', 'Montana': 'MT', 'Nebraska': 'NE',
+              'Nevada': 'NV', 'New Hampshire': 'NH', 'New Jersey': 'NJ', 'New Mexico': 'NM',
+              'New York': 'NY', 'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH',
+              'Oklahoma': 'OK', 'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI',
+              'South Carolina': 'SC', 'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX',
+              'Utah': 'UT', 'Vermont': 'VT', 'Virginia': 'VA', 'Washington': 'WA',
+              'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY',
+              'American Samoa': 'AS', 'Guam': 'GU', 'Northern Mariana Islands': 'MP',
+              'Puerto Rico': 'PR', 'United States Virgin Islands': 'VI'}
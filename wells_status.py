@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_status.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: hold the orphaned & plugged status dictionaries and standardize
+#             well statuses for a whole dataframe at once
+
+import numpy as np
+import pandas as pd
+
+# =============================================================================
+# Orphaned & plugged dictionaries for FT
+# =============================================================================
+
+# Orphaned dictionary 
+state_status_dict = { 
+    'Alabama' : ['Abandoned'],
+    # Alaska : no category
+    'Arkansas' : ['Abandoned Orphaned Well'],
+    # California : no category
+    # Colorado : no category
+    # Florida : no category
+    'Indiana' : ['Orphaned'],
+    'Kansas': ['D&A'],
+    'Kentucky' : ['AB',
+                  'D&A',
+                  'ABD'],
+    'Louisiana' : ['23',
+                   '26'],
+    'Michigan' : ['Orphan'],
+    'Mississippi' : ['PO - Potential Orphan Well',
+                     'O - Orphaned Well'],
+    'Missouri' : ['Abandoned',
+                  'Abandoned, Unknown Location',
+                  'Abandoned, Known Location and Verified',
+                  'Abandoned, No evidence of existence/ Unable to find',
+                  'Orphaned'],
+    # Montana : no category
+    'Nebraska' : ['AB', 'SI'],
+    'Nevada' : ['AB'],
+    'New Mexico' : ['Reclamation Fund Approved'],
+    'New York' : ['UN',
+                  'UL',
+                  'UM'],
+    'North Dakota' : ['AB'],
+    'Ohio' : ['OR',
+              'OP'],
+    'Oklahoma' : ['OR'],
+    'Pennsylvania' : ['DEP Orphan List'],
+    'South Dakota' : ['Abandoned-Not Regulated']
+    # Tennessee : no category
+    # Texas : no category
+    # Utah : no category
+    # West Virginia : no category
+    # Wyoming : no category
+}
+
+# Plugged dictionary
+plugged_dict = { 
+    'Alabama' : ['Plugged and Abandoned',  
+                'Plugged Back'],
+    'Alaska' : ['Plugged & Abandoned',
+              'Surface Plug'],
+    'Arkansas' : ['Plugged and Abandoned'],
+    'California' : ['Plugged',
+                  'PluggedOnly'],
+    'Colorado' : ['PA',
+                'pa'],
+    'Florida' : ['P&A',
+                 'DRY HOLE/P&A'],
+    'Indiana' : ['Prsmd Plggd(I)',
+                 'Plugd & Abandnd',
+                 'Prsmd Plggd',
+                 'Prsmd Plggd(I)',
+                 'Inadqtly Plggd'],
+    'Kansas' : ['OIL-P&A',
+                'GAS-P&A',
+                'EOR-P&A',
+                'SWD-P&A',
+                'OTHER-P&A(INJ or EOR)',
+                'O&G-P&A',
+                'OTHER-P&A(LH)',
+                'CBM-P&A',
+                'OTHER-P&A(STRAT)',
+                'OTHER-P&A(CATH)',
+                'OTHER-P&A()',
+                'INJ-P&A',
+                'OTHER-P&A(GAS-INJ)',
+                'OTHER-P&A(OBS)',
+                'OTHER-P&A(TA)',
+                'OTHER-P&A(OIL&GAS-INJ)',
+                'OTHER-P&A(GAS-STG)',
+                'OTHER-P&A(GSW)',
+                'OTHER-P&A(Plugged)',
+                'OTHER(Plugged)',
+                'OTHER-P&A(SWD-P&A)',
+                'OTHER-P&A(Inj)',
+                'OTHER-P&A(CLASS ONE (OLD))',
+                'OTHER-P&A(2 OIL)'],
+    # Kentucky : no category
+    'Louisiana' : ['29', '30', '35', '90',
+                  29, 30, 35, 90],
+    'Michigan' : ['Plugging Approved',
+                  'Plugging Completed'],
+    'Missouri' : ['Plugged - Approved',
+                  'Plugged - Not Approved'],
+    'Montana' : ['P&A - Approved'],
+    'Nebraska' : ['PA'],
+    'Nevada' : ['P & A',
+                'P&A',
+                'P & A 7/27/95',
+                'P & A (?)',
+                'P & A 7/17/95'],
+    'New Mexico' : ['Plugged (site released)',
+                    'Plugged (not released)',
+                    'Zone plugged (permanent)',
+                    'Zone plugged (temporary)'],
+    'New York' : ['PA',
+                  'PB'],
+    'North Dakota' : ['PA'],
+    'Ohio' : ['PA'],
+    'Oklahoma' : ['PA'],
+    'Pennsylvania' : ['Plugged OG Well',
+                      'DEP Plugged',
+                      'Plugged Unverified',
+                      'Plugged Mined Through'],
+    'South Dakota' : ['Abandoned-Not Regulated',
+                      'Plugged and Abandoned'],
+    # Tennessee : no category
+    'Texas' : [7,
+               8,
+               10,
+               116,
+               117,
+               118,
+               119,
+               136,
+               137,
+               138,
+               139,
+               152,
+               153,
+               154,
+               155,
+               '7',
+               '8',
+               '10',
+               '116',
+               '117',
+               '118',
+               '119',
+               '136',
+               '137',
+               '138',
+               '139',
+               '152',
+               '153',
+               '154',
+               '155'],
+    'Utah' : ['PA'],
+    'West Virginia' : ['Plugged'],
+    'Wyoming' : ['PA']
+}
+
+# =============================================================================
+# Vectorized status classifier
+# =============================================================================
+
+# Louisiana & Texas codes come in as a mix of ints and strings, and the old
+# row-wise function matched them with Python's `in`, so 29 and 29.0 match the
+# int 29 but not the string '29'. Keep that behaviour by tagging every code
+# with whether it is a number or a string before looking it up.
+def _status_key(status):
+    if isinstance(status, (int, float, np.integer, np.floating)):
+        if pd.isna(status):
+            return None
+        if float(status).is_integer():
+            return ('n', str(int(status)))
+        return ('n', repr(float(status)))
+    if isinstance(status, str):
+        return ('s', status)
+    return None
+
+# Compile both dictionaries into one (state, status) -> category table
+# Orphaned is written last so it wins when a code is in both (South Dakota)
+def build_status_lookup(state_status_dict=state_status_dict, plugged_dict=plugged_dict):
+    lookup = {}
+    for category, status_dict in [('PLUGGED', plugged_dict), ('ORPHANED', state_status_dict)]:
+        for state, statuses in status_dict.items():
+            for status in statuses:
+                key = _status_key(status)
+                if key is not None:
+                    lookup[(state, key)] = category
+    return lookup
+
+# Same result as applying the old standardize_well_status row by row:
+# matched statuses become 'ORPHANED'/'PLUGGED', everything else is kept as is
+def classify_well_status(df, lookup=None, state_col='stusps', status_col='well_status'):
+    if lookup is None:
+        lookup = build_status_lookup()
+
+    # Factorize both columns so the lookup only runs once per distinct pair
+    state_codes, state_uniques = pd.factorize(df[state_col])
+    status_codes, status_uniques = pd.factorize(df[status_col])
+    pair_codes = state_codes.astype(np.int64) * (len(status_uniques) + 1) + status_codes
+    pair_codes[(state_codes < 0) | (status_codes < 0)] = -1
+    pair_index, pairs = pd.factorize(pair_codes)
+
+    # Category for each distinct (state, status) pair, None if no match
+    pair_categories = np.empty(len(pairs), dtype=object)
+    for i, pair in enumerate(pairs):
+        if pair < 0:
+            continue
+        state = state_uniques[pair // (len(status_uniques) + 1)]
+        status = status_uniques[pair % (len(status_uniques) + 1)]
+        pair_categories[i] = lookup.get((state, _status_key(status)))
+
+    # Broadcast back to every row, keeping the original status where unmatched
+    categories = pair_categories[pair_index]
+    matched = pd.notna(categories)
+    result = df[status_col].to_numpy(dtype=object, copy=True)
+    result[matched] = categories[matched]
+    return pd.Series(result, index=df.index, name=status_col)
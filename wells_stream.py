@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Title: "wells_stream.py"
+# Author: Grace Hauser
+# Affiliations: YSPH Department of EHS & FracTracker Alliance Western Division
+# Script aim: read the national FracTracker file in chunks, cleaning each
+#             chunk (state filter, API cleaning, status classification) and
+#             appending it to one Parquet file per state, so dedup can then
+#             run one state at a time
+# What this bounds: parsing the CSV (one chunk at a time instead of the raw
+# file's every column and row) and dedup (one state at a time). The
+# deduplicated states are then read back into one national frame for
+# assemble and the aims (read_states), so peak memory still grows with the
+# national file, just from fewer rows in compact dtypes, not the raw CSV
+
+# Layout:
+#   Cache/ft_states/<state>.parquet   cleaned wells, in file order
+#   Cache/ft_dedup/<state>.parquet    same after deduplicate_wells
+
+import glob
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv
+from pyarrow import parquet as pq
+
+from run_log import keep_rows
+from wells_api import clean_api, normalize_api
+from wells_dedup import deduplicate_wells
+from wells_io import cache_dir, csv_convert_options, ft_dtypes, present_columns
+from wells_schema import apply_schema, ft_schema
+from wells_status import build_status_lookup, classify_well_status
+
+# Bytes of CSV per chunk
+chunk_bytes = 64 * 1024 * 1024
+
+# Column types for the per-state files (categoricals are stored as plain
+# text, Parquet dictionary-encodes them anyway)
+state_file_schema = pa.schema([('api_num', pa.string()),
+                               ('stusps', pa.string()),
+                               ('well_status', pa.string()),
+                               ('latitude', pa.float64()),
+                               ('longitude', pa.float64()),
+                               ('county', pa.string()),
+                               ('well_name', pa.string()),
+                               ('operator', pa.string()),
+                               ('spud_date', pa.timestamp('ns')),
+                               ('api_key', pa.int64())])
+
+# =============================================================================
+# Cleaning (one chunk or the whole file)
+# =============================================================================
+
+# Same steps as Hauser_orphaned_wells.py section 2, for any slice of the file:
+# drop excluded states (or keep only `states`, if given), clean API numbers
+# and add the integer API key (statuses are left as they are for
+# classify_well_status)
+# (dropped rows are counted in the run log, see run_log.py)
+def clean_fractracker(ft, exclude_states=(), states=None):
+    ft = keep_rows(ft, ~ft['stusps'].isin(list(exclude_states)), 'excluded state')
+    if states is not None:
+        ft = keep_rows(ft, ft['stusps'].isin(list(states)), 'state not selected')
+    ft = ft.copy()
+
+    ft['api_num'] = clean_api(ft['api_num'])
+    ft = keep_rows(ft, ft['api_num'].notna(), 'no API')
+    ft = keep_rows(ft, ft['api_num'] != '0000000000', 'API 0000000000')
+    ft = keep_rows(ft, ft['api_num'].str.len() >= 10, 'API under 10 digits')
+
+    ft['api_key'] = normalize_api(ft['api_num'])['api_key']
+    return ft
+
+# =============================================================================
+# Chunked read -> one file per state
+# =============================================================================
+
+def state_file(state, out_dir):
+    return os.path.join(out_dir, str(state).replace(' ', '_') + '.parquet')
+
+# Stream the FracTracker CSVs (in order) into cleaned, classified per-state
+# Parquet files; returns out_dir and the count of each original status per
+# state (the section 2 status peek)
+def stream_fractracker(paths, exclude_states=(), out_dir=os.path.join(cache_dir, 'ft_states'),
+                       chunk_bytes=chunk_bytes, states=None):
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir)
+
+    lookup = build_status_lookup()
+    writers = {}
+    status_counts = []
+    try:
+        for path in paths:
+            usecols, dtype = present_columns(path, list(ft_dtypes), ft_dtypes)
+            reader = csv.open_csv(path, read_options=csv.ReadOptions(block_size=chunk_bytes),
+                                  convert_options=csv_convert_options(usecols, dtype))
+            for batch in reader:
+                chunk = apply_schema(batch.to_pandas(), ft_schema)
+                chunk = clean_fractracker(chunk, exclude_states, states)
+                status_counts.append(chunk.groupby('stusps', observed=True).well_status.value_counts())
+                chunk['well_status'] = classify_well_status(chunk, lookup).astype('category')
+                for state, state_chunk in chunk.groupby('stusps', observed=True, sort=False):
+                    table = pa.Table.from_pandas(state_chunk.reindex(columns=state_file_schema.names),
+                                                 preserve_index=False).cast(state_file_schema)
+                    if state not in writers:
+                        writers[state] = pq.ParquetWriter(state_file(state, out_dir), state_file_schema)
+                    writers[state].write_table(table)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    if not status_counts:
+        return out_dir, pd.DataFrame({'count' : pd.Series(dtype='int64')},
+                                     index=pd.MultiIndex.from_arrays([[], []], names=['stusps', 'well_status']))
+    status_counts = pd.concat(status_counts).groupby(level=[0, 1], observed=True).sum()
+    status_counts = status_counts[status_counts > 0]
+    return out_dir, pd.DataFrame(status_counts.sort_index())
+
+# =============================================================================
+# One state at a time
+# =============================================================================
+
+# No wells, with the per-state files' columns (e.g. a run of Kansas only,
+# which isn't taken from FracTracker)
+def empty_wells(columns=None):
+    wells = apply_schema(state_file_schema.empty_table().to_pandas(), ft_schema)
+    return wells if columns is None else wells[columns]
+
+# (state file, wells) for each state file in a folder, read one at a time
+def iter_states(state_dir, columns=None):
+    for path in sorted(glob.glob(os.path.join(state_dir, '*.parquet'))):
+        yield path, apply_schema(pd.read_parquet(path, columns=columns), ft_schema)
+
+# Run deduplicate_wells on each state file and write the survivors to
+# out_dir; returns out_dir and the summed audit table
+# This only matches one national deduplicate_wells if an API never spans two
+# states (API numbers start with the state code); an API that does would be
+# deduplicated separately in each, so that raises ValueError (run without
+# stream_ft instead)
+def deduplicate_states(state_dir, out_dir=os.path.join(cache_dir, 'ft_dedup'), api_col='api_num',
+                       **dedup_kwargs):
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir)
+
+    audits = []
+    state_apis = []
+    for path, wells in iter_states(state_dir):
+        state_apis.append(wells[api_col].dropna().unique())
+        wells, audit = deduplicate_wells(wells, api_col=api_col, **dedup_kwargs)
+        wells.to_parquet(os.path.join(out_dir, os.path.basename(path)), index=False)
+        audits.append(audit)
+    if not audits:
+        return out_dir, deduplicate_wells(empty_wells(), api_col=api_col, **dedup_kwargs)[1]
+
+    apis = np.concatenate(state_apis)
+    shared = pd.unique(apis[pd.Series(apis).duplicated().to_numpy()])
+    if len(shared):
+        raise ValueError(f'{len(shared)} API numbers are listed under more than one state '
+                         f'(e.g. {shared[0]}), so dedup can\'t run one state at a time')
+
+    audit = audits[0][['step', 'rule']].copy()
+    audit['rows_removed'] = np.sum([a['rows_removed'].to_numpy() for a in audits], axis=0)
+    starting = sum(a['rows_remaining'].iloc[0] + a['rows_removed'].iloc[0] for a in audits)
+    audit['rows_remaining'] = starting - audit['rows_removed'].cumsum()
+    return out_dir, audit
+
+# All state files back in one (national) frame, sorted by API like
+# deduplicate_wells
+def read_states(state_dir, columns=None):
+    states = [wells for _, wells in iter_states(state_dir, columns)]
+    ft = pd.concat(states, ignore_index=True) if states else empty_wells(columns)
+    ft = apply_schema(ft, ft_schema)
+    return ft.sort_values('api_num', kind='stable').reset_index(drop=True)